@@ -5,7 +5,12 @@ A simple Python SDK for building Feishu/Lark bots with messaging capabilities.
 """
 
 from .api import AsyncMessageApiClient, LarkException, MessageApiClient
+from .asgi import AsgiWebhookApp
+from .dedup import DedupBackend, Deduplicator
 from .event import Event, InvalidEventException
+from .models import MessageReceiveEvent
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
 from .utils import dict_2_obj
 from .webhook import WebhookHandler, create_webhook_handler
 
@@ -14,9 +19,15 @@ __all__ = [
     "MessageApiClient",
     "AsyncMessageApiClient",
     "LarkException",
+    "RateLimiter",
+    "RetryPolicy",
+    "Deduplicator",
+    "DedupBackend",
     "Event",
     "InvalidEventException",
+    "MessageReceiveEvent",
     "dict_2_obj",
     "WebhookHandler",
+    "AsgiWebhookApp",
     "create_webhook_handler",
 ]
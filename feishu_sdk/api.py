@@ -1,8 +1,26 @@
+import asyncio
+import itertools
 import logging
 import os
-from typing import Optional
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from threading import Thread
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     import httpx
@@ -11,32 +29,150 @@ try:
 except ImportError:
     HTTPX_AVAILABLE = False
 
+from . import codec
+from .ratelimit import (
+    ENDPOINT_MESSAGE_CREATE,
+    ENDPOINT_MESSAGE_PATCH,
+    ENDPOINT_TOKEN,
+    RateLimiter,
+)
+from .retry import RetryPolicy
+from .token import TokenCache
+
+logger = logging.getLogger(__name__)
+
 # const
 TENANT_ACCESS_TOKEN_URI = "/open-apis/auth/v3/tenant_access_token/internal"
 MESSAGE_URI = "/open-apis/im/v1/messages"
 
+_JSON_HEADERS = {"Content-Type": "application/json; charset=utf-8"}
+
+# result of one recipient of a bulk send: the message_id, or the exception raised for it
+SendResult = Tuple[str, Union[str, BaseException]]
+
+
+def _message_body_template(
+    msg_type: str, content: str, idempotent: bool = False
+) -> Callable[[str], bytes]:
+    # serialize the part of a message create body shared by all recipients once,
+    # the returned function only has to append the receive_id.
+    # with `idempotent` every rendered body also gets a fresh uuid: Feishu sends at most one
+    # message per uuid within an hour, so retrying a create that failed with a 5xx after
+    # the message went out does not deliver it twice.
+    prefix = codec.dumps({"content": content, "msg_type": msg_type})[:-1] + b',"receive_id":'
+
+    def render(receive_id: str) -> bytes:
+        body = prefix + codec.dumps(receive_id)
+        if idempotent:
+            body += b',"uuid":' + codec.dumps(uuid.uuid4().hex)
+        return body + b"}"
+
+    return render
+
+
+# header and body fields never written to logs, even in trace mode
+_SECRET_FIELDS = frozenset({"authorization", "app_secret"})
+
+
+def _redact(fields: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+    if fields is None:
+        return None
+    return {k: "***" if k.lower() in _SECRET_FIELDS else v for k, v in fields.items()}
+
+
+def _trace_request(method: str, url: str, headers: Mapping[str, str], body: Any):
+    if isinstance(body, Mapping):
+        body = _redact(body)
+    logger.debug(
+        "Feishu API request %s %s headers=%s body=%s",
+        method,
+        url,
+        _redact(headers),
+        body,
+        extra={"feishu_method": method, "feishu_url": url},
+    )
+
+
+def _trace_response(method: str, url: str, status_code: int, body: Any):
+    logger.debug(
+        "Feishu API response %s %s status=%s body=%s",
+        method,
+        url,
+        status_code,
+        body,
+        extra={"feishu_method": method, "feishu_url": url, "feishu_status": status_code},
+    )
+
 
 class MessageApiClient(object):
-    def __init__(self, app_id: str, app_secret: str, lark_host: str):
+    def __init__(
+        self,
+        app_id: str,
+        app_secret: str,
+        lark_host: str,
+        token_cache: Optional[TokenCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        trace: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = True,
+    ):
         self._app_id = app_id
         self._app_secret = app_secret
         self._lark_host = lark_host
-        self._tenant_access_token = ""
+        self._token_cache = token_cache if token_cache is not None else TokenCache()
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        # trace mode logs every request and response at DEBUG level, with secrets redacted
+        self._trace = trace
+        # keep-alive connections are reused across calls; pool_connections is the number of
+        # hosts to keep pools for, pool_maxsize the max connections kept open per host.
+        # with pool_block, calls beyond pool_maxsize wait for a free connection; without it
+        # they open extra connections that are closed again after one request
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def __enter__(self) -> "MessageApiClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self):
+        """Close the pooled HTTP connections held by this client."""
+        self._session.close()
 
     @classmethod
     def from_env(
-        cls, lark_host: str, app_id_env: str = "APP_ID", app_secret_env: str = "APP_SECRET"
+        cls,
+        lark_host: str,
+        app_id_env: str = "APP_ID",
+        app_secret_env: str = "APP_SECRET",
+        **kwargs,
     ):
         """Create client from environment variables"""
         app_id = os.getenv(app_id_env)
         app_secret = os.getenv(app_secret_env)
         if not app_id or not app_secret:
             raise ValueError(f"Environment variables {app_id_env} and {app_secret_env} must be set")
-        return cls(app_id, app_secret, lark_host)
+        return cls(app_id, app_secret, lark_host, **kwargs)
 
     @property
     def tenant_access_token(self):
-        return self._tenant_access_token
+        return self._token_cache.token
+
+    @property
+    def _tenant_access_token(self):
+        return self._token_cache.token
+
+    @_tenant_access_token.setter
+    def _tenant_access_token(self, value: str):
+        self._token_cache.token = value
 
     def send_text_with_open_id(self, open_id: str, content: str):
         self.send("open_id", open_id, "text", content)
@@ -47,60 +183,160 @@ class MessageApiClient(object):
     def send_update_message_card(self, message_id: str, updated_card: str):
         # Updates message card that was sent previously
         # doc link: https://open.feishu.cn/document/server-docs/im-v1/message-card/patch?appId=cli_a6ac1c1b7df9900e
-        self._authorize_tenant_access_token()
         url = "{}{}/{}".format(self._lark_host, MESSAGE_URI, message_id)
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + self.tenant_access_token,
-        }
         req_body = {"content": updated_card}
-        print("update message card url: ", url)
-        print("update message card headers: ", headers)
-        print("update message card body: ", req_body)
-        resp = requests.patch(url, headers=headers, json=req_body)
-        MessageApiClient._check_error_response(resp)
+        self._call("PATCH", url, ENDPOINT_MESSAGE_PATCH, message_id, json=req_body)
 
     def send(self, receive_id_type: str, receive_id: str, msg_type: str, content: str):
         # send message to user, implemented based on Feishu open api capability.
         # doc link: https://open.feishu.cn/document/uAjLw4CM/ukTMukTMukTM/reference/im-v1/message/create
-        self._authorize_tenant_access_token()
         url = "{}{}?receive_id_type={}".format(self._lark_host, MESSAGE_URI, receive_id_type)
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + self.tenant_access_token,
-        }
-
-        req_body = {
-            "receive_id": receive_id,
-            "content": content,
-            "msg_type": msg_type,
-        }
-        # print(f"Sending message request body w header {headers["Authorization"]}:\n", req_body)
-        resp = requests.post(url=url, headers=headers, json=req_body)
-        print(resp)
-        MessageApiClient._check_error_response(resp)
-        return resp.json()["data"]["message_id"]
+        render_body = _message_body_template(msg_type, content, self._retry_policy is not None)
+        return self._create_message(url, receive_id, render_body(receive_id))
+
+    def send_many(
+        self,
+        receive_id_type: str,
+        receive_ids: Iterable[str],
+        msg_type: str,
+        content: str,
+        concurrency: int = 10,
+    ) -> Iterator[SendResult]:
+        # send the same message to many recipients on a pool of `concurrency` threads.
+        # yields (receive_id, message_id) as sends complete, or (receive_id, exception) for
+        # recipients that failed, so one bad receive_id does not abort the whole batch.
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        url = "{}{}?receive_id_type={}".format(self._lark_host, MESSAGE_URI, receive_id_type)
+        render_body = _message_body_template(msg_type, content, self._retry_policy is not None)
+        remaining = iter(receive_ids)
+        pending: Dict["Future[str]", str] = {}
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+
+            def submit(receive_id: str):
+                body = render_body(receive_id)
+                future = executor.submit(self._create_message, url, receive_id, body)
+                pending[future] = receive_id
+
+            for receive_id in itertools.islice(remaining, concurrency):
+                submit(receive_id)
+            try:
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    results = [(pending.pop(future), future) for future in done]
+                    for receive_id in itertools.islice(remaining, len(done)):
+                        submit(receive_id)
+                    for receive_id, future in results:
+                        error = future.exception()
+                        yield receive_id, future.result() if error is None else error
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def _create_message(self, url: str, receive_id: str, body: bytes) -> str:
+        response_dict = self._call(
+            "POST", url, ENDPOINT_MESSAGE_CREATE, receive_id, headers=_JSON_HEADERS, data=body
+        )
+        message_id: str = response_dict["data"]["message_id"]
+        return message_id
+
+    def _call(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        key: Optional[str] = None,
+        authorize: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Mapping[str, Any]] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        # make one API call under the rate limiter and retry policy and return the decoded
+        # response. every attempt reads the token from the cache, so a retry never
+        # re-fetches a token that is still valid. a `json` body is encoded with the codec.
+        if json is not None:
+            kwargs["data"] = codec.dumps(json)
+            headers = dict(headers or {}, **_JSON_HEADERS)
+        retry = self._retry_policy.start() if self._retry_policy is not None else None
+        while True:
+            self._throttle(endpoint, key)
+            request_headers = dict(headers or {})
+            if authorize:
+                request_headers["Authorization"] = "Bearer " + self._get_tenant_access_token()
+            if self._trace and logger.isEnabledFor(logging.DEBUG):
+                body = json if json is not None else kwargs.get("data")
+                _trace_request(method, url, request_headers, body)
+            resp = self._session.request(method, url, headers=request_headers, **kwargs)
+            if self._trace and logger.isEnabledFor(logging.DEBUG):
+                # the token endpoint answers with the token itself, keep it out of the logs
+                body = resp.text if endpoint != ENDPOINT_TOKEN else "***"
+                _trace_response(method, url, resp.status_code, body)
+            try:
+                return MessageApiClient._check_error_response(resp)
+            except (LarkException, requests.HTTPError) as e:
+                code = getattr(e, "code", None)
+                delay = retry.next_delay(resp.status_code, code, resp.headers) if retry else None
+                if delay is None:
+                    raise
+            time.sleep(delay)
 
     def _authorize_tenant_access_token(self):
-        # get tenant_access_token and set, implemented based on Feishu open api capability.
+        # get tenant_access_token and set, concurrent callers share a single in-flight request.
+        self._token_cache.refresh(self._request_tenant_access_token, force=True)
+
+    def _request_tenant_access_token(self) -> Tuple[str, float]:
+        # implemented based on Feishu open api capability.
         # doc link: https://open.feishu.cn/document/ukTMukTMukTM/ukDNz4SO0MjL5QzM/auth-v3/auth/tenant_access_token_internal
         url = "{}{}".format(self._lark_host, TENANT_ACCESS_TOKEN_URI)
         req_body = {"app_id": self._app_id, "app_secret": self._app_secret}
-        print("Authorize tenant_access_token:\n", req_body)
-        response = requests.post(url, req_body)
-        MessageApiClient._check_error_response(response)
-        self._tenant_access_token = response.json().get("tenant_access_token")
+        response_dict = self._call("POST", url, ENDPOINT_TOKEN, authorize=False, json=req_body)
+        return response_dict["tenant_access_token"], response_dict.get("expire", 0)
+
+    def _get_tenant_access_token(self) -> str:
+        # reuse the cached token, re-authorizing only when it is missing or about to expire
+        cache = self._token_cache
+        if not cache.is_valid():
+            return cache.refresh(self._request_tenant_access_token)
+        token = cache.token
+        if cache.needs_refresh() and not cache.refreshing:
+            Thread(target=self._refresh_tenant_access_token, daemon=True).start()
+        return token
+
+    def _throttle(self, endpoint: str, key: Optional[str] = None):
+        # wait for the rate limiter, if any, to allow one more call to the endpoint
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire(endpoint, key)
+
+    def _refresh_tenant_access_token(self):
+        # background refresh, the cached token keeps being served until this completes
+        try:
+            self._authorize_tenant_access_token()
+        except Exception:
+            logger.exception("Background tenant_access_token refresh failed")
 
     @staticmethod
-    def _check_error_response(resp):
-        # check if the response contains error information
+    def _check_error_response(resp) -> Dict[str, Any]:
+        # check if the response contains error information, return the decoded body if not
         if resp.status_code != 200:
             resp.raise_for_status()
-        response_dict = resp.json()
+        response_dict: Dict[str, Any] = codec.loads(resp.content)
         code = response_dict.get("code", -1)
         if code != 0:
-            logging.error(response_dict)
+            logger.error(
+                "Feishu API error %s: %s",
+                code,
+                response_dict.get("msg"),
+                extra={"feishu_code": code, "feishu_log_id": _log_id(resp)},
+            )
             raise LarkException(code=code, msg=response_dict.get("msg"))
+        return response_dict
+
+
+def _log_id(resp) -> Optional[str]:
+    # request id assigned by the Feishu gateway, useful when reporting issues to Feishu
+    log_id: Optional[str] = resp.headers.get("x-tt-logid")
+    return log_id
 
 
 class LarkException(Exception):
@@ -117,7 +353,18 @@ class LarkException(Exception):
 class AsyncMessageApiClient:
     """Async version of MessageApiClient using httpx for non-blocking HTTP calls."""
 
-    def __init__(self, app_id: str, app_secret: str, lark_host: str):
+    def __init__(
+        self,
+        app_id: str,
+        app_secret: str,
+        lark_host: str,
+        token_cache: Optional[TokenCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        trace: bool = False,
+        limits: Optional["httpx.Limits"] = None,
+        http2: bool = False,
+    ):
         if not HTTPX_AVAILABLE:
             raise ImportError(
                 "httpx is required for AsyncMessageApiClient. "
@@ -126,34 +373,61 @@ class AsyncMessageApiClient:
         self._app_id = app_id
         self._app_secret = app_secret
         self._lark_host = lark_host
-        self._tenant_access_token = ""
+        self._token_cache = token_cache if token_cache is not None else TokenCache()
+        self._rate_limiter = rate_limiter
+        self._retry_policy = retry_policy
+        # trace mode logs every request and response at DEBUG level, with secrets redacted
+        self._trace = trace
+        self._limits = limits
+        self._http2 = http2
         self._client: Optional["httpx.AsyncClient"] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_task: Optional["asyncio.Future"] = None
+        # number of requests that could not use the shared client, see _request
+        self.temporary_client_requests = 0
 
     @classmethod
     def from_env(
-        cls, lark_host: str, app_id_env: str = "APP_ID", app_secret_env: str = "APP_SECRET"
+        cls,
+        lark_host: str,
+        app_id_env: str = "APP_ID",
+        app_secret_env: str = "APP_SECRET",
+        **kwargs,
     ):
         """Create client from environment variables"""
         app_id = os.getenv(app_id_env)
         app_secret = os.getenv(app_secret_env)
         if not app_id or not app_secret:
             raise ValueError(f"Environment variables {app_id_env} and {app_secret_env} must be set")
-        return cls(app_id, app_secret, lark_host)
+        return cls(app_id, app_secret, lark_host, **kwargs)
 
     async def __aenter__(self) -> "AsyncMessageApiClient":
         """Async context manager entry."""
-        self._client = httpx.AsyncClient()
+        self._get_client()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Async context manager exit."""
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the shared HTTP client and its connection pool."""
         if self._client:
             await self._client.aclose()
             self._client = None
+            self._client_loop = None
 
     @property
     def tenant_access_token(self):
-        return self._tenant_access_token
+        return self._token_cache.token
+
+    @property
+    def _tenant_access_token(self):
+        return self._token_cache.token
+
+    @_tenant_access_token.setter
+    def _tenant_access_token(self, value: str):
+        self._token_cache.token = value
 
     async def send_text_with_open_id(self, open_id: str, content: str):
         """Send a text message to a user by open_id."""
@@ -165,62 +439,198 @@ class AsyncMessageApiClient:
 
     async def send_update_message_card(self, message_id: str, updated_card: str):
         """Update a message card that was sent previously."""
-        await self._authorize_tenant_access_token()
         url = "{}{}/{}".format(self._lark_host, MESSAGE_URI, message_id)
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + self.tenant_access_token,
-        }
         req_body = {"content": updated_card}
-        print("update message card url: ", url)
-        print("update message card headers: ", headers)
-        print("update message card body: ", req_body)
-        resp = await self._request("PATCH", url, headers=headers, json=req_body)
-        self._check_error_response(resp)
+        await self._call("PATCH", url, ENDPOINT_MESSAGE_PATCH, message_id, json=req_body)
 
     async def send(self, receive_id_type: str, receive_id: str, msg_type: str, content: str):
         """Send message to user, implemented based on Feishu open api capability."""
-        await self._authorize_tenant_access_token()
         url = "{}{}?receive_id_type={}".format(self._lark_host, MESSAGE_URI, receive_id_type)
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": "Bearer " + self.tenant_access_token,
-        }
-        req_body = {
-            "receive_id": receive_id,
-            "content": content,
-            "msg_type": msg_type,
+        render_body = _message_body_template(msg_type, content, self._retry_policy is not None)
+        return await self._create_message(url, receive_id, render_body(receive_id))
+
+    async def send_many(
+        self,
+        receive_id_type: str,
+        receive_ids: Iterable[str],
+        msg_type: str,
+        content: str,
+        concurrency: int = 10,
+    ) -> AsyncIterator[SendResult]:
+        """
+        Send the same message to many recipients with at most ``concurrency`` sends in flight.
+
+        Yields ``(receive_id, message_id)`` as sends complete, or ``(receive_id, exception)``
+        for recipients that failed, so one bad receive_id does not abort the whole batch.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        url = "{}{}?receive_id_type={}".format(self._lark_host, MESSAGE_URI, receive_id_type)
+        render_body = _message_body_template(msg_type, content, self._retry_policy is not None)
+        remaining = iter(receive_ids)
+
+        async def send_one(receive_id: str) -> SendResult:
+            try:
+                body = render_body(receive_id)
+                return receive_id, await self._create_message(url, receive_id, body)
+            except Exception as e:
+                return receive_id, e
+
+        pending = {
+            asyncio.ensure_future(send_one(receive_id))
+            for receive_id in itertools.islice(remaining, concurrency)
         }
-        resp = await self._request("POST", url, headers=headers, json=req_body)
-        print(resp)
-        self._check_error_response(resp)
-        return resp.json()["data"]["message_id"]
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for receive_id in itertools.islice(remaining, len(done)):
+                    pending.add(asyncio.ensure_future(send_one(receive_id)))
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _create_message(self, url: str, receive_id: str, body: bytes) -> str:
+        """Post a pre-serialized message create body and return the new message_id."""
+        response_dict = await self._call(
+            "POST", url, ENDPOINT_MESSAGE_CREATE, receive_id, headers=_JSON_HEADERS, content=body
+        )
+        message_id: str = response_dict["data"]["message_id"]
+        return message_id
+
+    async def _call(
+        self,
+        method: str,
+        url: str,
+        endpoint: str,
+        key: Optional[str] = None,
+        authorize: bool = True,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Mapping[str, Any]] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Make one API call under the rate limiter and retry policy and return the decoded response.
+
+        Every attempt reads the token from the cache, so a retry never re-fetches a token
+        that is still valid. A ``json`` body is encoded with the codec.
+        """
+        if json is not None:
+            kwargs["content"] = codec.dumps(json)
+            headers = dict(headers or {}, **_JSON_HEADERS)
+        retry = self._retry_policy.start() if self._retry_policy is not None else None
+        while True:
+            await self._throttle(endpoint, key)
+            request_headers = dict(headers or {})
+            if authorize:
+                token = await self._get_tenant_access_token()
+                request_headers["Authorization"] = "Bearer " + token
+            if self._trace and logger.isEnabledFor(logging.DEBUG):
+                body = json if json is not None else kwargs.get("content")
+                _trace_request(method, url, request_headers, body)
+            resp = await self._request(method, url, headers=request_headers, **kwargs)
+            if self._trace and logger.isEnabledFor(logging.DEBUG):
+                # the token endpoint answers with the token itself, keep it out of the logs
+                body = resp.text if endpoint != ENDPOINT_TOKEN else "***"
+                _trace_response(method, url, resp.status_code, body)
+            try:
+                return self._check_error_response(resp)
+            except (LarkException, httpx.HTTPStatusError) as e:
+                code = getattr(e, "code", None)
+                delay = retry.next_delay(resp.status_code, code, resp.headers) if retry else None
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
 
     async def _authorize_tenant_access_token(self):
-        """Get tenant_access_token and set it."""
+        """Get tenant_access_token and set it, sharing one in-flight request between callers."""
+        await self._token_cache.refresh_async(self._request_tenant_access_token, force=True)
+
+    async def _request_tenant_access_token(self) -> Tuple[str, float]:
+        """Request a new tenant_access_token and its lifetime in seconds."""
         url = "{}{}".format(self._lark_host, TENANT_ACCESS_TOKEN_URI)
         req_body = {"app_id": self._app_id, "app_secret": self._app_secret}
-        print("Authorize tenant_access_token:\n", req_body)
-        response = await self._request("POST", url, data=req_body)
-        self._check_error_response(response)
-        self._tenant_access_token = response.json().get("tenant_access_token")
+        response_dict = await self._call(
+            "POST", url, ENDPOINT_TOKEN, authorize=False, json=req_body
+        )
+        return response_dict["tenant_access_token"], response_dict.get("expire", 0)
+
+    async def _get_tenant_access_token(self) -> str:
+        """Return the cached token, re-authorizing only when it is missing or about to expire."""
+        cache = self._token_cache
+        if not cache.is_valid():
+            return await cache.refresh_async(self._request_tenant_access_token)
+        if cache.needs_refresh() and not cache.refreshing:
+            self._refresh_task = asyncio.ensure_future(self._refresh_tenant_access_token())
+        return cache.token
+
+    async def _throttle(self, endpoint: str, key: Optional[str] = None):
+        """Wait for the rate limiter, if any, to allow one more call to the endpoint."""
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire_async(endpoint, key)
+
+    async def _refresh_tenant_access_token(self):
+        """Refresh the token in the background while the cached one keeps being served."""
+        try:
+            await self._authorize_tenant_access_token()
+        except Exception:
+            logger.exception("Background tenant_access_token refresh failed")
 
     async def _request(self, method: str, url: str, **kwargs) -> "httpx.Response":
         """Make an HTTP request using the async client."""
-        if self._client:
-            return await self._client.request(method, url, **kwargs)
-        else:
-            # If not using context manager, create a temporary client
-            async with httpx.AsyncClient() as client:
-                return await client.request(method, url, **kwargs)
+        client = self._get_client()
+        if client is not None:
+            return await client.request(method, url, **kwargs)
+
+        self.temporary_client_requests += 1
+        if self.temporary_client_requests == 1:
+            logger.warning(
+                "AsyncMessageApiClient is used from more than one event loop, falling back to "
+                "a temporary HTTP client per request; keep the client on a single loop to "
+                "reuse pooled connections"
+            )
+        async with self._create_client() as temporary_client:
+            return await temporary_client.request(method, url, **kwargs)
+
+    def _get_client(self) -> Optional["httpx.AsyncClient"]:
+        """
+        Return the shared client, creating it on first use.
+
+        The shared client is bound to the event loop it was created on. Returns None
+        when called from another, still running loop, which cannot reuse its connections.
+        """
+        loop = asyncio.get_running_loop()
+        client_loop = self._client_loop
+        if self._client is not None and client_loop is not loop:
+            if client_loop is not None and not client_loop.is_closed():
+                return None
+            # the owning loop is gone together with its connections, start over on this one
+            self._client = None
+        if self._client is None:
+            self._client = self._create_client()
+            self._client_loop = loop
+        return self._client
+
+    def _create_client(self) -> "httpx.AsyncClient":
+        kwargs: Dict[str, Any] = {"http2": self._http2}
+        if self._limits is not None:
+            kwargs["limits"] = self._limits
+        return httpx.AsyncClient(**kwargs)
 
     @staticmethod
-    def _check_error_response(resp: "httpx.Response"):
-        """Check if the response contains error information."""
+    def _check_error_response(resp: "httpx.Response") -> Dict[str, Any]:
+        """Check if the response contains error information, return the decoded body if not."""
         if resp.status_code != 200:
             resp.raise_for_status()
-        response_dict = resp.json()
+        response_dict: Dict[str, Any] = codec.loads(resp.content)
         code = response_dict.get("code", -1)
         if code != 0:
-            logging.error(response_dict)
+            logger.error(
+                "Feishu API error %s: %s",
+                code,
+                response_dict.get("msg"),
+                extra={"feishu_code": code, "feishu_log_id": _log_id(resp)},
+            )
             raise LarkException(code=code, msg=response_dict.get("msg"))
+        return response_dict
@@ -0,0 +1,243 @@
+import asyncio
+import functools
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, MutableMapping, Optional, Sequence, Set
+
+from . import codec
+from .dispatch import _call_hook
+from .event import Event
+from .middleware import Middleware
+from .router import Router
+from .webhook import WebhookHandler
+
+logger = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[MutableMapping[str, Any]]]
+Send = Callable[[MutableMapping[str, Any]], Awaitable[None]]
+
+
+class AsgiWebhookApp(object):
+    """
+    ASGI application receiving Feishu webhook events.
+
+    Serve it directly with an ASGI server (``uvicorn module:app``) or mount it in a
+    framework such as Starlette; it answers POST requests on whatever path it is routed.
+
+    Handlers come from the same registry as the Flask integration: register them with
+    :meth:`message_handler` / :meth:`event_handler` here, or pass a :class:`WebhookHandler`
+    that already has them. Async handlers run as tasks on the server's event loop, at most
+    ``max_tasks`` at a time before deliveries are answered with 503; sync handlers run on
+    the WebhookHandler's worker pool. ``on_startup`` / ``on_shutdown`` hooks run on the
+    server loop through the ASGI lifespan protocol. With an ``ordering_key``, the async
+    handler tasks of one key run one after the other in arrival order, as the sync ones do
+    on the keyed worker pool.
+
+    Each delivery is checked and queued on a thread of the loop's default executor, so
+    parts that may block, such as a ``block`` backpressure policy or a dedup backend on a
+    shared store, never hold up the server loop. Spool mode is not supported: a
+    WebhookHandler with a ``spool`` is refused.
+    """
+
+    def __init__(self, handler: Optional[WebhookHandler] = None, max_tasks: int = 1000, **kwargs):
+        if kwargs.get("spool") is not None or (handler is not None and handler.spool is not None):
+            # deliveries would be handled straight away, never through the spool
+            raise ValueError("AsgiWebhookApp does not support a handler with a spool")
+        self.handler = handler if handler is not None else WebhookHandler(**kwargs)
+        self.max_tasks = max_tasks
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        # last task of each ordering key with work, dropped once that task is done
+        self._key_tails: Dict[Hashable, "asyncio.Task[None]"] = {}
+        # slots taken by tasks that are running or about to be started on the loop
+        self._task_lock = threading.Lock()
+        self._reserved = 0
+
+    @property
+    def message_handlers(self) -> Router:
+        return self.handler.message_handlers
+
+    @property
+    def event_handlers(self) -> Router:
+        return self.handler.event_handlers
+
+    def message_handler(
+        self,
+        message_type: str = "text",
+        middleware: Sequence[Middleware] = (),
+        timeout: Optional[float] = None,
+    ):
+        """Decorator to register message handlers"""
+        return self.handler.message_handler(message_type, middleware, timeout)
+
+    def event_handler(
+        self,
+        event_type: str,
+        middleware: Sequence[Middleware] = (),
+        timeout: Optional[float] = None,
+    ):
+        """Decorator to register event handlers"""
+        return self.handler.event_handler(event_type, middleware, timeout)
+
+    def use(self, middleware: Middleware):
+        """Add a middleware around the handlers registered from now on"""
+        self.handler.use(middleware)
+
+    def on_startup(self, func: Callable):
+        """Decorator to register a hook run on the server loop at startup"""
+        return self.handler.on_startup(func)
+
+    def on_shutdown(self, func: Callable):
+        """Decorator to register a hook run on the server loop at shutdown"""
+        return self.handler.on_shutdown(func)
+
+    @property
+    def pending_tasks(self) -> int:
+        """Number of async handler calls in flight."""
+        return self._reserved
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if scope["method"] != "POST":
+            await _send_json(send, {"error": "Method not allowed"}, 405)
+            return
+        body = await _read_body(receive)
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", ())
+        }
+        loop = asyncio.get_running_loop()
+        submit = functools.partial(self._submit, loop)
+        data, status = await loop.run_in_executor(
+            None, self.handler.handle_body, body, submit, headers
+        )
+        await _send_json(send, data, status)
+
+    async def startup(self):
+        """Run the startup hooks on the current loop."""
+        for hook in self.handler.event_loop.startup_hooks:
+            await _call_hook(hook)
+
+    async def shutdown(self):
+        """Wait for handlers in flight and the handler's pools, then run the shutdown hooks."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        await asyncio.get_running_loop().run_in_executor(None, self.handler.shutdown)
+        for hook in self.handler.event_loop.shutdown_hooks:
+            try:
+                await _call_hook(hook)
+            except Exception:
+                logger.exception("Error in shutdown hook")
+
+    def _submit(
+        self, loop: asyncio.AbstractEventLoop, handlers: Sequence[Callable], event: Event
+    ) -> bool:
+        """Start a task on the loop for async handlers, queue sync ones on the worker pool"""
+        # called on an executor thread; the task slot is taken first so that an event is
+        # either accepted by both the loop and the worker pool or by neither
+        coroutines = tuple(h for h in handlers if asyncio.iscoroutinefunction(h))
+        if coroutines:
+            with self._task_lock:
+                if self._reserved >= self.max_tasks:
+                    return False
+                self._reserved += 1
+        if len(coroutines) < len(handlers):
+            sync = tuple(h for h in handlers if not asyncio.iscoroutinefunction(h))
+            try:
+                accepted = self.handler._submit(sync, event)
+            except BaseException:
+                if coroutines:
+                    self._release()
+                raise
+            if not accepted:
+                if coroutines:
+                    self._release()
+                return False
+        if coroutines:
+            key = self.handler.key_for(event)
+            loop.call_soon_threadsafe(self._start, coroutines, event, key)
+        return True
+
+    def _start(self, handlers: Sequence[Callable], event: Event, key: Optional[Hashable]):
+        # tasks of one ordering key run one after the other in arrival order: each waits
+        # for the task started before it with the same key
+        previous = self._key_tails.get(key) if key is not None else None
+        task = asyncio.ensure_future(self._process(handlers, event, previous))
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+        if key is not None:
+            self._key_tails[key] = task
+            task.add_done_callback(functools.partial(self._drop_tail, key))
+
+    def _drop_tail(self, key: Hashable, task: "asyncio.Task[None]"):
+        if self._key_tails.get(key) is task:
+            del self._key_tails[key]
+
+    def _task_done(self, task: "asyncio.Task[None]"):
+        self._tasks.discard(task)
+        self._release()
+
+    def _release(self):
+        with self._task_lock:
+            self._reserved -= 1
+
+    async def _process(
+        self,
+        handlers: Sequence[Callable],
+        event: Event,
+        previous: "Optional[asyncio.Task[None]]" = None,
+    ):
+        if previous is not None:
+            await asyncio.wait({previous})
+        for handler in handlers:
+            try:
+                await self.handler._await_handler(handler, event)
+            except Exception:
+                logger.exception("Error processing event %s", event.header.event_type)
+
+    async def _lifespan(self, receive: Receive, send: Send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.exception("Error in startup hook")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_json(send: Send, data: Any, status: int):
+    body = codec.dumps(data)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
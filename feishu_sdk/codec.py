@@ -0,0 +1,68 @@
+"""
+JSON encoding and decoding used for webhook bodies and Feishu API calls.
+
+The fastest installed backend is picked at import time: orjson, then msgspec, then the
+standard library ``json`` module. Install the ``fast`` extra to get orjson. All
+backends share one interface: :func:`loads` accepts bytes or str, :func:`dumps` returns
+compact UTF-8 bytes. :func:`use` switches the backend at runtime, for example to compare
+them or to pin the stdlib one.
+"""
+
+import json
+from typing import Any, Callable, Dict, Tuple, Type, Union
+
+# backend name -> (loads, dumps)
+Backend = Tuple[Callable[[Union[bytes, str]], Any], Callable[[Any], bytes]]
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+BACKENDS: Dict[str, Backend] = {"json": (json.loads, _json_dumps)}
+# exceptions raised by the backends for malformed input, for use in an except clause
+DecodeError: Tuple[Type[Exception], ...] = (ValueError,)
+
+try:
+    import msgspec
+
+    BACKENDS["msgspec"] = (msgspec.json.decode, msgspec.json.Encoder().encode)
+    DecodeError += (msgspec.DecodeError,)
+except ImportError:
+    pass
+
+try:
+    import orjson
+
+    BACKENDS["orjson"] = (orjson.loads, orjson.dumps)
+except ImportError:
+    pass
+
+backend = ""
+_loads, _dumps = BACKENDS["json"]
+
+
+def use(name: str):
+    """Switch to the named backend, one of the keys of ``BACKENDS``."""
+    global backend, _loads, _dumps
+    if name not in BACKENDS:
+        raise ValueError(
+            "JSON backend {!r} is not available, installed: {}".format(
+                name, ", ".join(sorted(BACKENDS))
+            )
+        )
+    backend = name
+    _loads, _dumps = BACKENDS[name]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode a JSON document."""
+    return _loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object as compact UTF-8 JSON."""
+    return _dumps(obj)
+
+
+use(next(name for name in ("orjson", "msgspec", "json") if name in BACKENDS))
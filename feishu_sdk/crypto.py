@@ -0,0 +1,58 @@
+"""
+Decryption of webhook bodies sent with an Encrypt Key.
+
+With an Encrypt Key set in the Feishu developer console, every delivery arrives as
+``{"encrypt": "<base64>"}``: the event JSON encrypted with AES-256-CBC under the SHA-256
+digest of the key, PKCS#7 padded, with the random 16-byte IV prepended. Install the
+``crypto`` extra to get the ``cryptography`` package this module needs.
+"""
+
+import base64
+import binascii
+import hashlib
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+    _HAS_CRYPTO = True
+except ImportError:  # pragma: no cover - depends on the installed extras
+    _HAS_CRYPTO = False
+
+_BLOCK_SIZE = 16
+
+
+class DecryptError(ValueError):
+    """Raised for an ``encrypt`` field that is not valid ciphertext for the key."""
+
+
+class AESCipher(object):
+    """
+    Decrypts the ``encrypt`` field of webhook bodies for one Encrypt Key.
+
+    The AES key is derived and its cipher algorithm set up once; every message carries
+    its own IV, so only the CBC context is created per request.
+    """
+
+    def __init__(self, encrypt_key: str):
+        if not _HAS_CRYPTO:
+            raise ImportError(
+                "cryptography is required to decrypt events. "
+                "Install it with: pip install feishu-bot-sdk[crypto]"
+            )
+        self.key = hashlib.sha256(encrypt_key.encode("utf-8")).digest()
+        self._algorithm = algorithms.AES(self.key)
+
+    def decrypt(self, encrypted: str) -> bytes:
+        """Return the plaintext of an ``encrypt`` field."""
+        try:
+            data = base64.b64decode(encrypted, validate=True)
+        except (binascii.Error, TypeError, ValueError) as e:
+            raise DecryptError("encrypt is not valid base64") from e
+        if len(data) < 2 * _BLOCK_SIZE or len(data) % _BLOCK_SIZE:
+            raise DecryptError("encrypt has an invalid length")
+        decryptor = Cipher(self._algorithm, modes.CBC(data[:_BLOCK_SIZE])).decryptor()
+        plaintext = decryptor.update(data[_BLOCK_SIZE:]) + decryptor.finalize()
+        pad = plaintext[-1]
+        if not 1 <= pad <= _BLOCK_SIZE or plaintext[-pad:] != bytes([pad]) * pad:
+            raise DecryptError("encrypt has invalid padding")
+        return plaintext[:-pad]
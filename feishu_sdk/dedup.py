@@ -0,0 +1,103 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Feishu redelivers an event it got no timely answer for after 15s, 5m, 1h and 6h,
+# an event id has to be remembered for a bit longer than the last retry
+DEFAULT_TTL = 7 * 3600
+
+
+class DedupBackend(ABC):
+    """
+    Storage of recently seen keys for a :class:`Deduplicator`.
+
+    Implement this on top of a shared store, such as Redis ``SET key 1 NX EX ttl``, to
+    deduplicate across processes or hosts.
+    """
+
+    @abstractmethod
+    def add(self, key: str, ttl: float) -> bool:
+        """Remember ``key`` for ``ttl`` seconds. Returns False if it was already known."""
+
+    @abstractmethod
+    def discard(self, key: str):
+        """Forget ``key``, so that its next delivery is handled again."""
+
+
+class InMemoryDedupBackend(DedupBackend):
+    """
+    Process-local backend remembering at most ``max_size`` keys.
+
+    Keys are dropped once their TTL has passed, or earlier, oldest first, when the
+    cache is full.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self._expiry: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def add(self, key: str, ttl: float) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            expiry = self._expiry.get(key)
+            if expiry is not None and expiry > now:
+                return False
+            self._expiry[key] = now + ttl
+            self._expiry.move_to_end(key)
+            self._evict(now)
+            return True
+
+    def discard(self, key: str):
+        with self._lock:
+            self._expiry.pop(key, None)
+
+    def _evict(self, now: float):
+        # keys are ordered by insertion and share one TTL, so expired keys are at the front
+        expiry = self._expiry
+        while expiry and (len(expiry) > self.max_size or next(iter(expiry.values())) <= now):
+            expiry.popitem(last=False)
+
+
+class Deduplicator(object):
+    """
+    Recognizes redelivered events by their ``header.event_id``.
+
+    ``hits`` counts deliveries recognized as duplicates, ``misses`` first deliveries.
+    """
+
+    def __init__(self, backend: Optional[DedupBackend] = None, ttl: float = DEFAULT_TTL):
+        self.backend = backend if backend is not None else InMemoryDedupBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def is_duplicate(self, event_id: Optional[str]) -> bool:
+        """Record a delivery and tell whether its event was seen before."""
+        if not event_id:
+            return False
+        duplicate = not self.backend.add(event_id, self.ttl)
+        with self._lock:
+            if duplicate:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return duplicate
+
+    def forget(self, event_id: Optional[str]):
+        """Forget an event that was not handled, so that its redelivery is."""
+        if event_id:
+            self.backend.discard(event_id)
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of the hit and miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
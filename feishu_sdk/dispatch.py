@@ -0,0 +1,629 @@
+import asyncio
+import concurrent.futures
+import inspect
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import (
+    Any,
+    Callable,
+    Coroutine,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+# what BoundedExecutor.submit does when its queue is full
+REJECT = "reject"  # refuse the new task, the webhook answers 503 so Feishu redelivers later
+DROP_OLDEST = "drop_oldest"  # discard the oldest queued task to make room
+BLOCK = "block"  # wait until a worker frees a slot
+BACKPRESSURE_POLICIES = (REJECT, DROP_OLDEST, BLOCK)
+
+Task = Tuple[Callable[..., Any], Tuple[Any, ...]]
+# startup and shutdown hooks may be plain functions or coroutine functions
+Hook = Callable[[], Any]
+T = TypeVar("T")
+
+
+class BoundedExecutor(object):
+    """
+    Fixed-size pool of worker threads fed from a bounded queue.
+
+    Workers are started on demand up to ``max_workers`` and then reused for every
+    task. At most ``max_queue_size`` tasks wait for a worker; what happens to further
+    tasks is decided by the ``backpressure`` policy.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_queue_size: int = 1000,
+        backpressure: str = REJECT,
+        thread_name_prefix: str = "feishu-worker",
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(
+                "backpressure must be one of {}, got {!r}".format(
+                    ", ".join(BACKPRESSURE_POLICIES), backpressure
+                )
+            )
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.backpressure = backpressure
+        self._thread_name_prefix = thread_name_prefix
+        self._queue: Deque[Task] = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._workers: List[threading.Thread] = []
+        self._started = 0
+        self._idle = 0
+        self._active = 0
+        self._shutdown = False
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.dropped = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting for a worker."""
+        return len(self._queue)
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of the pool's counters."""
+        with self._lock:
+            return {
+                "queue_depth": len(self._queue),
+                "active": self._active,
+                "workers": len(self._workers),
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "dropped": self.dropped,
+            }
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Queue ``fn(*args)`` for a worker. Returns False if the task was rejected."""
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit to an executor that has been shut down")
+            if len(self._queue) >= self.max_queue_size:
+                if self.backpressure == REJECT:
+                    self.rejected += 1
+                    return False
+                if self.backpressure == DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.max_queue_size and not self._shutdown:
+                        self._not_full.wait()
+            self._queue.append((fn, args))
+            self.submitted += 1
+            if len(self._queue) > self._idle and len(self._workers) < self.max_workers:
+                self._start_worker()
+            self._not_empty.notify()
+        return True
+
+    def replace(self, worker: threading.Thread):
+        """
+        Stop counting ``worker`` against ``max_workers``, for a worker stuck in a task that
+        may never return. Another worker takes its place; the replaced one exits once its
+        task is done.
+        """
+        with self._lock:
+            if worker not in self._workers:
+                return
+            self._workers.remove(worker)
+            if not self._shutdown and len(self._queue) > self._idle:
+                self._start_worker()
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting tasks; workers exit once the queue is drained."""
+        with self._lock:
+            self._shutdown = True
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            workers = list(self._workers)
+        if wait:
+            for worker in workers:
+                if worker is not threading.current_thread():
+                    worker.join()
+
+    def _start_worker(self):
+        worker = threading.Thread(
+            target=self._work,
+            name="{}-{}".format(self._thread_name_prefix, self._started),
+            daemon=True,
+        )
+        self._started += 1
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while not self._queue and not self._shutdown:
+                    self._idle += 1
+                    self._not_empty.wait()
+                    self._idle -= 1
+                if not self._queue:
+                    return
+                fn, args = self._queue.popleft()
+                self._active += 1
+                self._not_full.notify()
+            try:
+                fn(*args)
+            except Exception:
+                logger.exception("Unhandled error in worker task")
+            finally:
+                with self._lock:
+                    self._active -= 1
+                    self.completed += 1
+                    replaced = threading.current_thread() not in self._workers
+            if replaced:
+                # another worker took over while this one was stuck in the task
+                return
+
+
+class KeyedExecutor(object):
+    """
+    Thread pool running tasks with the same key one at a time, in submission order.
+
+    Tasks with different keys run in parallel on up to ``max_workers`` threads. After
+    each task the worker moves on to the next key with work, so one busy key cannot
+    starve the others. A key's queue is dropped as soon as it is empty, so memory only
+    grows with the keys that have work pending. Tasks submitted without a key are not
+    ordered against anything.
+
+    At most ``max_queue_size`` tasks wait in total; beyond that the ``backpressure``
+    policy applies, "reject" or "block" (dropping a key's oldest task would break its
+    order, so "drop_oldest" is not supported).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_queue_size: int = 1000,
+        backpressure: str = REJECT,
+        thread_name_prefix: str = "feishu-worker",
+    ):
+        if backpressure not in (REJECT, BLOCK):
+            raise ValueError(
+                "backpressure must be one of {}, {}, got {!r}".format(REJECT, BLOCK, backpressure)
+            )
+        self.max_queue_size = max_queue_size
+        self.backpressure = backpressure
+        # the pool queue holds at most one runner per key with work, the bound is applied
+        # to the tasks waiting in the key queues instead
+        self._pool = BoundedExecutor(max_workers, sys.maxsize, REJECT, thread_name_prefix)
+        self._keys: Dict[Hashable, Deque[Task]] = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._idle = threading.Condition(self._lock)
+        self._shutdown = False
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of tasks waiting in the key queues."""
+        return self._pending
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of the pool's counters, with the number of keys that have work."""
+        metrics = self._pool.metrics()
+        with self._lock:
+            metrics.update(queue_depth=self._pending, keys=len(self._keys), rejected=self.rejected)
+        return metrics
+
+    def submit(self, fn: Callable[..., Any], *args: Any, key: Optional[Hashable] = None) -> bool:
+        """Queue ``fn(*args)`` behind the other tasks of ``key``. Returns False if rejected."""
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit to an executor that has been shut down")
+            while self._pending >= self.max_queue_size:
+                if self.backpressure == REJECT:
+                    self.rejected += 1
+                    return False
+                self._not_full.wait()
+                if self._shutdown:
+                    raise RuntimeError("cannot submit to an executor that has been shut down")
+            if key is None:
+                self._pending += 1
+                return self._pool.submit(self._run_unkeyed, fn, args)
+            tasks = self._keys.get(key)
+            self._pending += 1
+            if tasks is not None:
+                # a runner for this key is queued or running and will get to this task
+                tasks.append((fn, args))
+                return True
+            self._keys[key] = deque([(fn, args)])
+        return self._pool.submit(self._run_key, key)
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting tasks; with ``wait``, return once every queued task has run."""
+        with self._lock:
+            self._shutdown = True
+            self._not_full.notify_all()
+            if wait:
+                while self._pending:
+                    self._idle.wait()
+        self._pool.shutdown(wait=wait)
+
+    def _run_unkeyed(self, fn: Callable[..., Any], args: Tuple[Any, ...]):
+        try:
+            fn(*args)
+        finally:
+            self._task_done()
+
+    def _run_key(self, key: Hashable):
+        with self._lock:
+            fn, args = self._keys[key].popleft()
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("Unhandled error in worker task")
+        finally:
+            self._task_done()
+        with self._lock:
+            if not self._keys[key]:
+                del self._keys[key]
+                return
+        # go to the back of the pool queue, behind the other keys with work
+        try:
+            self._pool.submit(self._run_key, key)
+        except RuntimeError:
+            logger.warning("Executor shut down, dropping the queued tasks of key %r", key)
+
+    def _task_done(self):
+        with self._lock:
+            self._pending -= 1
+            self._not_full.notify()
+            if not self._pending:
+                self._idle.notify_all()
+
+
+class ProcessExecutor(object):
+    """
+    Pool of ``max_workers`` worker processes fed from a bounded queue.
+
+    Use it for CPU-bound tasks, which a thread pool would run one at a time under the
+    GIL. A task and its arguments are pickled in the calling thread, so they must be
+    picklable (functions defined at module level, not lambdas or closures) and errors
+    surface in :meth:`submit`. A full queue rejects the task.
+
+    A monitor thread checks every ``health_check_interval`` seconds that the workers are
+    alive and replaces those that died; a task a worker was running when it died is lost.
+
+    Workers are started with the ``forkserver`` method where available and ``spawn``
+    otherwise, not ``fork``: a forked child would inherit locks held by the parent's
+    threads, such as logging's, and could hang while still looking alive. Pass
+    ``mp_context`` to choose another start method.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_size: int = 1000,
+        health_check_interval: float = 1.0,
+        mp_context: Optional[Any] = None,
+        name_prefix: str = "feishu-process",
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_queue_size = max_queue_size
+        self.health_check_interval = health_check_interval
+        self._context = mp_context if mp_context is not None else _default_mp_context()
+        self._name_prefix = name_prefix
+        self._queue = self._context.Queue(max_queue_size)
+        self._lock = threading.Lock()
+        self._workers: List[Any] = []
+        self._monitor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._shutdown = False
+        self.submitted = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of the pool's counters."""
+        try:
+            queue_depth = self._queue.qsize()
+        except NotImplementedError:
+            # not available on macOS
+            queue_depth = -1
+        with self._lock:
+            return {
+                "queue_depth": queue_depth,
+                "workers": sum(1 for worker in self._workers if worker.is_alive()),
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+            }
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> bool:
+        """Queue ``fn(*args)`` for a worker process. Returns False if the queue is full."""
+        payload = pickle.dumps((fn, args), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot submit to an executor that has been shut down")
+            if not self._workers:
+                self._start()
+            try:
+                self._queue.put_nowait(payload)
+            except queue.Full:
+                self.rejected += 1
+                return False
+            self.submitted += 1
+        return True
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting tasks; workers exit once the queue is drained."""
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self._stopping.set()
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(None)
+        if self._monitor is not None:
+            self._monitor.join()
+        if wait:
+            for worker in workers:
+                worker.join()
+        self._queue.close()
+
+    def _start(self):
+        # called with the lock held
+        for index in range(self.max_workers):
+            self._workers.append(self._spawn(index))
+        self._monitor = threading.Thread(
+            target=self._check_health, name=self._name_prefix + "-monitor", daemon=True
+        )
+        self._monitor.start()
+
+    def _spawn(self, index: int):
+        worker = self._context.Process(
+            target=_process_worker,
+            args=(self._queue,),
+            name="{}-{}".format(self._name_prefix, index),
+            daemon=True,
+        )
+        worker.start()
+        return worker
+
+    def _check_health(self):
+        while not self._stopping.wait(self.health_check_interval):
+            with self._lock:
+                if self._shutdown:
+                    return
+                for index, worker in enumerate(self._workers):
+                    if worker.is_alive():
+                        continue
+                    logger.warning(
+                        "Worker process %s exited with code %s, restarting it",
+                        worker.name,
+                        worker.exitcode,
+                    )
+                    self._workers[index] = self._spawn(index)
+                    self.restarts += 1
+
+
+def _default_mp_context() -> Any:
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _process_worker(tasks: Any):
+    while True:
+        payload = tasks.get()
+        if payload is None:
+            return
+        try:
+            fn, args = pickle.loads(payload)
+            fn(*args)
+        except Exception:
+            logger.exception("Unhandled error in worker process task")
+
+
+class EventLoopThread(object):
+    """
+    A long-lived asyncio event loop running in a dedicated daemon thread.
+
+    Coroutines from any thread are scheduled on it with :meth:`submit` or :meth:`run`,
+    so async handlers share one loop, and with it loop-bound resources such as a pooled
+    ``AsyncMessageApiClient``. The loop starts on first use; ``startup_hooks`` run on it
+    before anything else, ``shutdown_hooks`` run on it when :meth:`stop` is called.
+    """
+
+    def __init__(
+        self,
+        startup_hooks: Optional[List[Hook]] = None,
+        shutdown_hooks: Optional[List[Hook]] = None,
+        name: str = "feishu-event-loop",
+    ):
+        self.startup_hooks = startup_hooks if startup_hooks is not None else []
+        self.shutdown_hooks = shutdown_hooks if shutdown_hooks is not None else []
+        self._name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        """Start the loop thread and run the startup hooks, if not done already."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            thread = threading.Thread(
+                target=self._run_loop, args=(loop, ready), name=self._name, daemon=True
+            )
+            thread.start()
+            ready.wait()
+            for hook in self.startup_hooks:
+                asyncio.run_coroutine_threadsafe(_call_hook(hook), loop).result()
+            self._loop = loop
+            self._thread = thread
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedule a coroutine on the loop and return a future for its result."""
+        self.start()
+        loop = self._loop
+        assert loop is not None
+        return asyncio.run_coroutine_threadsafe(coro, loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block until it completes."""
+        return self.submit(coro).result(timeout)
+
+    def stop(self):
+        """Run the shutdown hooks, then stop and close the loop."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or thread is None:
+                return
+            for hook in self.shutdown_hooks:
+                try:
+                    asyncio.run_coroutine_threadsafe(_call_hook(hook), loop).result()
+                except Exception:
+                    logger.exception("Error in event loop shutdown hook")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            self._loop = None
+            self._thread = None
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        try:
+            loop.run_forever()
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+
+class SlowCallMonitor(object):
+    """
+    Logs calls still running ``threshold`` seconds after they started.
+
+    Each slow call is logged once, as a warning with its name, the id of the event it is
+    handling and the stack it is in at that moment: the stack of its thread for a plain
+    call, the chain of awaiting coroutines for a coroutine. One daemon thread, started
+    with the first call, checks the calls in flight every ``threshold / 2`` seconds.
+    """
+
+    def __init__(self, threshold: float, name: str = "feishu-slow-call-monitor"):
+        if threshold <= 0:
+            raise ValueError("threshold must be positive")
+        self.threshold = threshold
+        self._name = name
+        # token -> [start, name, event id, thread id or coroutine, already logged]
+        self._calls: Dict[int, List[Any]] = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.slow = 0
+
+    def begin(
+        self, name: str, event_id: Optional[str], source: Union[int, Coroutine[Any, Any, Any]]
+    ) -> int:
+        """Watch a call running on the thread with id ``source``, or as coroutine ``source``."""
+        with self._lock:
+            if self._thread is None and not self._stopping.is_set():
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+            token = self._next_token
+            self._next_token += 1
+            self._calls[token] = [time.monotonic(), name, event_id, source, False]
+        return token
+
+    def end(self, token: int):
+        """Stop watching a call."""
+        with self._lock:
+            self._calls.pop(token, None)
+
+    def stop(self):
+        """Stop the checking thread."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def check(self):
+        """Log the calls that have become slow since the last check."""
+        now = time.monotonic()
+        with self._lock:
+            slow = [
+                call
+                for call in self._calls.values()
+                if not call[4] and now - call[0] >= self.threshold
+            ]
+            for call in slow:
+                call[4] = True
+            self.slow += len(slow)
+        # the stack is taken outside the lock; a call that just ended may show its thread
+        # already doing something else
+        for start, name, event_id, source, _ in slow:
+            logger.warning(
+                "Handler %s still running after %.1fs on event %s, at:\n%s",
+                name,
+                now - start,
+                event_id,
+                _format_stack(source),
+            )
+
+    def _run(self):
+        while not self._stopping.wait(self.threshold / 2):
+            self.check()
+
+
+def _format_stack(source: Union[int, Coroutine[Any, Any, Any]]) -> str:
+    if isinstance(source, int):
+        frame = sys._current_frames().get(source)
+        return "".join(traceback.format_stack(frame)) if frame is not None else ""
+    frames = []
+    coroutine: Any = source
+    while getattr(coroutine, "cr_frame", None) is not None:
+        frames.append((coroutine.cr_frame, coroutine.cr_frame.f_lineno))
+        coroutine = coroutine.cr_await
+    return "".join(traceback.StackSummary.extract(frames).format())
+
+
+async def _call_hook(hook: Hook):
+    result = hook()
+    if inspect.isawaitable(result):
+        await result
@@ -1,3 +1,4 @@
+from .models import EVENT_MODELS, Header
 from .utils import dict_2_obj
 
 
@@ -11,8 +12,14 @@ class Event(object):
         event = dict_data.get("event")
         if header is None or event is None:
             raise InvalidEventException("request is not callback event(v2)")
-        self.header = dict_2_obj(header)
-        self.event = dict_2_obj(event)
+        self.header = Header.from_dict(header)
+        # typed models for the hot event types, generic Obj for the rest
+        model = EVENT_MODELS.get(self.header.event_type)
+        self.event = model.from_dict(event) if model is not None else dict_2_obj(event)
+
+    def to_dict(self):
+        # the event in the layout of a v2 callback payload, e.g. to hand it to another process
+        return {"header": self.header.to_dict(), "event": self.event.to_dict()}
 
 
 class InvalidEventException(Exception):
@@ -0,0 +1,165 @@
+"""
+Middleware wrapping webhook handlers.
+
+A middleware is a function taking a handler and returning a handler with the same
+signature: a coroutine function for a coroutine function, a plain function otherwise.
+:func:`compose` applies a chain when the handler is registered, so at dispatch time there
+is nothing left to interpret: a handler with an empty chain is called as is, and a chain
+costs one function call per middleware.
+
+The built-in middlewares work for sync and async handlers alike::
+
+    webhook = WebhookHandler(app, middleware=[capture_errors(), timing()])
+"""
+
+import asyncio
+import functools
+import logging
+import random
+import time
+import zlib
+from typing import Callable, Optional, Sequence
+
+from .event import Event
+
+logger = logging.getLogger(__name__)
+
+Middleware = Callable[[Callable], Callable]
+
+
+def compose(handler: Callable, middleware: Sequence[Middleware]) -> Callable:
+    """Wrap ``handler`` in ``middleware``, the first one outermost."""
+    is_async = asyncio.iscoroutinefunction(handler)
+    for wrap in reversed(middleware):
+        handler = wrap(handler)
+        if asyncio.iscoroutinefunction(handler) != is_async:
+            raise TypeError(
+                "middleware {!r} must return a coroutine function for a coroutine function "
+                "handler and a plain function otherwise".format(wrap)
+            )
+    return handler
+
+
+def timing(record: Optional[Callable[[Event, float], None]] = None) -> Middleware:
+    """
+    Measure how long the handler takes.
+
+    ``record(event, seconds)`` is called after every call, failed ones included; by default
+    the duration is logged at DEBUG level.
+    """
+    if record is None:
+        record = _log_timing
+
+    def middleware(handler: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(handler):
+
+            @functools.wraps(handler)
+            async def timed_coroutine(event: Event):
+                start = time.perf_counter()
+                try:
+                    return await handler(event)
+                finally:
+                    record(event, time.perf_counter() - start)
+
+            return timed_coroutine
+
+        @functools.wraps(handler)
+        def timed(event: Event):
+            start = time.perf_counter()
+            try:
+                return handler(event)
+            finally:
+                record(event, time.perf_counter() - start)
+
+        return timed
+
+    return middleware
+
+
+def _log_timing(event: Event, seconds: float):
+    logger.debug(
+        "Handled event %s (%s) in %.2f ms",
+        event.header.event_id,
+        event.header.event_type,
+        seconds * 1000,
+    )
+
+
+def capture_errors(on_error: Optional[Callable[[Event, Exception], None]] = None) -> Middleware:
+    """
+    Stop exceptions raised by the handler from propagating.
+
+    ``on_error(event, exception)`` is called with each one, for example to report it to an
+    error tracker; by default it is logged with its traceback.
+    """
+    if on_error is None:
+        on_error = _log_error
+
+    def middleware(handler: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(handler):
+
+            @functools.wraps(handler)
+            async def guarded_coroutine(event: Event):
+                try:
+                    return await handler(event)
+                except Exception as e:
+                    on_error(event, e)
+
+            return guarded_coroutine
+
+        @functools.wraps(handler)
+        def guarded(event: Event):
+            try:
+                return handler(event)
+            except Exception as e:
+                on_error(event, e)
+
+        return guarded
+
+    return middleware
+
+
+def _log_error(event: Event, error: Exception):
+    logger.error(
+        "Error handling event %s (%s)",
+        event.header.event_id,
+        event.header.event_type,
+        exc_info=error,
+    )
+
+
+def sample(rate: float) -> Middleware:
+    """
+    Call the handler for about ``rate`` (0 to 1) of the events and skip the others.
+
+    Events are picked by a hash of their ``event_id``, so a redelivered event gets the
+    same decision as the first delivery; events without an id are picked at random.
+    """
+    if not 0 <= rate <= 1:
+        raise ValueError("rate must be between 0 and 1, got {!r}".format(rate))
+    threshold = int(rate * 2**32)
+
+    def picked(event: Event) -> bool:
+        event_id = event.header.event_id
+        if event_id is None:
+            return random.random() < rate
+        return zlib.crc32(event_id.encode("utf-8")) < threshold
+
+    def middleware(handler: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(handler):
+
+            @functools.wraps(handler)
+            async def sampled_coroutine(event: Event):
+                if picked(event):
+                    return await handler(event)
+
+            return sampled_coroutine
+
+        @functools.wraps(handler)
+        def sampled(event: Event):
+            if picked(event):
+                return handler(event)
+
+        return sampled
+
+    return middleware
@@ -0,0 +1,261 @@
+from typing import Any, Dict, Generic, List, Mapping, Optional, Tuple, Type, TypeVar, overload
+
+# event types decoded into the typed models below instead of the generic Obj
+EVENT_TYPE_MESSAGE_RECEIVE = "im.message.receive_v1"
+
+
+T = TypeVar("T")
+M = TypeVar("M", bound="Model")
+
+
+class Field(Generic[T]):
+    """
+    A payload key of a model, read and written as an attribute.
+
+    Fields holding another model (``many`` for a list of them) are converted when the
+    payload is decoded, so reading them costs a dict lookup like any other field.
+    """
+
+    __slots__ = ("name", "model", "many")
+
+    def __init__(self, model: Optional[Type["Model"]] = None, many: bool = False):
+        self.name = ""
+        self.model = model
+        self.many = many
+
+    def __set_name__(self, owner: Type["Model"], name: str):
+        self.name = name
+        owner._fields = owner._fields + (name,)
+        if self.model is not None:
+            owner._nested = owner._nested + (self,)
+
+    @overload
+    def __get__(self, instance: None, owner: Any) -> "Field[T]": ...
+
+    @overload
+    def __get__(self, instance: "Model", owner: Any) -> Optional[T]: ...
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.get(self.name)
+
+    def __set__(self, instance: "Model", value: Optional[T]):
+        if value is None:
+            instance.pop(self.name, None)
+        else:
+            instance[self.name] = value
+
+
+class Model(dict):
+    """
+    Base class of the typed event models.
+
+    A model is the decoded payload object itself, a dict, with its known keys declared as
+    typed :class:`Field` attributes. Keys the model does not declare are kept as they are,
+    so ``len()``, ``.get()``, ``[]`` and ``json.dumps()`` see the whole payload. Models
+    use ``__slots__ = ()``: an instance has no ``__dict__`` besides its items, and
+    declared fields missing from the payload read as None.
+    """
+
+    __slots__ = ()
+
+    # declared field names, in declaration order
+    _fields: Tuple[str, ...] = ()
+    # declared fields holding nested models
+    _nested: Tuple[Field, ...] = ()
+
+    @overload
+    @classmethod
+    def from_dict(cls: Type[M], d: Mapping[str, Any]) -> M: ...
+
+    @overload
+    @classmethod
+    def from_dict(cls: Type[M], d: None) -> None: ...
+
+    @classmethod
+    def from_dict(cls, d):
+        """Decode a payload object, or return None for a missing one."""
+        if d is None:
+            return None
+        model = cls.__new__(cls)
+        dict.update(model, d)
+        for field in cls._nested:
+            value = dict.get(model, field.name)
+            if value is not None:
+                nested = field.model.from_dict
+                model[field.name] = [nested(v) for v in value] if field.many else nested(value)
+        return model
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the payload as plain dicts and lists, undeclared keys included."""
+        result: Dict[str, Any] = {}
+        for name, value in self.items():
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [item.to_dict() if isinstance(item, Model) else item for item in value]
+            result[name] = value
+        return result
+
+    def __repr__(self):
+        fields = ", ".join("{}={!r}".format(name, getattr(self, name)) for name in self._fields)
+        return "{}({})".format(type(self).__name__, fields)
+
+
+class Header(Model):
+    """Header of a v2 callback event"""
+
+    __slots__ = ()
+
+    event_id = Field[str]()
+    event_type = Field[str]()
+    create_time = Field[str]()
+    token = Field[str]()
+    app_id = Field[str]()
+    tenant_key = Field[str]()
+
+    def __init__(
+        self,
+        event_id: Optional[str] = None,
+        event_type: Optional[str] = None,
+        create_time: Optional[str] = None,
+        token: Optional[str] = None,
+        app_id: Optional[str] = None,
+        tenant_key: Optional[str] = None,
+    ):
+        self.event_id = event_id
+        self.event_type = event_type
+        self.create_time = create_time
+        self.token = token
+        self.app_id = app_id
+        self.tenant_key = tenant_key
+
+
+class UserId(Model):
+    """The ids of one user: open_id, user_id and union_id"""
+
+    __slots__ = ()
+
+    open_id = Field[str]()
+    user_id = Field[str]()
+    union_id = Field[str]()
+
+    def __init__(
+        self,
+        open_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        union_id: Optional[str] = None,
+    ):
+        self.open_id = open_id
+        self.user_id = user_id
+        self.union_id = union_id
+
+
+class Sender(Model):
+    """Sender of a received message"""
+
+    __slots__ = ()
+
+    sender_id = Field[UserId](UserId)
+    sender_type = Field[str]()
+    tenant_key = Field[str]()
+
+    def __init__(
+        self,
+        sender_id: Optional[UserId] = None,
+        sender_type: Optional[str] = None,
+        tenant_key: Optional[str] = None,
+    ):
+        self.sender_id = sender_id
+        self.sender_type = sender_type
+        self.tenant_key = tenant_key
+
+
+class Mention(Model):
+    """A user mentioned in a message, referenced from its content by ``key``"""
+
+    __slots__ = ()
+
+    key = Field[str]()
+    id = Field[UserId](UserId)
+    name = Field[str]()
+    tenant_key = Field[str]()
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        id: Optional[UserId] = None,
+        name: Optional[str] = None,
+        tenant_key: Optional[str] = None,
+    ):
+        self.key = key
+        self.id = id
+        self.name = name
+        self.tenant_key = tenant_key
+
+
+class Message(Model):
+    """A received message; ``content`` is the JSON string sent by Feishu"""
+
+    __slots__ = ()
+
+    message_id = Field[str]()
+    root_id = Field[str]()
+    parent_id = Field[str]()
+    create_time = Field[str]()
+    update_time = Field[str]()
+    chat_id = Field[str]()
+    thread_id = Field[str]()
+    chat_type = Field[str]()
+    message_type = Field[str]()
+    content = Field[str]()
+    mentions = Field[List[Mention]](Mention, many=True)
+    user_agent = Field[str]()
+
+    def __init__(
+        self,
+        message_id: Optional[str] = None,
+        root_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        create_time: Optional[str] = None,
+        update_time: Optional[str] = None,
+        chat_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        chat_type: Optional[str] = None,
+        message_type: Optional[str] = None,
+        content: Optional[str] = None,
+        mentions: Optional[List[Mention]] = None,
+        user_agent: Optional[str] = None,
+    ):
+        self.message_id = message_id
+        self.root_id = root_id
+        self.parent_id = parent_id
+        self.create_time = create_time
+        self.update_time = update_time
+        self.chat_id = chat_id
+        self.thread_id = thread_id
+        self.chat_type = chat_type
+        self.message_type = message_type
+        self.content = content
+        self.mentions = mentions
+        self.user_agent = user_agent
+
+
+class MessageReceiveEvent(Model):
+    """Body of an ``im.message.receive_v1`` event"""
+
+    __slots__ = ()
+
+    sender = Field[Sender](Sender)
+    message = Field[Message](Message)
+
+    def __init__(self, sender: Optional[Sender] = None, message: Optional[Message] = None):
+        self.sender = sender
+        self.message = message
+
+
+# event type -> model of the event body
+EVENT_MODELS = {
+    EVENT_TYPE_MESSAGE_RECEIVE: MessageReceiveEvent,
+}
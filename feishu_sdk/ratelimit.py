@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+# endpoint keys understood by RateLimiter
+ENDPOINT_MESSAGE_CREATE = "message.create"
+ENDPOINT_MESSAGE_PATCH = "message.patch"
+ENDPOINT_TOKEN = "token"
+
+# (requests per second, burst size)
+Limit = Tuple[float, float]
+
+# Feishu allows 1000 requests/min and 50 requests/s per app on the message endpoints,
+# and 5 QPS towards a single user or chat.
+# doc link: https://open.feishu.cn/document/server-docs/im-v1/message/create
+DEFAULT_ENDPOINT_LIMITS: Dict[str, Limit] = {
+    ENDPOINT_MESSAGE_CREATE: (1000 / 60, 50),
+    ENDPOINT_MESSAGE_PATCH: (1000 / 60, 50),
+}
+DEFAULT_RECEIVE_ID_LIMIT: Limit = (5, 5)
+
+
+class TokenBucket(object):
+    """
+    Token bucket allowing ``rate`` acquisitions per second, with bursts of up to ``capacity``.
+
+    An acquisition reserves its slot under a lock and waits outside of it, so callers queue
+    up in arrival order and one bucket can be shared between threads and coroutines.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity if capacity is not None else rate, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds the caller has to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter(object):
+    """
+    Client-side rate limits for Feishu API calls.
+
+    Every call is checked against the bucket of its endpoint and, when a key is given, a
+    bucket of its own for that key: the receive_id for message create and the message_id
+    for message patch. Calls over the limit wait for a free slot instead of failing.
+
+    Buckets for individual keys are kept for the ``max_keys`` most recently used keys; an
+    evicted bucket would have refilled to full anyway by the time it is needed again.
+    One limiter can be shared by several sync and async clients of the same app.
+    """
+
+    def __init__(
+        self,
+        endpoint_limits: Optional[Dict[str, Limit]] = None,
+        receive_id_limit: Optional[Limit] = DEFAULT_RECEIVE_ID_LIMIT,
+        max_keys: int = 10000,
+    ):
+        if endpoint_limits is None:
+            endpoint_limits = DEFAULT_ENDPOINT_LIMITS
+        self._endpoint_buckets = {
+            endpoint: TokenBucket(rate, burst)
+            for endpoint, (rate, burst) in endpoint_limits.items()
+        }
+        self._receive_id_limit = receive_id_limit
+        self._max_keys = max_keys
+        self._key_buckets: "OrderedDict[Tuple[str, Hashable], TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def reserve(self, endpoint: str, key: Optional[Hashable] = None) -> float:
+        """Reserve a slot for one call and return how many seconds to wait before making it."""
+        return max((bucket.reserve() for bucket in self._buckets(endpoint, key)), default=0.0)
+
+    def acquire(self, endpoint: str, key: Optional[Hashable] = None):
+        """Block until a call to ``endpoint`` is allowed."""
+        delay = self.reserve(endpoint, key)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, endpoint: str, key: Optional[Hashable] = None):
+        """Wait without blocking the event loop until a call to ``endpoint`` is allowed."""
+        delay = self.reserve(endpoint, key)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def _buckets(self, endpoint: str, key: Optional[Hashable]) -> List[TokenBucket]:
+        buckets = []
+        endpoint_bucket = self._endpoint_buckets.get(endpoint)
+        if endpoint_bucket is not None:
+            buckets.append(endpoint_bucket)
+        limit = self._receive_id_limit
+        if key is not None and limit is not None:
+            buckets.append(self._key_bucket(endpoint, key, limit))
+        return buckets
+
+    def _key_bucket(self, endpoint: str, key: Hashable, limit: Limit) -> TokenBucket:
+        with self._lock:
+            bucket = self._key_buckets.get((endpoint, key))
+            if bucket is None:
+                bucket = TokenBucket(*limit)
+                self._key_buckets[(endpoint, key)] = bucket
+                if len(self._key_buckets) > self._max_keys:
+                    self._key_buckets.popitem(last=False)
+            else:
+                self._key_buckets.move_to_end((endpoint, key))
+            return bucket
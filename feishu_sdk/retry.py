@@ -0,0 +1,101 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Mapping, Optional
+
+# Feishu error codes signalling a frequency limit or a transient server-side failure
+DEFAULT_RETRYABLE_CODES = frozenset(
+    {
+        11232,  # create message trigger rate limit
+        230020,  # this operation triggers the frequency limit
+        99991400,  # request trigger frequency limit
+    }
+)
+DEFAULT_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class RetryPolicy(object):
+    """
+    When and how often a failed Feishu API call is retried.
+
+    A call is retried when the HTTP status is in ``retryable_status`` or the response
+    ``code`` is in ``retryable_codes``, up to ``max_attempts`` attempts in total and only
+    while the next attempt would still start within ``deadline`` seconds of the first one.
+
+    Between attempts the client sleeps for the time the server asks for through the
+    ``Retry-After`` or ``x-ogw-ratelimit-reset`` headers, or otherwise for a decorrelated
+    jitter backoff between ``base_delay`` and ``max_delay`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        retryable_codes: Iterable[int] = DEFAULT_RETRYABLE_CODES,
+        retryable_status: Iterable[int] = DEFAULT_RETRYABLE_STATUS,
+        base_delay: float = 0.2,
+        max_delay: float = 10.0,
+        deadline: float = 30.0,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.retryable_codes = frozenset(retryable_codes)
+        self.retryable_status = frozenset(retryable_status)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def start(self) -> "RetryState":
+        """Begin tracking the attempts of one call."""
+        return RetryState(self)
+
+    def is_retryable(self, status_code: int, code: Optional[int]) -> bool:
+        return status_code in self.retryable_status or code in self.retryable_codes
+
+
+class RetryState(object):
+    """Attempt count, backoff and deadline of one call made under a RetryPolicy."""
+
+    def __init__(self, policy: RetryPolicy):
+        self._policy = policy
+        self._deadline = time.monotonic() + policy.deadline
+        self._delay = policy.base_delay
+        self.attempt = 1
+
+    def next_delay(
+        self, status_code: int, code: Optional[int], headers: Mapping[str, str]
+    ) -> Optional[float]:
+        """Return how long to sleep before the next attempt, or None if the call should fail."""
+        policy = self._policy
+        if self.attempt >= policy.max_attempts or not policy.is_retryable(status_code, code):
+            return None
+        delay = server_delay(headers)
+        if delay is None:
+            # decorrelated jitter: each sleep is drawn between the base delay and 3x the previous
+            self._delay = min(policy.max_delay, random.uniform(policy.base_delay, self._delay * 3))
+            delay = self._delay
+        if time.monotonic() + delay > self._deadline:
+            return None
+        self.attempt += 1
+        return delay
+
+
+def server_delay(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds the server asked the client to wait, from Retry-After or x-ogw-ratelimit-reset."""
+    parsed = [_parse_delay(headers.get(name)) for name in ("Retry-After", "x-ogw-ratelimit-reset")]
+    delays = [delay for delay in parsed if delay is not None]
+    return max(delays) if delays else None
+
+
+def _parse_delay(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    # Retry-After may also be an HTTP date
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,61 @@
+import re
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Pattern, Tuple
+
+# lookups are memoized per key; the memo is dropped if a flood of unknown keys grows it
+_MAX_CACHED_KEYS = 1024
+
+
+class Router(Mapping[str, Tuple[Callable, ...]]):
+    """
+    Handlers registered by event or message type, any number per pattern.
+
+    A pattern is an exact type such as ``im.chat.disbanded_v1``, or contains ``*``
+    wildcards matching any run of characters: ``im.chat.*`` for every chat event, ``*``
+    for everything. The handlers for a type are those of every matching pattern, in
+    registration order. As a mapping, the router maps each pattern to the handlers
+    registered under it.
+
+    :meth:`handlers_for` resolves a type once and memoizes the result until the next
+    registration, so once handlers are registered dispatch is a dict lookup and never
+    scans the patterns.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: Dict[str, List[Callable]] = {}
+        # (pattern, compiled pattern for wildcards, handler) in registration order
+        self._routes: List[Tuple[str, Optional[Pattern[str]], Callable]] = []
+        self._cache: Dict[str, Tuple[Callable, ...]] = {}
+
+    def __getitem__(self, pattern: str) -> Tuple[Callable, ...]:
+        return tuple(self._handlers[pattern])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._handlers)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def add(self, pattern: str, handler: Callable):
+        """Register ``handler`` for the types matching ``pattern``."""
+        regex = None
+        if "*" in pattern:
+            regex = re.compile(".*".join(re.escape(part) for part in pattern.split("*")) + r"\Z")
+        self._handlers.setdefault(pattern, []).append(handler)
+        self._routes.append((pattern, regex, handler))
+        self._cache = {}
+
+    def handlers_for(self, key: str) -> Tuple[Callable, ...]:
+        """Return the handlers for a type, in registration order."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        handlers = tuple(
+            handler
+            for pattern, regex, handler in self._routes
+            if (regex.match(key) if regex is not None else pattern == key)
+        )
+        if len(self._cache) >= _MAX_CACHED_KEYS:
+            self._cache = {}
+        self._cache[key] = handlers
+        return handlers
@@ -0,0 +1,373 @@
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from typing import IO, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (segment number, byte offset in the segment)
+Position = Tuple[int, int]
+
+# record header: body length and CRC32 of the body, both unsigned 32-bit big-endian
+_HEADER = struct.Struct(">II")
+_SEGMENT_SUFFIX = ".log"
+_CHECKPOINT = "checkpoint"
+
+
+class Spool(object):
+    """
+    Write-ahead log of webhook bodies, kept in ``directory``.
+
+    Records are appended to numbered segment files as a length and CRC32 header followed
+    by the body. A new segment is started once the current one reaches ``segment_size``
+    bytes. :meth:`append` returns only after the record has been fsynced; concurrent
+    appenders share one fsync (group commit), so the number of fsyncs grows with the
+    number of write bursts rather than with the number of records.
+
+    Readers see records up to the last fsynced one. The position up to which records
+    have been handled is stored with :meth:`commit`; fully handled segments are deleted.
+    A torn record left at the end of the log by a crash is truncated when it is opened;
+    corrupt records elsewhere are kept on disk and skipped by readers.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 64 * 1024 * 1024, fsync: bool = True):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_size = segment_size
+        self._fsync = fsync
+        self._write_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._durable_cond = threading.Condition()
+        segments = self.segments()
+        self._segment = segments[-1] if segments else 0
+        offset = self._recover(self._segment) if segments else 0
+        self._file: IO[bytes] = open(self._path(self._segment), "ab")
+        self._offset = offset
+        self._retired: List[IO[bytes]] = []
+        self._seq = 0
+        self._synced_seq = 0
+        self._durable: Position = (self._segment, offset)
+        self._closed = False
+        self.appended = 0
+        self.syncs = 0
+
+    def segments(self) -> List[int]:
+        """Numbers of the segment files on disk, oldest first."""
+        return sorted(
+            int(name[: -len(_SEGMENT_SUFFIX)])
+            for name in os.listdir(self.directory)
+            if name.endswith(_SEGMENT_SUFFIX)
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def durable_position(self) -> Position:
+        """Position right after the last fsynced record."""
+        return self._durable
+
+    def metrics(self) -> Dict[str, int]:
+        """Snapshot of the spool's counters."""
+        return {"appended": self.appended, "syncs": self.syncs, "segments": len(self.segments())}
+
+    def append(self, body: bytes):
+        """Append one record and return once it is on disk."""
+        record = _HEADER.pack(len(body), zlib.crc32(body)) + body
+        with self._write_lock:
+            if self._closed:
+                raise RuntimeError("cannot append to a closed spool")
+            if self._offset >= self.segment_size:
+                self._rotate()
+            self._file.write(record)
+            self._offset += len(record)
+            self._seq += 1
+            self.appended += 1
+            seq = self._seq
+        self._sync(seq)
+
+    def read(self, position: Position) -> Iterator[Tuple[Optional[bytes], Position]]:
+        """
+        Yield ``(body, position after it)`` for every durable record from ``position`` on.
+
+        Corrupt data is skipped and yielded as ``(None, position after it)``, so the reader
+        moves past it: a record failing its checksum is skipped by its length, and when the
+        length itself is unusable the rest of the segment is.
+        """
+        segment, offset = position
+        durable = self._durable
+        while (segment, offset) < durable:
+            try:
+                f = open(self._path(segment), "rb")
+            except FileNotFoundError:
+                f = None
+            if f is not None:
+                with f:
+                    f.seek(offset)
+                    while (segment, offset) < durable:
+                        try:
+                            body = _read_record(f)
+                        except _CorruptRecord as e:
+                            logger.warning(
+                                "Skipping corrupt spool record at %s:%s", segment, offset
+                            )
+                            offset += e.size
+                            yield None, (segment, offset)
+                            continue
+                        except ValueError:
+                            # the records after this one cannot be found, resync to the
+                            # start of the next segment or to the end of the log
+                            logger.warning(
+                                "Skipping the rest of spool segment %s from a corrupt record "
+                                "at %s",
+                                segment,
+                                offset,
+                            )
+                            if segment >= durable[0]:
+                                yield None, durable
+                                return
+                            yield None, (segment + 1, 0)
+                            break
+                        if body is None:
+                            break
+                        offset += _HEADER.size + len(body)
+                        yield body, (segment, offset)
+            if segment >= durable[0]:
+                return
+            segment, offset = segment + 1, 0
+
+    def wait(self, position: Position, timeout: Optional[float] = None) -> bool:
+        """Wait until there are durable records after ``position``. Returns False on timeout."""
+        with self._durable_cond:
+            return self._durable_cond.wait_for(
+                lambda: self._durable > position or self._closed, timeout
+            ) and (self._durable > position)
+
+    def load_checkpoint(self) -> Position:
+        """Position up to which records have been handled, the start of the log if unknown."""
+        try:
+            with open(os.path.join(self.directory, _CHECKPOINT)) as f:
+                segment, offset = f.read().split()
+                return int(segment), int(offset)
+        except FileNotFoundError:
+            segments = self.segments()
+            return (segments[0] if segments else 0), 0
+
+    def commit(self, position: Position):
+        """Store ``position`` as handled and delete the segments before it."""
+        path = os.path.join(self.directory, _CHECKPOINT)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("{} {}".format(*position))
+            f.flush()
+            if self._fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        for segment in self.segments():
+            if segment >= position[0]:
+                break
+            os.remove(self._path(segment))
+
+    def close(self):
+        """Flush and fsync pending records, then close the current segment."""
+        with self._write_lock:
+            if self._closed:
+                return
+            self._closed = True
+            seq = self._seq
+        self._sync(seq)
+        self._file.close()
+        with self._durable_cond:
+            self._durable_cond.notify_all()
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, "{:020d}{}".format(segment, _SEGMENT_SUFFIX))
+
+    def _rotate(self):
+        # called with the write lock held; the old file is closed by the next sync, after
+        # its last records have been fsynced
+        self._file.flush()
+        self._retired.append(self._file)
+        self._segment += 1
+        self._offset = 0
+        self._file = open(self._path(self._segment), "ab")
+
+    def _sync(self, seq: int):
+        with self._sync_lock:
+            if self._synced_seq >= seq:
+                # another appender's fsync already covered this record
+                return
+            with self._write_lock:
+                self._file.flush()
+                files = self._retired + [self._file]
+                self._retired = []
+                target_seq = self._seq
+                position = (self._segment, self._offset)
+            if self._fsync:
+                for f in files:
+                    os.fsync(f.fileno())
+            for f in files[:-1]:
+                f.close()
+            self._synced_seq = target_seq
+            self.syncs += 1
+            with self._durable_cond:
+                self._durable = position
+                self._durable_cond.notify_all()
+
+    def _recover(self, segment: int) -> int:
+        # truncate a record torn by a crash at the end of the last segment. a corrupt
+        # record followed by more data is not a torn tail, it is kept for read() to skip
+        path = self._path(segment)
+        size = os.path.getsize(path)
+        offset = 0
+        with open(path, "rb") as f:
+            while True:
+                try:
+                    body = _read_record(f)
+                except _CorruptRecord as e:
+                    if offset + e.size >= size:
+                        break
+                    offset += e.size
+                    continue
+                except ValueError:
+                    break
+                if body is None:
+                    break
+                offset += _HEADER.size + len(body)
+        if offset != size:
+            logger.warning("Truncating torn spool record at %s:%s", segment, offset)
+            with open(path, "r+b") as f:
+                f.truncate(offset)
+        return offset
+
+
+class _CorruptRecord(ValueError):
+    """A complete record whose body does not match its checksum"""
+
+    def __init__(self, size: int):
+        super().__init__("corrupt record")
+        # length of the record including its header
+        self.size = size
+
+
+def _read_record(f: IO[bytes]) -> Optional[bytes]:
+    # returns None at the end of the file, raises _CorruptRecord for a record failing its
+    # checksum and ValueError for a record cut short
+    header = f.read(_HEADER.size)
+    if not header:
+        return None
+    if len(header) < _HEADER.size:
+        raise ValueError("torn record header")
+    length, crc = _HEADER.unpack(header)
+    body = f.read(length)
+    if len(body) < length:
+        raise ValueError("torn record")
+    if zlib.crc32(body) != crc:
+        raise _CorruptRecord(_HEADER.size + length)
+    return body
+
+
+class SpoolConsumer(object):
+    """
+    Thread draining a :class:`Spool` into ``dispatch`` with at-least-once semantics.
+
+    ``dispatch(body, done)`` takes one record and returns False if it cannot be taken on
+    right now, in which case it is offered again after ``poll_interval``. It must call
+    ``done()`` once the record has been handled, from any thread. The checkpoint advances
+    past a record only when it and every record before it are done, and is committed at
+    most every ``checkpoint_interval`` seconds; records after the last checkpoint are
+    handled again after a restart.
+    """
+
+    def __init__(
+        self,
+        spool: Spool,
+        dispatch: Callable[[bytes, Callable[[], None]], bool],
+        checkpoint_interval: float = 1.0,
+        poll_interval: float = 0.1,
+    ):
+        self.spool = spool
+        self._dispatch = dispatch
+        self.checkpoint_interval = checkpoint_interval
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._inflight: Deque[List] = deque()
+        self._checkpoint = spool.load_checkpoint()
+        self._committed = self._checkpoint
+        self._last_commit = time.monotonic()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def checkpoint(self) -> Position:
+        """Position up to which every record has been handled."""
+        return self._checkpoint
+
+    def start(self):
+        """Start draining the spool, from the last checkpoint."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="feishu-spool-consumer", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop taking records from the spool; records already dispatched keep running."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+
+    def commit(self):
+        """Commit the checkpoint now."""
+        self._advance()
+        with self._lock:
+            position = self._checkpoint
+        if position != self._committed:
+            self.spool.commit(position)
+            self._committed = position
+        self._last_commit = time.monotonic()
+
+    def _run(self):
+        position = self._checkpoint
+        while not self._stopping.is_set() and not self.spool.closed:
+            if self.spool.wait(position, self.poll_interval):
+                for body, end in self.spool.read(position):
+                    # skipped corrupt data is done as soon as it is reached
+                    entry = [end, body is None]
+                    with self._lock:
+                        self._inflight.append(entry)
+                    while body is not None and not self._offer(body, entry):
+                        if self._stopping.wait(self.poll_interval):
+                            return
+                    position = end
+                    self._maybe_commit()
+            self._maybe_commit()
+
+    def _offer(self, body: bytes, entry: List) -> bool:
+        try:
+            return self._dispatch(body, lambda: self._done(entry))
+        except Exception:
+            logger.exception("Error dispatching spooled event")
+            self._done(entry)
+            return True
+
+    def _done(self, entry: List):
+        with self._lock:
+            entry[1] = True
+
+    def _advance(self):
+        with self._lock:
+            while self._inflight and self._inflight[0][1]:
+                self._checkpoint = self._inflight.popleft()[0]
+
+    def _maybe_commit(self):
+        if time.monotonic() - self._last_commit >= self.checkpoint_interval:
+            self.commit()
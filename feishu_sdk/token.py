@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Optional, Tuple
+
+# a fetch returns the new token and its lifetime in seconds
+TokenFetch = Callable[[], Tuple[str, float]]
+AsyncTokenFetch = Callable[[], Awaitable[Tuple[str, float]]]
+
+
+class TokenCache(object):
+    """
+    Holds a tenant_access_token together with its expiry time.
+
+    A token is served from the cache until ``expiry_margin`` seconds before it
+    expires. Once it is within ``refresh_ahead`` seconds of expiry it is still
+    served, but callers are asked to refresh it in the background so that no
+    send has to wait on the token endpoint.
+
+    Refreshes are single-flight: while one fetch is in progress, concurrent
+    callers wait for its result instead of issuing their own request. Share one
+    cache between clients of the same app to coalesce their fetches as well.
+    """
+
+    def __init__(self, expiry_margin: float = 60.0, refresh_ahead: float = 300.0):
+        self.expiry_margin = expiry_margin
+        self.refresh_ahead = refresh_ahead
+        self._token = ""
+        self._expires_at = 0.0
+        # sync single-flight state
+        self._cond = threading.Condition()
+        self._fetching = False
+        self._generation = 0
+        self._error: Optional[BaseException] = None
+        # async single-flight state
+        self._task: Optional["asyncio.Future"] = None
+
+    @property
+    def token(self) -> str:
+        return self._token
+
+    @token.setter
+    def token(self, value: str):
+        self._token = value
+
+    @property
+    def refreshing(self) -> bool:
+        """Whether a fetch is currently in flight."""
+        return self._fetching or (self._task is not None and not self._task.done())
+
+    def set(self, token: str, expire: float):
+        """Store a token that stays valid for ``expire`` seconds from now."""
+        self._token = token
+        self._expires_at = time.monotonic() + expire
+
+    def invalidate(self):
+        """Force the next caller to fetch a fresh token."""
+        self._expires_at = 0.0
+
+    def is_valid(self) -> bool:
+        return bool(self._token) and time.monotonic() < self._expires_at - self.expiry_margin
+
+    def needs_refresh(self) -> bool:
+        return time.monotonic() >= self._expires_at - self.refresh_ahead
+
+    def refresh(self, fetch: TokenFetch, force: bool = False) -> str:
+        """
+        Fetch a new token, or wait for the fetch another thread already started.
+
+        Unless ``force`` is set, a caller that finds a valid token once it holds
+        the lock returns that token without fetching.
+        """
+        with self._cond:
+            if self._fetching:
+                generation = self._generation
+                while self._generation == generation:
+                    self._cond.wait()
+                if self._error is not None:
+                    raise self._error
+                return self._token
+            if not force and self.is_valid():
+                return self._token
+            self._fetching = True
+
+        error: Optional[BaseException] = None
+        try:
+            token, expire = fetch()
+            self.set(token, expire)
+            return token
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            with self._cond:
+                self._error = error
+                self._fetching = False
+                self._generation += 1
+                self._cond.notify_all()
+
+    async def refresh_async(self, fetch: AsyncTokenFetch, force: bool = False) -> str:
+        """Async counterpart of :meth:`refresh`, coalescing callers onto one task."""
+        task = self._task
+        loop = asyncio.get_running_loop()
+        if task is None or task.done() or task.get_loop() is not loop:
+            if not force and self.is_valid():
+                return self._token
+            task = asyncio.ensure_future(self._fetch_async(fetch))
+            self._task = task
+        # shield so that one cancelled caller does not cancel the fetch for everyone else
+        return await asyncio.shield(task)
+
+    async def _fetch_async(self, fetch: AsyncTokenFetch) -> str:
+        token, expire = await fetch()
+        self.set(token, expire)
+        return token
@@ -1,10 +1,53 @@
+# marks an attribute that is not a key of the Obj
+_MISSING = object()
+
+
 class Obj(dict):
-    def __init__(self, d):
-        for a, b in d.items():
-            if isinstance(b, (list, tuple)):
-                setattr(self, a, [Obj(x) if isinstance(x, dict) else x for x in b])
-            else:
-                setattr(self, a, Obj(b) if isinstance(b, dict) else b)
+    """
+    A decoded JSON object readable both as a dict and through attribute access.
+
+    Both views share one storage, the dict itself. Nested dicts and lists are wrapped
+    only when they are first read through an attribute and the wrapper replaces the
+    plain value in place, so a handler reading ``event.message.content`` never pays for
+    the rest of the payload and the data is never held twice.
+
+    Keys take precedence over dict methods on attribute access: for a payload with an
+    ``items`` key, ``obj.items`` is the data and ``dict.items(obj)`` the method.
+    """
+
+    __slots__ = ()
+
+    def __getattribute__(self, name):
+        value = dict.get(self, name, _MISSING)
+        if value is _MISSING:
+            return object.__getattribute__(self, name)
+        if isinstance(value, dict):
+            if not isinstance(value, Obj):
+                value = Obj(value)
+                dict.__setitem__(self, name, value)
+        elif isinstance(value, (list, tuple)) and not isinstance(value, _ObjList):
+            value = _ObjList(Obj(x) if isinstance(x, dict) else x for x in value)
+            dict.__setitem__(self, name, value)
+        return value
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+    def __delattr__(self, name):
+        try:
+            del self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def to_dict(self) -> dict:
+        """Return the payload as a dict, without copying: the Obj is the payload."""
+        return self
+
+
+class _ObjList(list):
+    """A list whose dict items have already been wrapped in Obj"""
+
+    __slots__ = ()
 
 
 def dict_2_obj(d: dict):
@@ -1,23 +1,198 @@
 import asyncio
-import json
-from threading import Thread
-from typing import Any, Callable, Dict, Optional
+import concurrent.futures
+import functools
+import logging
+import threading
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, request
 
+from . import codec
+from .crypto import AESCipher, DecryptError
+from .dedup import Deduplicator
+from .dispatch import (
+    DROP_OLDEST,
+    REJECT,
+    BoundedExecutor,
+    EventLoopThread,
+    KeyedExecutor,
+    ProcessExecutor,
+    SlowCallMonitor,
+)
 from .event import Event, InvalidEventException
+from .middleware import Middleware, compose
+from .models import EVENT_TYPE_MESSAGE_RECEIVE
+from .router import Router
+from .signature import InvalidSignature, SignatureVerifier
+from .spool import Spool, SpoolConsumer
+
+logger = logging.getLogger(__name__)
+
+# unsigned requests are only decoded to answer a url_verification challenge, which is small
+_MAX_UNSIGNED_BODY = 4096
 
 
 class WebhookHandler:
     """
     Handles Feishu webhook events with standard URL verification and message processing
+
+    Any number of handlers can be registered per message or event type, and event types
+    can be patterns with ``*`` wildcards such as ``im.chat.*`` (see :class:`Router`).
+    A received message goes to the handlers of its message type, then to the event
+    handlers matching ``im.message.receive_v1``. The handlers of one event run one after
+    the other on the same worker.
+
+    ``middleware`` wraps every handler, the first one outermost, and more can be given
+    per handler to the registration decorators; see :mod:`feishu_sdk.middleware`. Chains
+    are composed when a handler is registered, so middleware passed to :meth:`use` only
+    applies to handlers registered after it. Middleware cannot be used with
+    ``processes``.
+
+    Events are handled on a pool of at most ``max_workers`` threads. Up to
+    ``max_queue_size`` events wait for a free worker; beyond that the ``backpressure``
+    policy applies ("reject" answers 503 so Feishu redelivers later, "drop_oldest" or
+    "block"). Queue depth and counters are available from ``executor.metrics()``.
+
+    Async handlers all run on one persistent event loop owned by the handler, so
+    loop-bound resources such as an ``AsyncMessageApiClient`` can be created once in an
+    ``on_startup`` hook and reused across events.
+
+    Redeliveries of an event already accepted are answered without being handled again,
+    recognized by ``header.event_id``. ``dedup`` is True for an in-memory
+    :class:`Deduplicator`, a Deduplicator with a shared backend for multi-process
+    deployments, or False to turn this off.
+
+    With ``spool`` set to a directory (or a :class:`Spool`), an event is appended to a
+    local write-ahead log and fsynced before the 200 is sent, and handlers are fed from
+    the log by ``spool_consumer``. Events accepted before a restart are handled after it,
+    at least once. The consumer starts with the first delivery; call
+    ``spool_consumer.start()`` after registering handlers to replay a backlog right away.
+
+    With ``processes`` > 0, sync handlers run on a pool of that many worker processes
+    instead of threads, so CPU-bound handlers use all cores. Events are handed over
+    through a queue of at most ``max_queue_size`` events, encoded as compact JSON.
+    Handlers must then be defined at module level so the workers can import them.
+    Async handlers keep running on the event loop.
+
+    Events are handled in parallel, so two messages of one chat may be handled out of
+    order. With ``ordering_key`` set, events with the same key are handled one at a time
+    in the order they arrived, while events with different keys still run in parallel.
+    It is either an attribute path on the :class:`Event` such as
+    ``"event.message.chat_id"`` or ``"event.sender.sender_id.open_id"``, or a callable
+    taking the event; events whose key is None are not ordered. ``drop_oldest`` and
+    ``processes`` cannot be used with it.
+
+    Set ``encrypt_key`` to the Encrypt Key of the app to accept deliveries encrypted by
+    Feishu (``{"encrypt": ...}``); this needs the ``crypto`` extra. The ``X-Lark-Signature``
+    of every request is then checked against the key before the body is decoded, unless
+    ``verify_signature`` is False: requests with a bad signature, a timestamp more than
+    ``signature_window`` seconds off or a nonce already seen are answered with 401.
+    Unsigned requests are only accepted for the url_verification challenge.
+
+    ``handler_timeout`` limits how long each handler call may take, and the registration
+    decorators take a ``timeout`` for one handler. An async handler that runs out of
+    time is cancelled. A sync handler cannot be interrupted: it runs on a separate pool
+    of ``max_workers`` threads while the worker waits for at most the timeout from the
+    moment the call starts, after which the worker moves on and the call is left running
+    on a thread the pool replaces with a new one. Timed out calls are counted
+    in ``timed_out``, the ones left running also in ``abandoned``. Sync handlers cannot
+    have a timeout with ``processes``. With ``slow_handler_threshold`` set, calls
+    running longer than that are logged once with their event id and current stack.
     """
 
-    def __init__(self, app: Optional[Flask] = None, endpoint: str = "/webhook"):
+    def __init__(
+        self,
+        app: Optional[Flask] = None,
+        endpoint: str = "/webhook",
+        max_workers: int = 8,
+        max_queue_size: int = 1000,
+        backpressure: str = REJECT,
+        dedup: Union[bool, Deduplicator] = True,
+        spool: Optional[Union[str, Spool]] = None,
+        processes: int = 0,
+        ordering_key: Optional[Union[str, Callable[[Event], Optional[Hashable]]]] = None,
+        encrypt_key: Optional[str] = None,
+        verify_signature: bool = True,
+        signature_window: float = 300,
+        middleware: Sequence[Middleware] = (),
+        handler_timeout: Optional[float] = None,
+        slow_handler_threshold: Optional[float] = None,
+    ):
+        if spool is not None and backpressure == DROP_OLDEST:
+            # a dropped event would never be done and hold back the spool checkpoint
+            raise ValueError("the drop_oldest backpressure policy cannot be used with a spool")
+        if spool is not None and processes:
+            # a worker process cannot report back when a spooled event is done
+            raise ValueError("a spool cannot be used with worker processes")
+        if middleware and processes:
+            # the wrappers cannot be pickled, the workers would call the bare handlers
+            raise ValueError("middleware cannot be used with worker processes")
+        if handler_timeout is not None and processes:
+            # a worker process cannot be made to give up on a call
+            raise ValueError("handler_timeout cannot be used with worker processes")
+        if ordering_key is not None and processes:
+            # worker processes take events from one shared queue in no particular order
+            raise ValueError("an ordering_key cannot be used with worker processes")
         self.app = app
         self.endpoint = endpoint
-        self.message_handlers = {}
-        self.event_handlers = {}
+        self.middleware = list(middleware)
+        self.message_handlers = Router()
+        self.event_handlers = Router()
+        self.ordering_key = ordering_key
+        executor_class = BoundedExecutor if ordering_key is None else KeyedExecutor
+        self.executor: Union[BoundedExecutor, KeyedExecutor] = executor_class(
+            max_workers=max_workers,
+            max_queue_size=max_queue_size,
+            backpressure=backpressure,
+            thread_name_prefix="feishu-webhook",
+        )
+        self.event_loop = EventLoopThread(name="feishu-webhook-loop")
+        self.handler_timeout = handler_timeout
+        self._handler_timeouts: Dict[Callable, float] = {}
+        # sync handlers with a timeout run here, so the worker can stop waiting for them
+        self._timed_executor = BoundedExecutor(
+            max_workers=max_workers,
+            max_queue_size=max_queue_size,
+            thread_name_prefix="feishu-webhook-timed",
+        )
+        self.slow_monitor: Optional[SlowCallMonitor] = None
+        if slow_handler_threshold is not None:
+            self.slow_monitor = SlowCallMonitor(slow_handler_threshold)
+        self._counter_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self.timed_out = 0
+        self.abandoned = 0
+        self.process_executor: Optional[ProcessExecutor] = None
+        if processes:
+            self.process_executor = ProcessExecutor(
+                max_workers=processes,
+                max_queue_size=max_queue_size,
+                name_prefix="feishu-webhook-process",
+            )
+        self.cipher = AESCipher(encrypt_key) if encrypt_key else None
+        self.verifier: Optional[SignatureVerifier] = None
+        if encrypt_key and verify_signature:
+            self.verifier = SignatureVerifier(encrypt_key, window=signature_window)
+        if isinstance(dedup, Deduplicator):
+            self.deduplicator: Optional[Deduplicator] = dedup
+        else:
+            self.deduplicator = Deduplicator() if dedup else None
+        self.spool: Optional[Spool] = None
+        self.spool_consumer: Optional[SpoolConsumer] = None
+        if spool is not None:
+            self.spool = spool if isinstance(spool, Spool) else Spool(spool)
+            self.spool_consumer = SpoolConsumer(self.spool, self._dispatch_spooled)
 
         if app:
             self.init_app(app)
@@ -27,94 +202,407 @@ class WebhookHandler:
         self.app = app
         app.add_url_rule(self.endpoint, "feishu_webhook", self._webhook_handler, methods=["POST"])
 
-    def message_handler(self, message_type: str = "text"):
+    def message_handler(
+        self,
+        message_type: str = "text",
+        middleware: Sequence[Middleware] = (),
+        timeout: Optional[float] = None,
+    ):
         """Decorator to register message handlers"""
 
         def decorator(func: Callable):
-            self.message_handlers[message_type] = func
+            self.message_handlers.add(message_type, self._compose(func, middleware, timeout))
             return func
 
         return decorator
 
-    def event_handler(self, event_type: str):
+    def event_handler(
+        self,
+        event_type: str,
+        middleware: Sequence[Middleware] = (),
+        timeout: Optional[float] = None,
+    ):
         """Decorator to register event handlers"""
 
         def decorator(func: Callable):
-            self.event_handlers[event_type] = func
+            self.event_handlers.add(event_type, self._compose(func, middleware, timeout))
             return func
 
         return decorator
 
+    def use(self, middleware: Middleware):
+        """Add a middleware around the handlers registered from now on"""
+        if self.process_executor is not None:
+            raise ValueError("middleware cannot be used with worker processes")
+        self.middleware.append(middleware)
+
+    def _compose(
+        self, func: Callable, middleware: Sequence[Middleware], timeout: Optional[float] = None
+    ) -> Callable:
+        """Wrap a handler being registered in the global, then its own, middleware"""
+        if self.process_executor is not None:
+            if middleware:
+                raise ValueError("middleware cannot be used with worker processes")
+            if timeout is not None and not asyncio.iscoroutinefunction(func):
+                raise ValueError("sync handlers cannot have a timeout with worker processes")
+        chain = self.middleware + list(middleware) if middleware else self.middleware
+        handler = compose(func, chain)
+        if timeout is not None:
+            # the timeout belongs to this registration, not to a function registered again
+            handler = _registration(handler)
+            self._handler_timeouts[handler] = timeout
+        return handler
+
+    def on_startup(self, func: Callable):
+        """Decorator to register a hook run on the event loop before the first async handler"""
+        self.event_loop.startup_hooks.append(func)
+        return func
+
+    def on_shutdown(self, func: Callable):
+        """Decorator to register a hook run on the event loop when the handler shuts down"""
+        self.event_loop.shutdown_hooks.append(func)
+        return func
+
+    def handlers_for(
+        self, event_type: str, message_type: Optional[str] = None
+    ) -> Tuple[Callable, ...]:
+        """Return the handlers an event of this type, or message of this type, goes to"""
+        handlers = self.event_handlers.handlers_for(event_type)
+        if event_type == EVENT_TYPE_MESSAGE_RECEIVE and message_type is not None:
+            handlers = self.message_handlers.handlers_for(message_type) + handlers
+        return handlers
+
+    def _handlers_for_event(self, event: Event) -> Tuple[Callable, ...]:
+        event_type = event.header.event_type
+        if event_type is None:
+            return ()
+        message_type = None
+        if event_type == EVENT_TYPE_MESSAGE_RECEIVE and event.event.message is not None:
+            message_type = event.event.message.message_type
+        return self.handlers_for(event_type, message_type)
+
+    def key_for(self, event: Event) -> Optional[Hashable]:
+        """Return the ``ordering_key`` of an event, None if it has none"""
+        ordering_key = self.ordering_key
+        if ordering_key is None:
+            return None
+        if callable(ordering_key):
+            return ordering_key(event)
+        value: Any = event
+        for name in ordering_key.split("."):
+            value = getattr(value, name, None)
+            if value is None:
+                return None
+        key: Hashable = value
+        return key
+
     def _webhook_handler(self):
         """Main webhook handler that processes Feishu events"""
-        req_data = request.json
+        body = request.get_data()
+        if self.spool_consumer is None:
+            data, status = self.handle_body(body, self._submit, request.headers)
+        else:
+            self.spool_consumer.start()
+            data, status = self.handle_body(
+                body, lambda handlers, event: self._spool(body), request.headers
+            )
+        return json_response(data, status)
+
+    def handle_body(
+        self,
+        body: bytes,
+        submit: Callable[[Tuple[Callable, ...], Event], bool],
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Decode one webhook delivery and pass its handlers and event to ``submit``.
+
+        Returns the JSON body and status code to answer with. ``submit`` returns False
+        when the event cannot be taken on right now, which is answered with 503.
+        ``headers`` are the request headers, looked up by lowercase name, for checking
+        the signature.
+        """
+        # Check the signature on the raw body, before spending anything on decoding it
+        unsigned = False
+        verifier = self.verifier
+        if verifier is not None:
+            if headers is not None and verifier.is_signed(headers):
+                try:
+                    verifier.verify(headers, body)
+                except InvalidSignature as e:
+                    logger.debug("Rejected webhook request: %s", e)
+                    return {"error": "Invalid signature"}, 401
+            elif len(body) > _MAX_UNSIGNED_BODY:
+                return {"error": "Invalid signature"}, 401
+            else:
+                unsigned = True
+
+        try:
+            req_data = self.decode_body(body)
+        except DecryptError:
+            return {"error": "Cannot decrypt event"}, 400
+        except codec.DecodeError:
+            return {"error": "Invalid JSON"}, 400
+        if not isinstance(req_data, dict):
+            return {"error": "Invalid event"}, 400
 
         # Handle URL verification
         if "type" in req_data and req_data["type"] == "url_verification":
-            return jsonify({"challenge": req_data["challenge"]})
+            return {"challenge": req_data["challenge"]}, 200
+        if unsigned:
+            return {"error": "Invalid signature"}, 401
 
         # Handle events
         try:
             event = Event(req_data)
-            event_type = event.header.event_type
+        except InvalidEventException:
+            return {"error": "Invalid event"}, 400
 
-            # Handle message events
-            if event_type == "im.message.receive_v1":
-                thread = Thread(target=self._async_message_processing, args=(req_data,))
-                thread.start()
-                return jsonify()
+        # Answer redeliveries of events already accepted without handling them again
+        deduplicator = self.deduplicator
+        if deduplicator is not None and deduplicator.is_duplicate(event.header.event_id):
+            return {}, 200
 
-            # Handle other events
-            elif event_type in self.event_handlers:
-                thread = Thread(target=self._async_event_processing, args=(event_type, req_data))
-                thread.start()
-                return jsonify()
+        handlers = self._handlers_for_event(event)
+        try:
+            accepted = not handlers or submit(handlers, event)
+        except BaseException:
+            # the event was not taken on, let Feishu's redelivery through
+            if deduplicator is not None:
+                deduplicator.forget(event.header.event_id)
+            raise
+        if not accepted:
+            # let the redelivery Feishu makes after the 503 through
+            if deduplicator is not None:
+                deduplicator.forget(event.header.event_id)
+            return {"error": "Too many pending events"}, 503
+        return {}, 200
 
-            return jsonify()
+    def decode_body(self, body: bytes) -> Any:
+        """Decode a webhook body, decrypting it first if Feishu sent it encrypted"""
+        data = codec.loads(body)
+        if isinstance(data, dict) and "encrypt" in data:
+            if self.cipher is None:
+                raise DecryptError("event is encrypted but no encrypt_key is set")
+            data = codec.loads(self.cipher.decrypt(data["encrypt"]))
+        return data
 
-        except InvalidEventException:
-            return jsonify({"error": "Invalid event"}), 400
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool, letting queued events finish first, then the event loop"""
+        if self.spool_consumer is not None:
+            self.spool_consumer.stop()
+        self.executor.shutdown(wait=wait)
+        if self.process_executor is not None:
+            self.process_executor.shutdown(wait=wait)
+        if self.spool_consumer is not None:
+            self.spool_consumer.commit()
+        if self.spool is not None:
+            self.spool.close()
+        # calls that timed out may never return, there is nothing to wait for
+        self._timed_executor.shutdown(wait=False)
+        if self.slow_monitor is not None:
+            self.slow_monitor.stop()
+        if wait:
+            self.event_loop.stop()
 
-    def _async_message_processing(self, req_data: Dict[str, Any]):
-        """Process message events asynchronously"""
-        asyncio.run(self._process_message(req_data))
+    def _spool(self, body: bytes) -> bool:
+        """Append a delivery to the spool, False if it could not be written"""
+        spool = self.spool
+        assert spool is not None
+        try:
+            spool.append(body)
+            return True
+        except (OSError, RuntimeError):
+            logger.exception("Failed to spool event")
+            return False
 
-    def _async_event_processing(self, event_type: str, req_data: Dict[str, Any]):
-        """Process non-message events asynchronously"""
-        asyncio.run(self._process_event(event_type, req_data))
+    def _dispatch_spooled(self, body: bytes, done: Callable[[], None]) -> bool:
+        """Queue a spooled delivery on the worker pool, calling done once it is handled"""
+        event = Event(self.decode_body(body))
+        handlers = self._handlers_for_event(event)
+        if not handlers:
+            done()
+            return True
+        return self._submit_ordered(self._process_spooled, handlers, event, done)
 
-    async def _process_message(self, req_data: Dict[str, Any]):
-        """Process incoming messages"""
+    def _process_spooled(
+        self, handlers: Sequence[Callable], event: Event, done: Callable[[], None]
+    ):
         try:
-            event = Event(req_data)
-            message = event.event.message
-            message_type = message.message_type
+            self._process(handlers, event)
+        finally:
+            done()
+
+    def _submit(self, handlers: Sequence[Callable], event: Event) -> bool:
+        """Queue the handler calls on the worker pool, or on a worker process for sync ones"""
+        if self.process_executor is None:
+            return self._submit_ordered(self._process, handlers, event)
+        sync = tuple(h for h in handlers if not asyncio.iscoroutinefunction(h))
+        coroutines = tuple(h for h in handlers if asyncio.iscoroutinefunction(h))
+        # an event is taken on by both pools or by neither, or the redelivery after a 503
+        # would run the handlers that were accepted a second time. every submission takes
+        # this lock, so the worker pool cannot fill up between the check and the submit
+        with self._submit_lock:
+            if sync and coroutines and self._pool_full():
+                return False
+            if sync and not self.process_executor.submit(
+                _process_in_worker, sync, codec.dumps(event.to_dict())
+            ):
+                return False
+            if not coroutines:
+                return True
+            return self._submit_ordered(self._process, coroutines, event)
 
-            if message_type in self.message_handlers:
-                handler = self.message_handlers[message_type]
+    def _pool_full(self) -> bool:
+        """Whether the worker pool would reject a task right now"""
+        executor = self.executor
+        return executor.backpressure == REJECT and executor.queue_depth >= executor.max_queue_size
+
+    def _submit_ordered(
+        self, fn: Callable, handlers: Sequence[Callable], event: Event, *args: Any
+    ) -> bool:
+        """Queue ``fn`` on the worker pool, behind earlier events with the same key"""
+        executor = self.executor
+        if isinstance(executor, KeyedExecutor):
+            return executor.submit(fn, handlers, event, *args, key=self.key_for(event))
+        return executor.submit(fn, handlers, event, *args)
+
+    def _process(self, handlers: Sequence[Callable], event: Event):
+        """Call the handlers on a worker, running coroutine functions on the shared event loop"""
+        for handler in handlers:
+            try:
                 if asyncio.iscoroutinefunction(handler):
-                    await handler(event)
+                    # the worker waits for the coroutine so the pool still bounds concurrency
+                    self.event_loop.run(self._await_handler(handler, event))
                 else:
-                    handler(event)
+                    self._call_handler(handler, event)
+
+            except Exception:
+                logger.exception("Error processing event %s", event.header.event_type)
 
-        except Exception as e:
-            print(f"Error processing message: {e}")
+    def _timeout_for(self, handler: Callable) -> Optional[float]:
+        if self._handler_timeouts:
+            return self._handler_timeouts.get(handler, self.handler_timeout)
+        return self.handler_timeout
 
-    async def _process_event(self, event_type: str, req_data: Dict[str, Any]):
-        """Process non-message events"""
+    async def _await_handler(self, handler: Callable, event: Event):
+        """Await an async handler, cancelling it once it runs out of time"""
+        coroutine = handler(event)
+        monitor = self.slow_monitor
+        if monitor is not None:
+            token = monitor.begin(_name_of(handler), event.header.event_id, coroutine)
         try:
-            event = Event(req_data)
-            handler = self.event_handlers[event_type]
+            timeout = self._timeout_for(handler)
+            if timeout is None:
+                await coroutine
+                return
+            task = asyncio.ensure_future(coroutine)
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                task.result()
+                return
+            task.cancel()
+            await asyncio.wait({task})
+            self._timed_out(handler, event, timeout, abandoned=False)
+        finally:
+            if monitor is not None:
+                monitor.end(token)
+
+    def _call_handler(self, handler: Callable, event: Event):
+        """Call a sync handler, giving up on it once it runs out of time"""
+        timeout = self._timeout_for(handler)
+        if timeout is None:
+            self._call_monitored(handler, event)
+            return
+        future: "concurrent.futures.Future[None]" = concurrent.futures.Future()
+        started = threading.Event()
+        runner: List[threading.Thread] = []
 
-            if asyncio.iscoroutinefunction(handler):
-                await handler(event)
+        def run():
+            future.set_running_or_notify_cancel()
+            runner.append(threading.current_thread())
+            started.set()
+            try:
+                self._call_monitored(handler, event)
+            except BaseException as e:
+                future.set_exception(e)
             else:
-                handler(event)
+                future.set_result(None)
+
+        if not self._timed_executor.submit(run):
+            raise RuntimeError("too many timed handler calls pending")
+        # the time limit counts from the start of the call, not from when it was queued;
+        # abandoned calls do not hold on to pool threads, so the call starts promptly
+        started.wait()
+        done, _ = concurrent.futures.wait([future], timeout)
+        if done:
+            future.result()
+            return
+        # the call is left running, another thread takes its place in the pool
+        self._timed_executor.replace(runner[0])
+        self._timed_out(handler, event, timeout, abandoned=True)
+
+    def _call_monitored(self, handler: Callable, event: Event):
+        monitor = self.slow_monitor
+        if monitor is None:
+            handler(event)
+            return
+        token = monitor.begin(_name_of(handler), event.header.event_id, threading.get_ident())
+        try:
+            handler(event)
+        finally:
+            monitor.end(token)
+
+    def _timed_out(self, handler: Callable, event: Event, timeout: float, abandoned: bool):
+        with self._counter_lock:
+            self.timed_out += 1
+            if abandoned:
+                self.abandoned += 1
+        logger.warning(
+            "Handler %s timed out after %ss on event %s%s",
+            _name_of(handler),
+            timeout,
+            event.header.event_id,
+            ", left running" if abandoned else "",
+        )
+
+
+def _registration(handler: Callable) -> Callable:
+    """Return a new callable calling ``handler``, distinct from any other registration of it"""
+    if asyncio.iscoroutinefunction(handler):
+
+        @functools.wraps(handler)
+        async def registered_coroutine(event: Event):
+            return await handler(event)
+
+        return registered_coroutine
+
+    @functools.wraps(handler)
+    def registered(event: Event):
+        return handler(event)
+
+    return registered
+
+
+def _name_of(handler: Callable) -> str:
+    return getattr(handler, "__qualname__", repr(handler))
+
+
+def _process_in_worker(handlers: Sequence[Callable], data: bytes):
+    """Decode an event handed to a worker process and call its handlers"""
+    event = Event(codec.loads(data))
+    for handler in handlers:
+        try:
+            handler(event)
+        except Exception:
+            logger.exception("Error processing event %s", event.header.event_type)
+
 
-        except Exception as e:
-            print(f"Error processing event {event_type}: {e}")
+def json_response(data: Any, status: int = 200) -> Response:
+    """Build a JSON response encoded with the SDK's codec"""
+    return Response(codec.dumps(data), status=status, mimetype="application/json")
 
 
-def create_webhook_handler(app: Flask, endpoint: str = "/webhook") -> WebhookHandler:
+def create_webhook_handler(app: Flask, endpoint: str = "/webhook", **kwargs) -> WebhookHandler:
     """Factory function to create and configure a webhook handler"""
-    return WebhookHandler(app, endpoint)
+    return WebhookHandler(app, endpoint, **kwargs)
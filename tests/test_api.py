@@ -1,6 +1,12 @@
 """Tests for feishu_sdk.api module."""
 
+import asyncio
+import json
+import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
 
 import httpx
 import pytest
@@ -8,6 +14,8 @@ import responses
 import respx
 
 from feishu_sdk.api import AsyncMessageApiClient, LarkException, MessageApiClient
+from feishu_sdk.ratelimit import ENDPOINT_MESSAGE_CREATE, ENDPOINT_TOKEN, RateLimiter
+from feishu_sdk.retry import RetryPolicy
 
 
 class TestMessageApiClient:
@@ -70,6 +78,31 @@ class TestMessageApiClient:
             MessageApiClient.from_env("https://open.feishu.cn")
         assert "APP_SECRET" in str(exc_info.value)
 
+    def test_session_pool_configuration(self):
+        """Test that the pooled session is mounted with the configured sizes."""
+        client = MessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            pool_connections=4,
+            pool_maxsize=32,
+        )
+        adapter = client._session.get_adapter("https://open.feishu.cn")
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 32
+        assert adapter._pool_block is True
+        unbounded = MessageApiClient(
+            "test_app_id", "test_app_secret", "https://open.feishu.cn", pool_block=False
+        )
+        assert unbounded._session.get_adapter("https://open.feishu.cn")._pool_block is False
+
+    def test_context_manager_closes_session(self, client):
+        """Test that leaving the context manager closes the session."""
+        with mock.patch.object(client._session, "close") as close:
+            with client as entered:
+                assert entered is client
+            close.assert_called_once()
+
     @responses.activate
     def test_authorize_tenant_access_token(self, client):
         """Test tenant access token authorization."""
@@ -82,6 +115,12 @@ class TestMessageApiClient:
 
         client._authorize_tenant_access_token()
         assert client._tenant_access_token == "new_token"
+        request = responses.calls[0].request
+        assert request.headers["Content-Type"].startswith("application/json")
+        assert json.loads(request.body) == {
+            "app_id": "test_app_id",
+            "app_secret": "test_app_secret",
+        }
 
     @responses.activate
     def test_authorize_tenant_access_token_error(self, client):
@@ -192,6 +231,369 @@ class TestMessageApiClient:
         assert exc_info.value.code == 10001
         assert exc_info.value.msg == "Invalid token"
 
+    @responses.activate
+    def test_token_is_cached_between_sends(self, client):
+        """Test that a token with a known expiry is reused across sends."""
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        client.send_text_with_open_id("ou_123", "first")
+        client.send_text_with_open_id("ou_123", "second")
+
+        assert len(responses.calls) == 3
+        assert responses.calls[2].request.headers["Authorization"] == "Bearer test_token"
+
+    @responses.activate
+    def test_token_refreshed_in_background(self, client):
+        """Test that a token close to expiry is served while a refresh runs."""
+        token_route = responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "new_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+        client._token_cache.set("old_token", 200)
+
+        client.send_text_with_open_id("ou_123", "Hello")
+
+        message_call = [c for c in responses.calls if "im/v1/messages" in c.request.url][0]
+        assert message_call.request.headers["Authorization"] == "Bearer old_token"
+        deadline = time.monotonic() + 5
+        while client.tenant_access_token != "new_token" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert client.tenant_access_token == "new_token"
+        assert token_route.call_count == 1
+
+    @responses.activate
+    def test_concurrent_sends_share_one_token_fetch(self, client):
+        """Test that concurrent sends from many threads trigger a single auth call."""
+
+        def token_callback(request):
+            time.sleep(0.05)
+            return 200, {}, '{"code": 0, "tenant_access_token": "test_token", "expire": 7200}'
+
+        responses.add_callback(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            callback=token_callback,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(
+                executor.map(lambda i: client.send_card_with_open_id("ou_%d" % i, "{}"), range(20))
+            )
+
+        token_calls = [c for c in responses.calls if "tenant_access_token" in c.request.url]
+        assert len(token_calls) == 1
+        assert results == ["msg_123"] * 20
+
+    @responses.activate
+    def test_requests_use_client_session(self, client):
+        """Test that every call goes through the client's pooled session."""
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        with mock.patch.object(
+            client._session, "request", wraps=client._session.request
+        ) as request:
+            client.send_card_with_open_id("ou_123", "{}")
+        assert request.call_count == 2
+
+    @responses.activate
+    def test_send_many(self, client):
+        """Test bulk sending streams a result per recipient."""
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+
+        def message_callback(request):
+            body = json.loads(request.body)
+            assert body["msg_type"] == "interactive"
+            assert body["content"] == '{"elements": []}'
+            if body["receive_id"] == "ou_bad":
+                return 200, {}, json.dumps({"code": 230001, "msg": "invalid receive_id"})
+            message_id = "msg_" + body["receive_id"]
+            return 200, {}, json.dumps({"code": 0, "data": {"message_id": message_id}})
+
+        responses.add_callback(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            callback=message_callback,
+        )
+
+        receive_ids = ["ou_%d" % i for i in range(20)] + ["ou_bad"]
+        results = dict(
+            client.send_many(
+                "open_id", receive_ids, "interactive", '{"elements": []}', concurrency=4
+            )
+        )
+
+        assert set(results) == set(receive_ids)
+        assert results["ou_3"] == "msg_ou_3"
+        assert isinstance(results["ou_bad"], LarkException)
+        assert results["ou_bad"].code == 230001
+
+    def test_send_many_rejects_zero_concurrency(self, client):
+        """Test that a concurrency below one is rejected."""
+        with pytest.raises(ValueError):
+            list(client.send_many("open_id", ["ou_1"], "text", "{}", concurrency=0))
+
+    @responses.activate
+    def test_send_waits_for_rate_limiter(self):
+        """Test that sends acquire the token and message create limits."""
+        limiter = mock.Mock(spec=RateLimiter)
+        client = MessageApiClient(
+            "test_app_id", "test_app_secret", "https://open.feishu.cn", rate_limiter=limiter
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        client.send_text_with_open_id("ou_123", "Hello")
+
+        assert limiter.acquire.call_args_list == [
+            mock.call(ENDPOINT_MESSAGE_CREATE, "ou_123"),
+            mock.call(ENDPOINT_TOKEN, None),
+        ]
+
+    @responses.activate
+    def test_send_retries_rate_limited_request(self):
+        """Test that rate-limited sends are retried without re-fetching the token."""
+        client = MessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            retry_policy=RetryPolicy(base_delay=0, max_delay=0),
+        )
+        token_route = responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 99991400, "msg": "request trigger frequency limit"},
+            status=429,
+            headers={"x-ogw-ratelimit-reset": "0"},
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 230020, "msg": "frequency limit"},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        assert client.send_card_with_open_id("ou_123", "{}") == "msg_123"
+        assert token_route.call_count == 1
+        assert len(responses.calls) == 4
+
+    @responses.activate
+    def test_send_retry_reuses_message_uuid(self):
+        """Test that a retried create carries the same uuid, so Feishu sends it only once."""
+        client = MessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            retry_policy=RetryPolicy(base_delay=0, max_delay=0),
+        )
+        client._token_cache.set("test_token", 7200)
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "msg": "internal error"},
+            status=502,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        assert client.send_card_with_open_id("ou_123", "{}") == "msg_123"
+        client.send_card_with_open_id("ou_123", "{}")
+        uuids = [json.loads(call.request.body)["uuid"] for call in responses.calls]
+        assert uuids[0] == uuids[1]
+        assert uuids[2] != uuids[0]
+
+    @responses.activate
+    def test_send_without_retry_policy_has_no_uuid(self):
+        """Test that the create body is unchanged when nothing is retried."""
+        client = MessageApiClient("test_app_id", "test_app_secret", "https://open.feishu.cn")
+        client._token_cache.set("test_token", 7200)
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        client.send_text_with_open_id("ou_123", "hi")
+        assert "uuid" not in json.loads(responses.calls[0].request.body)
+
+    @responses.activate
+    def test_send_gives_up_after_max_attempts(self):
+        """Test that the last error is raised once attempts run out."""
+        client = MessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0, max_delay=0),
+        )
+        client._token_cache.set("test_token", 7200)
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 230020, "msg": "frequency limit"},
+            status=200,
+        )
+
+        with pytest.raises(LarkException) as exc_info:
+            client.send_card_with_open_id("ou_123", "{}")
+        assert exc_info.value.code == 230020
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_send_does_not_retry_permanent_errors(self):
+        """Test that non-retryable errors fail on the first attempt."""
+        client = MessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            retry_policy=RetryPolicy(base_delay=0, max_delay=0),
+        )
+        client._token_cache.set("test_token", 7200)
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 230001, "msg": "invalid receive_id"},
+            status=400,
+        )
+
+        with pytest.raises(Exception):  # requests.HTTPError
+            client.send_card_with_open_id("ou_123", "{}")
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_send_does_not_print(self, client, capsys, caplog):
+        """Test that sends write nothing to stdout and log no debug records by default."""
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.PATCH,
+            "https://open.feishu.cn/open-apis/im/v1/messages/msg_123",
+            json={"code": 0},
+            status=200,
+        )
+
+        with caplog.at_level(logging.DEBUG, logger="feishu_sdk.api"):
+            client.send_update_message_card("msg_123", '{"elements": []}')
+
+        assert capsys.readouterr().out == ""
+        assert not [r for r in caplog.records if r.name == "feishu_sdk.api"]
+
+    @responses.activate
+    def test_trace_mode_redacts_secrets(self, caplog):
+        """Test that trace mode logs requests without the app_secret or token."""
+        client = MessageApiClient(
+            "test_app_id", "test_app_secret", "https://open.feishu.cn", trace=True
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 0, "tenant_access_token": "test_token", "expire": 7200},
+            status=200,
+        )
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/im/v1/messages",
+            json={"code": 0, "data": {"message_id": "msg_123"}},
+            status=200,
+        )
+
+        with caplog.at_level(logging.DEBUG, logger="feishu_sdk.api"):
+            client.send_text_with_open_id("ou_123", "Hello")
+
+        records = [r for r in caplog.records if r.name == "feishu_sdk.api"]
+        assert len(records) == 4
+        assert records[2].feishu_url.endswith("receive_id_type=open_id")
+        log_text = "\n".join(r.getMessage() for r in records)
+        assert "ou_123" in log_text
+        assert "test_app_secret" not in log_text
+        assert "test_token" not in log_text
+
+    @responses.activate
+    def test_error_response_is_logged(self, client, caplog):
+        """Test that API errors are logged with their code."""
+        responses.add(
+            responses.POST,
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
+            json={"code": 10001, "msg": "Invalid token"},
+            status=200,
+        )
+
+        with pytest.raises(LarkException):
+            client._authorize_tenant_access_token()
+
+        assert caplog.records[-1].levelno == logging.ERROR
+        assert caplog.records[-1].feishu_code == 10001
+
 
 class TestLarkException:
     """Tests for the LarkException class."""
@@ -295,13 +697,21 @@ class TestAsyncMessageApiClient:
     @respx.mock
     async def test_authorize_tenant_access_token(self, client):
         """Test tenant access token authorization."""
-        respx.post("https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal").mock(
+        route = respx.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        ).mock(
             return_value=httpx.Response(200, json={"code": 0, "tenant_access_token": "new_token"})
         )
 
         async with client:
             await client._authorize_tenant_access_token()
             assert client._tenant_access_token == "new_token"
+        request = route.calls.last.request
+        assert request.headers["Content-Type"].startswith("application/json")
+        assert json.loads(request.content) == {
+            "app_id": "test_app_id",
+            "app_secret": "test_app_secret",
+        }
 
     @pytest.mark.asyncio
     @respx.mock
@@ -403,3 +813,284 @@ class TestAsyncMessageApiClient:
         # Should work without async context manager (creates temporary client)
         result = await client.send_text_with_open_id("ou_123", "Hello")
         assert result == "msg_789"
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_token_is_cached_between_sends(self, client):
+        """Test that a token with a known expiry is reused across sends."""
+        token_route = respx.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "test_token", "expire": 7200}
+            )
+        )
+        respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}})
+        )
+
+        async with client:
+            await client.send_text_with_open_id("ou_123", "first")
+            await client.send_text_with_open_id("ou_123", "second")
+
+        assert token_route.call_count == 1
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_token_refreshed_in_background(self, client):
+        """Test that a token close to expiry is served while a refresh runs."""
+        token_route = respx.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "new_token", "expire": 7200}
+            )
+        )
+        message_route = respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}})
+        )
+        client._token_cache.set("old_token", 200)
+
+        async with client:
+            await client.send_text_with_open_id("ou_123", "Hello")
+            assert message_route.calls[0].request.headers["Authorization"] == "Bearer old_token"
+            await client._refresh_task
+
+        assert client.tenant_access_token == "new_token"
+        assert token_route.call_count == 1
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_concurrent_sends_share_one_token_fetch(self, client):
+        """Test that many concurrent sends trigger a single auth call."""
+        token_route = respx.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "test_token", "expire": 7200}
+            )
+        )
+        respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}})
+        )
+
+        async with client:
+            results = await asyncio.gather(
+                *[client.send_card_with_open_id("ou_%d" % i, "{}") for i in range(500)]
+            )
+
+        assert token_route.call_count == 1
+        assert results == ["msg_123"] * 500
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_shared_client_is_reused(self, client):
+        """Test that the lazily created client is reused across calls."""
+        respx.post("https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal").mock(
+            return_value=httpx.Response(200, json={"code": 0, "tenant_access_token": "test_token"})
+        )
+        respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}})
+        )
+
+        await client.send_text_with_open_id("ou_123", "first")
+        shared = client._client
+        await client.send_text_with_open_id("ou_123", "second")
+
+        assert shared is not None
+        assert client._client is shared
+        assert client.temporary_client_requests == 0
+
+        await client.aclose()
+        assert client._client is None
+
+    @pytest.mark.asyncio
+    async def test_client_options(self):
+        """Test that limits and http2 are passed to the shared client."""
+        limits = httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        client = AsyncMessageApiClient(
+            "test_app_id", "test_app_secret", "https://open.feishu.cn", limits=limits
+        )
+
+        with mock.patch("feishu_sdk.api.httpx.AsyncClient") as async_client:
+            client._get_client()
+        async_client.assert_called_once_with(http2=False, limits=limits)
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_other_loop_falls_back_to_temporary_client(self, client, caplog):
+        """Test the temporary client fallback when the shared client belongs to another loop."""
+        respx.post("https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal").mock(
+            return_value=httpx.Response(200, json={"code": 0, "tenant_access_token": "test_token"})
+        )
+        other_loop = asyncio.new_event_loop()
+        try:
+            client._client = httpx.AsyncClient()
+            client._client_loop = other_loop
+
+            await client._authorize_tenant_access_token()
+            await client._authorize_tenant_access_token()
+        finally:
+            other_loop.close()
+
+        assert client.temporary_client_requests == 2
+        assert len([r for r in caplog.records if "temporary HTTP client" in r.message]) == 1
+
+    @pytest.mark.asyncio
+    async def test_closed_loop_client_is_replaced(self, client):
+        """Test that a client left behind by a closed loop is replaced."""
+        stale = httpx.AsyncClient()
+        closed_loop = asyncio.new_event_loop()
+        closed_loop.close()
+        client._client = stale
+        client._client_loop = closed_loop
+
+        assert client._get_client() is not stale
+        assert client._client_loop is asyncio.get_running_loop()
+        await client.aclose()
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_send_many(self, client):
+        """Test bulk sending streams a result per recipient."""
+        token_route = respx.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "test_token", "expire": 7200}
+            )
+        )
+
+        def message_side_effect(request):
+            body = json.loads(request.content)
+            if body["receive_id"] == "ou_bad":
+                return httpx.Response(200, json={"code": 230001, "msg": "invalid receive_id"})
+            message_id = "msg_" + body["receive_id"]
+            return httpx.Response(200, json={"code": 0, "data": {"message_id": message_id}})
+
+        respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            side_effect=message_side_effect
+        )
+
+        receive_ids = ["ou_%d" % i for i in range(50)] + ["ou_bad"]
+        results = {}
+        async with client:
+            async for receive_id, result in client.send_many(
+                "open_id", receive_ids, "text", '{"text": "hi"}', concurrency=8
+            ):
+                results[receive_id] = result
+
+        assert set(results) == set(receive_ids)
+        assert results["ou_7"] == "msg_ou_7"
+        assert isinstance(results["ou_bad"], LarkException)
+        assert token_route.call_count == 1
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_send_waits_for_rate_limiter(self):
+        """Test that sends queue behind the rate limiter instead of failing."""
+        limiter = RateLimiter(
+            endpoint_limits={ENDPOINT_MESSAGE_CREATE: (100, 1)}, receive_id_limit=None
+        )
+        client = AsyncMessageApiClient(
+            "test_app_id", "test_app_secret", "https://open.feishu.cn", rate_limiter=limiter
+        )
+        respx.post("https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal").mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "test_token", "expire": 7200}
+            )
+        )
+        respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}})
+        )
+
+        start = time.monotonic()
+        async with client:
+            results = await asyncio.gather(
+                *[client.send_text_with_open_id("ou_%d" % i, "Hello") for i in range(5)]
+            )
+
+        assert results == ["msg_123"] * 5
+        assert time.monotonic() - start >= 0.035
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_send_retries_rate_limited_request(self):
+        """Test that rate-limited sends are retried without re-fetching the token."""
+        client = AsyncMessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            retry_policy=RetryPolicy(base_delay=0, max_delay=0),
+        )
+        token_route = respx.post(
+            "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        ).mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "test_token", "expire": 7200}
+            )
+        )
+        message_route = respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            side_effect=[
+                httpx.Response(503, json={"code": 1, "msg": "unavailable"}),
+                httpx.Response(
+                    429,
+                    json={"code": 99991400, "msg": "request trigger frequency limit"},
+                    headers={"Retry-After": "0"},
+                ),
+                httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}}),
+            ]
+        )
+
+        async with client:
+            assert await client.send_card_with_open_id("ou_123", "{}") == "msg_123"
+
+        assert token_route.call_count == 1
+        assert message_route.call_count == 3
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_send_gives_up_after_max_attempts(self):
+        """Test that the last error is raised once attempts run out."""
+        client = AsyncMessageApiClient(
+            "test_app_id",
+            "test_app_secret",
+            "https://open.feishu.cn",
+            retry_policy=RetryPolicy(max_attempts=2, base_delay=0, max_delay=0),
+        )
+        client._token_cache.set("test_token", 7200)
+        message_route = respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(502, json={"code": 1, "msg": "bad gateway"})
+        )
+
+        async with client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.send_card_with_open_id("ou_123", "{}")
+
+        assert message_route.call_count == 2
+
+    @pytest.mark.asyncio
+    @respx.mock
+    async def test_trace_mode_redacts_secrets(self, caplog):
+        """Test that trace mode logs requests without the app_secret or token."""
+        client = AsyncMessageApiClient(
+            "test_app_id", "test_app_secret", "https://open.feishu.cn", trace=True
+        )
+        respx.post("https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal").mock(
+            return_value=httpx.Response(
+                200, json={"code": 0, "tenant_access_token": "test_token", "expire": 7200}
+            )
+        )
+        respx.post(url__regex=r".*/open-apis/im/v1/messages\?.*").mock(
+            return_value=httpx.Response(200, json={"code": 0, "data": {"message_id": "msg_123"}})
+        )
+
+        with caplog.at_level(logging.DEBUG, logger="feishu_sdk.api"):
+            async with client:
+                await client.send_text_with_open_id("ou_123", "Hello")
+
+        records = [r for r in caplog.records if r.name == "feishu_sdk.api"]
+        assert len(records) == 4
+        log_text = "\n".join(r.getMessage() for r in records)
+        assert "test_app_secret" not in log_text
+        assert "test_token" not in log_text
@@ -0,0 +1,240 @@
+"""Tests for feishu_sdk.asgi module."""
+
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from feishu_sdk.asgi import AsgiWebhookApp
+from feishu_sdk.webhook import WebhookHandler
+from tests.test_signature import sign
+
+MESSAGE_EVENT = {
+    "header": {"event_id": "e-1", "event_type": "im.message.receive_v1"},
+    "event": {"message": {"message_type": "text", "content": '{"text": "Hello"}'}},
+}
+
+
+@pytest.fixture
+def app():
+    """Create an ASGI webhook app."""
+    return AsgiWebhookApp()
+
+
+def client_for(app):
+    """Create an HTTP client talking to the ASGI app in-process."""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestAsgiWebhookApp:
+    """Tests for the AsgiWebhookApp class."""
+
+    @pytest.mark.asyncio
+    async def test_url_verification(self, app):
+        """Test URL verification handling."""
+        async with client_for(app) as client:
+            response = await client.post(
+                "/webhook", json={"type": "url_verification", "challenge": "abc"}
+            )
+        assert response.status_code == 200
+        assert response.json() == {"challenge": "abc"}
+
+    @pytest.mark.asyncio
+    async def test_invalid_event_returns_400(self, app):
+        """Test that invalid events return 400."""
+        async with client_for(app) as client:
+            response = await client.post("/webhook", json={"invalid": "data"})
+        assert response.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_signature_checked_on_headers(self):
+        """Test that the request signature is read from the ASGI headers."""
+        app = AsgiWebhookApp(encrypt_key="test key")
+        body = b'{"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}'
+        async with client_for(app) as client:
+            signed = await client.post("/webhook", content=body, headers=sign(body))
+            forged = await client.post(
+                "/webhook", content=body, headers=sign(body, key="other key", nonce="n-2")
+            )
+        assert signed.status_code == 200
+        assert forged.status_code == 401
+        await app.shutdown()
+
+    def test_spool_is_refused(self, tmp_path):
+        """Test that a handler with a spool is refused instead of bypassing the spool."""
+        handler = WebhookHandler(spool=str(tmp_path))
+        with pytest.raises(ValueError, match="spool"):
+            AsgiWebhookApp(handler)
+        with pytest.raises(ValueError, match="spool"):
+            AsgiWebhookApp(spool=str(tmp_path / "other"))
+        handler.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_method_not_allowed(self, app):
+        """Test that only POST is accepted."""
+        async with client_for(app) as client:
+            response = await client.get("/webhook")
+        assert response.status_code == 405
+
+    @pytest.mark.asyncio
+    async def test_async_handler_runs_on_server_loop(self, app):
+        """Test that async handlers run as tasks on the server's own loop and thread."""
+        handled = asyncio.Event()
+        seen = []
+
+        @app.message_handler("text")
+        async def handle_text(event):
+            seen.append((asyncio.get_running_loop(), threading.current_thread()))
+            handled.set()
+
+        async with client_for(app) as client:
+            response = await client.post("/webhook", json=MESSAGE_EVENT)
+        assert response.status_code == 200
+        await asyncio.wait_for(handled.wait(), timeout=5)
+        assert seen == [(asyncio.get_running_loop(), threading.current_thread())]
+        await app.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_sync_handler_runs_on_worker_pool(self, app):
+        """Test that sync handlers are queued on the worker pool."""
+        handled = threading.Event()
+        thread_names = []
+
+        @app.event_handler("custom.event")
+        def handle_custom(event):
+            thread_names.append(threading.current_thread().name)
+            handled.set()
+
+        async with client_for(app) as client:
+            payload = {"header": {"event_type": "custom.event"}, "event": {}}
+            response = await client.post("/webhook", json=payload)
+        assert response.status_code == 200
+        await app.shutdown()
+        assert handled.is_set()
+        assert thread_names[0].startswith("feishu-webhook")
+
+    @pytest.mark.asyncio
+    async def test_shares_registry_with_webhook_handler(self):
+        """Test that handlers registered on a WebhookHandler are used."""
+        handler = WebhookHandler()
+        calls = []
+
+        @handler.event_handler("custom.event")
+        async def handle_custom(event):
+            calls.append(event.event.data)
+
+        app = AsgiWebhookApp(handler)
+        assert app.event_handlers is handler.event_handlers
+        async with client_for(app) as client:
+            payload = {"header": {"event_type": "custom.event"}, "event": {"data": "x"}}
+            await client.post("/webhook", json=payload)
+        await app.shutdown()
+        assert calls == ["x"]
+
+    @pytest.mark.asyncio
+    async def test_too_many_tasks_returns_503(self):
+        """Test that deliveries beyond max_tasks in flight are answered with 503."""
+        app = AsgiWebhookApp(max_tasks=1)
+        release = asyncio.Event()
+
+        @app.event_handler("custom.event")
+        async def handle_custom(event):
+            await release.wait()
+
+        def payload(event_id):
+            return {"header": {"event_id": event_id, "event_type": "custom.event"}, "event": {}}
+
+        async with client_for(app) as client:
+            assert (await client.post("/webhook", json=payload("e-1"))).status_code == 200
+            assert app.pending_tasks == 1
+            assert (await client.post("/webhook", json=payload("e-2"))).status_code == 503
+            release.set()
+            await app.shutdown()
+            assert (await client.post("/webhook", json=payload("e-2"))).status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_blocking_submit_does_not_stall_loop(self):
+        """Test that a delivery waiting for a worker slot leaves the server loop running."""
+        app = AsgiWebhookApp(max_workers=1, max_queue_size=1, backpressure="block")
+        release = threading.Event()
+        handled = []
+
+        @app.event_handler("custom.event")
+        def handle_custom(event):
+            release.wait(timeout=5)
+            handled.append(event.header.event_id)
+
+        def payload(event_id):
+            return {"header": {"event_id": event_id, "event_type": "custom.event"}, "event": {}}
+
+        async with client_for(app) as client:
+            assert (await client.post("/webhook", json=payload("e-1"))).status_code == 200
+            assert (await client.post("/webhook", json=payload("e-2"))).status_code == 200
+            blocked = asyncio.ensure_future(client.post("/webhook", json=payload("e-3")))
+            await asyncio.sleep(0.05)
+            assert not blocked.done()
+            release.set()
+            assert (await asyncio.wait_for(blocked, timeout=5)).status_code == 200
+        await app.shutdown()
+        assert sorted(handled) == ["e-1", "e-2", "e-3"]
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_handler_pools(self):
+        """Test that shutdown also stops the timed-handler pool of the WebhookHandler."""
+        app = AsgiWebhookApp(handler_timeout=1)
+        await app.shutdown()
+        with pytest.raises(RuntimeError):
+            app.handler._timed_executor.submit(print)
+
+    @pytest.mark.asyncio
+    async def test_ordering_key_keeps_chat_order(self):
+        """Test that async handlers for one chat run one at a time in arrival order."""
+        app = AsgiWebhookApp(ordering_key="event.message.chat_id")
+        calls = []
+
+        @app.message_handler("text")
+        async def handle_text(event):
+            index = int(event.header.event_id)
+            # earlier messages take longer, so running them in parallel would reorder them
+            await asyncio.sleep((20 - index) * 0.001)
+            calls.append((event.event.message.chat_id, index))
+
+        async with client_for(app) as client:
+            for i in range(20):
+                payload = {
+                    "header": {"event_id": str(i), "event_type": "im.message.receive_v1"},
+                    "event": {"message": {"chat_id": "oc_%d" % (i % 2), "message_type": "text"}},
+                }
+                assert (await client.post("/webhook", json=payload)).status_code == 200
+        await app.shutdown()
+        for chat_id in ("oc_0", "oc_1"):
+            indexes = [index for chat, index in calls if chat == chat_id]
+            assert indexes == sorted(indexes)
+            assert len(indexes) == 10
+        assert app._key_tails == {}
+
+    @pytest.mark.asyncio
+    async def test_lifespan_runs_hooks(self, app):
+        """Test that startup and shutdown hooks run through the lifespan protocol."""
+        calls = []
+
+        @app.on_startup
+        async def startup():
+            calls.append("startup")
+
+        @app.on_shutdown
+        def shutdown():
+            calls.append("shutdown")
+
+        messages = asyncio.Queue()
+        for message_type in ("lifespan.startup", "lifespan.shutdown"):
+            messages.put_nowait({"type": message_type})
+        sent = []
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await app({"type": "lifespan"}, messages.get, send)
+        assert calls == ["startup", "shutdown"]
+        assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
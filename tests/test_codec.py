@@ -0,0 +1,75 @@
+"""Tests for feishu_sdk.codec module."""
+
+import json
+import time
+
+import pytest
+
+from feishu_sdk import codec
+
+PAYLOAD = {
+    "schema": "2.0",
+    "header": {"event_id": "e_1", "event_type": "im.message.receive_v1"},
+    "event": {
+        "message": {
+            "message_type": "text",
+            "content": '{"text": "你好"}',
+            "mentions": [{"key": "@_user_%d" % i, "name": "user"} for i in range(20)],
+        }
+    },
+}
+
+
+@pytest.fixture(params=sorted(codec.BACKENDS))
+def backend(request):
+    """Switch the codec to each installed backend in turn."""
+    previous = codec.backend
+    codec.use(request.param)
+    yield request.param
+    codec.use(previous)
+
+
+class TestCodec:
+    """Tests for the JSON codec."""
+
+    def test_default_prefers_fast_backend(self):
+        """Test that the fastest installed backend is picked by default."""
+        expected = next(name for name in ("orjson", "msgspec", "json") if name in codec.BACKENDS)
+        assert codec.backend == expected
+
+    def test_round_trip(self, backend):
+        """Test that every backend decodes what it encodes."""
+        data = codec.dumps(PAYLOAD)
+        assert isinstance(data, bytes)
+        assert codec.loads(data) == PAYLOAD
+        assert codec.loads(data.decode("utf-8")) == PAYLOAD
+
+    def test_output_is_compact_utf8(self, backend):
+        """Test that output has no whitespace and keeps non-ASCII text as UTF-8."""
+        data = codec.dumps({"a": [1, 2], "text": "你好"})
+        assert data == '{"a":[1,2],"text":"你好"}'.encode("utf-8")
+
+    def test_matches_stdlib(self, backend):
+        """Test that every backend decodes like the stdlib json module."""
+        raw = json.dumps(PAYLOAD).encode()
+        assert codec.loads(raw) == json.loads(raw)
+
+    def test_decode_error(self, backend):
+        """Test that malformed input raises one of codec.DecodeError."""
+        with pytest.raises(codec.DecodeError):
+            codec.loads(b"{not json")
+
+    def test_use_unknown_backend(self):
+        """Test that selecting a backend that is not installed fails."""
+        with pytest.raises(ValueError):
+            codec.use("simdjson")
+
+    def test_decode_benchmark(self, backend, record_property):
+        """Benchmark decoding a webhook body with each backend."""
+        raw = json.dumps(PAYLOAD).encode()
+        rounds = 5000
+        start = time.perf_counter()
+        for _ in range(rounds):
+            codec.loads(raw)
+        elapsed = time.perf_counter() - start
+        record_property("decode_us_" + backend, round(elapsed / rounds * 1e6, 2))
@@ -0,0 +1,113 @@
+"""Tests for feishu_sdk.dedup module."""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from feishu_sdk.dedup import DedupBackend, Deduplicator, InMemoryDedupBackend
+
+
+class TestInMemoryDedupBackend:
+    """Tests for the InMemoryDedupBackend class."""
+
+    def test_add(self):
+        """Test that a key is new only the first time it is added."""
+        backend = InMemoryDedupBackend()
+        assert backend.add("e-1", 60)
+        assert not backend.add("e-1", 60)
+        assert backend.add("e-2", 60)
+
+    def test_ttl(self):
+        """Test that a key is new again once its TTL has passed."""
+        backend = InMemoryDedupBackend()
+        assert backend.add("e-1", 0.01)
+        time.sleep(0.02)
+        assert backend.add("e-1", 60)
+
+    def test_expired_keys_are_evicted(self):
+        """Test that expired keys do not take up space."""
+        backend = InMemoryDedupBackend()
+        backend.add("e-1", 0.01)
+        time.sleep(0.02)
+        backend.add("e-2", 60)
+        assert len(backend) == 1
+
+    def test_max_size(self):
+        """Test that the oldest key is dropped when the cache is full."""
+        backend = InMemoryDedupBackend(max_size=2)
+        backend.add("e-1", 60)
+        backend.add("e-2", 60)
+        backend.add("e-3", 60)
+        assert len(backend) == 2
+        assert backend.add("e-1", 60)
+        assert not backend.add("e-3", 60)
+
+    def test_discard(self):
+        """Test that a discarded key is new again."""
+        backend = InMemoryDedupBackend()
+        backend.add("e-1", 60)
+        backend.discard("e-1")
+        backend.discard("unknown")
+        assert backend.add("e-1", 60)
+
+    def test_invalid_max_size(self):
+        """Test that max_size must be positive."""
+        with pytest.raises(ValueError):
+            InMemoryDedupBackend(max_size=0)
+
+
+class TestDeduplicator:
+    """Tests for the Deduplicator class."""
+
+    def test_counts_hits_and_misses(self):
+        """Test that first deliveries are misses and redeliveries hits."""
+        dedup = Deduplicator()
+        assert not dedup.is_duplicate("e-1")
+        assert dedup.is_duplicate("e-1")
+        assert dedup.is_duplicate("e-1")
+        assert not dedup.is_duplicate("e-2")
+        assert dedup.metrics() == {"hits": 2, "misses": 2}
+
+    def test_missing_event_id(self):
+        """Test that events without an id are never treated as duplicates."""
+        dedup = Deduplicator()
+        assert not dedup.is_duplicate(None)
+        assert not dedup.is_duplicate(None)
+        assert dedup.metrics() == {"hits": 0, "misses": 0}
+
+    def test_forget(self):
+        """Test that a forgotten event is handled on redelivery."""
+        dedup = Deduplicator()
+        dedup.is_duplicate("e-1")
+        dedup.forget("e-1")
+        assert not dedup.is_duplicate("e-1")
+
+    def test_concurrent_deliveries(self):
+        """Test that only one of many concurrent deliveries is a first delivery."""
+        dedup = Deduplicator()
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda _: dedup.is_duplicate("e-1"), range(100)))
+        assert results.count(False) == 1
+        assert dedup.metrics() == {"hits": 99, "misses": 1}
+
+    def test_custom_backend(self):
+        """Test that a custom backend receives the keys and TTL."""
+
+        class RecordingBackend(DedupBackend):
+            def __init__(self):
+                self.keys = {}
+
+            def add(self, key, ttl):
+                if key in self.keys:
+                    return False
+                self.keys[key] = ttl
+                return True
+
+            def discard(self, key):
+                self.keys.pop(key, None)
+
+        backend = RecordingBackend()
+        dedup = Deduplicator(backend, ttl=30)
+        dedup.is_duplicate("e-1")
+        assert backend.keys == {"e-1": 30}
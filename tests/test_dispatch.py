@@ -0,0 +1,428 @@
+"""Tests for feishu_sdk.dispatch module."""
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from feishu_sdk.dispatch import (
+    BLOCK,
+    DROP_OLDEST,
+    REJECT,
+    BoundedExecutor,
+    EventLoopThread,
+    KeyedExecutor,
+    ProcessExecutor,
+    SlowCallMonitor,
+)
+
+
+def wait_for(condition, timeout=5):
+    """Poll until condition() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def record_pid(path, value):
+    """Append a value and the worker's pid to a file; runs in a worker process."""
+    with open(path, "a") as f:
+        f.write("{} {}\n".format(value, os.getpid()))
+
+
+def crash():
+    """Kill the worker process running this task."""
+    os._exit(1)
+
+
+class TestBoundedExecutor:
+    """Tests for the BoundedExecutor class."""
+
+    def test_invalid_arguments(self):
+        """Test that invalid pool settings are rejected."""
+        with pytest.raises(ValueError):
+            BoundedExecutor(max_workers=0)
+        with pytest.raises(ValueError):
+            BoundedExecutor(backpressure="spill")
+
+    def test_runs_tasks(self):
+        """Test that submitted tasks run on worker threads."""
+        executor = BoundedExecutor(max_workers=2)
+        results = []
+        for i in range(10):
+            assert executor.submit(results.append, i)
+        executor.shutdown()
+        assert sorted(results) == list(range(10))
+        assert executor.metrics()["completed"] == 10
+
+    def test_worker_count_is_bounded(self):
+        """Test that no more than max_workers threads are started."""
+        executor = BoundedExecutor(max_workers=3)
+        release = threading.Event()
+        for _ in range(20):
+            executor.submit(release.wait)
+        assert len(executor._workers) == 3
+        release.set()
+        executor.shutdown()
+
+    def test_replaced_worker_frees_its_slot(self):
+        """Test that a replaced worker stops counting against max_workers and then exits."""
+        executor = BoundedExecutor(max_workers=1)
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def hang():
+            started.set()
+            release.wait()
+
+        executor.submit(hang)
+        assert started.wait(timeout=5)
+        stuck = executor._workers[0]
+        executor.submit(results.append, "ok")
+        executor.replace(stuck)
+        assert stuck not in executor._workers
+        executor.shutdown()
+        assert results == ["ok"]
+        release.set()
+        stuck.join(timeout=5)
+        assert not stuck.is_alive()
+
+    def test_task_errors_are_contained(self):
+        """Test that a failing task does not kill its worker."""
+        executor = BoundedExecutor(max_workers=1)
+        results = []
+        executor.submit(lambda: 1 / 0)
+        executor.submit(results.append, "ok")
+        executor.shutdown()
+        assert results == ["ok"]
+
+    def test_reject_when_full(self):
+        """Test that the reject policy refuses tasks once the queue is full."""
+        executor = BoundedExecutor(max_workers=1, max_queue_size=1, backpressure=REJECT)
+        release = threading.Event()
+        executor.submit(release.wait)
+        assert wait_for(lambda: executor.metrics()["active"] == 1)
+        assert executor.submit(release.wait)
+        assert not executor.submit(release.wait)
+        assert executor.metrics()["rejected"] == 1
+        assert executor.queue_depth == 1
+        release.set()
+        executor.shutdown()
+
+    def test_drop_oldest_when_full(self):
+        """Test that the drop_oldest policy evicts the oldest queued task."""
+        executor = BoundedExecutor(max_workers=1, max_queue_size=1, backpressure=DROP_OLDEST)
+        release = threading.Event()
+        results = []
+        executor.submit(release.wait)
+        assert wait_for(lambda: executor.metrics()["active"] == 1)
+        executor.submit(results.append, "old")
+        assert executor.submit(results.append, "new")
+        release.set()
+        executor.shutdown()
+        assert results == ["new"]
+        assert executor.metrics()["dropped"] == 1
+
+    def test_block_when_full(self):
+        """Test that the block policy waits for a free slot."""
+        executor = BoundedExecutor(max_workers=1, max_queue_size=1, backpressure=BLOCK)
+        release = threading.Event()
+        results = []
+        executor.submit(release.wait)
+        assert wait_for(lambda: executor.metrics()["active"] == 1)
+        executor.submit(results.append, 1)
+
+        submitter = threading.Thread(target=executor.submit, args=(results.append, 2))
+        submitter.start()
+        time.sleep(0.05)
+        assert submitter.is_alive()
+        release.set()
+        submitter.join(timeout=5)
+        executor.shutdown()
+        assert results == [1, 2]
+
+    def test_submit_after_shutdown(self):
+        """Test that a shut down executor refuses new tasks."""
+        executor = BoundedExecutor()
+        executor.shutdown()
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+
+
+class TestKeyedExecutor:
+    """Tests for the KeyedExecutor class."""
+
+    def test_invalid_arguments(self):
+        """Test that a policy that would break per-key order is rejected."""
+        with pytest.raises(ValueError):
+            KeyedExecutor(backpressure=DROP_OLDEST)
+
+    def test_same_key_runs_in_order(self):
+        """Test that tasks with one key run one at a time in submission order."""
+        executor = KeyedExecutor(max_workers=4)
+        results = []
+        running = []
+
+        def task(i):
+            running.append(i)
+            assert len(running) == 1
+            time.sleep(0.001)
+            results.append(i)
+            running.remove(i)
+
+        for i in range(50):
+            assert executor.submit(task, i, key="chat-1")
+        executor.shutdown()
+        assert results == list(range(50))
+
+    def test_different_keys_run_in_parallel(self):
+        """Test that a blocked key does not hold back the other keys."""
+        executor = KeyedExecutor(max_workers=2)
+        release = threading.Event()
+        results = []
+        executor.submit(release.wait, key="slow")
+        executor.submit(results.append, "slow-2", key="slow")
+        for i in range(3):
+            executor.submit(results.append, i, key="fast")
+        assert wait_for(lambda: len(results) == 3)
+        assert results == [0, 1, 2]
+        release.set()
+        executor.shutdown()
+        assert results == [0, 1, 2, "slow-2"]
+
+    def test_idle_keys_are_dropped(self):
+        """Test that a key's queue is removed once its tasks have run."""
+        executor = KeyedExecutor(max_workers=4)
+        for i in range(100):
+            executor.submit(time.sleep, 0, key="chat-%d" % (i % 10))
+        executor.submit(time.sleep, 0)
+        executor.shutdown()
+        metrics = executor.metrics()
+        assert metrics["keys"] == 0
+        assert metrics["queue_depth"] == 0
+        assert metrics["completed"] == 101
+
+    def test_task_errors_are_contained(self):
+        """Test that a failing task does not stop the key's later tasks."""
+        executor = KeyedExecutor(max_workers=1)
+        results = []
+        executor.submit(lambda: 1 / 0, key="chat-1")
+        executor.submit(results.append, "ok", key="chat-1")
+        executor.shutdown()
+        assert results == ["ok"]
+
+    def test_reject_when_full(self):
+        """Test that the reject policy bounds the tasks waiting across all keys."""
+        executor = KeyedExecutor(max_workers=1, max_queue_size=2, backpressure=REJECT)
+        release = threading.Event()
+        assert executor.submit(release.wait, key="a")
+        assert executor.submit(release.wait, key="b")
+        assert not executor.submit(release.wait, key="c")
+        assert executor.metrics()["rejected"] == 1
+        release.set()
+        executor.shutdown()
+
+    def test_block_when_full(self):
+        """Test that the block policy waits for a task to finish."""
+        executor = KeyedExecutor(max_workers=1, max_queue_size=1, backpressure=BLOCK)
+        release = threading.Event()
+        results = []
+        executor.submit(release.wait, key="a")
+        submitter = threading.Thread(
+            target=executor.submit, args=(results.append, 1), kwargs={"key": "a"}
+        )
+        submitter.start()
+        time.sleep(0.05)
+        assert submitter.is_alive()
+        release.set()
+        submitter.join(timeout=5)
+        executor.shutdown()
+        assert results == [1]
+
+    def test_submit_after_shutdown(self):
+        """Test that a shut down executor refuses new tasks."""
+        executor = KeyedExecutor()
+        executor.shutdown()
+        with pytest.raises(RuntimeError):
+            executor.submit(print, key="chat-1")
+
+
+class TestEventLoopThread:
+    """Tests for the EventLoopThread class."""
+
+    def test_starts_lazily(self):
+        """Test that the loop thread only starts on first use."""
+        event_loop = EventLoopThread()
+        assert not event_loop.running
+
+        async def answer():
+            return 42
+
+        assert event_loop.run(answer()) == 42
+        assert event_loop.running
+        event_loop.stop()
+        assert not event_loop.running
+
+    def test_coroutines_share_one_loop(self):
+        """Test that coroutines from different threads run on the same loop."""
+        event_loop = EventLoopThread()
+        loops = []
+
+        async def record():
+            loops.append(asyncio.get_running_loop())
+
+        threads = [threading.Thread(target=event_loop.run, args=(record(),)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        event_loop.stop()
+        assert len(loops) == 5
+        assert len(set(map(id, loops))) == 1
+
+    def test_exception_propagates(self):
+        """Test that an exception raised by a coroutine reaches the caller."""
+        event_loop = EventLoopThread()
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            event_loop.run(fail())
+        event_loop.stop()
+
+    def test_hooks_run_on_loop(self):
+        """Test that sync and async startup and shutdown hooks run on the loop."""
+        calls = []
+
+        async def startup():
+            calls.append(("startup", asyncio.get_running_loop()))
+
+        def shutdown():
+            calls.append(("shutdown", None))
+
+        event_loop = EventLoopThread(startup_hooks=[startup], shutdown_hooks=[shutdown])
+
+        async def noop():
+            return asyncio.get_running_loop()
+
+        loop = event_loop.run(noop())
+        event_loop.run(noop())
+        event_loop.stop()
+        assert calls == [("startup", loop), ("shutdown", None)]
+        assert loop.is_closed()
+
+    def test_stop_cancels_pending_tasks(self):
+        """Test that stopping the loop cancels coroutines still in flight."""
+        event_loop = EventLoopThread()
+        future = event_loop.submit(asyncio.sleep(60))
+        event_loop.stop()
+        assert future.cancelled()
+
+
+class TestSlowCallMonitor:
+    """Tests for the SlowCallMonitor class."""
+
+    def test_invalid_threshold(self):
+        """Test that a threshold must be positive."""
+        with pytest.raises(ValueError):
+            SlowCallMonitor(0)
+
+    def test_logs_slow_thread_once(self, caplog):
+        """Test that a slow call is logged once, with the stack of its thread."""
+        monitor = SlowCallMonitor(0.05)
+        release = threading.Event()
+
+        def stuck_in_here():
+            token = monitor.begin("handle_it", "e-1", threading.get_ident())
+            release.wait()
+            monitor.end(token)
+
+        thread = threading.Thread(target=stuck_in_here)
+        thread.start()
+        assert wait_for(lambda: monitor.slow == 1)
+        time.sleep(0.1)
+        release.set()
+        thread.join()
+        monitor.stop()
+        assert monitor.slow == 1
+        assert "handle_it" in caplog.text
+        assert "e-1" in caplog.text
+        assert "stuck_in_here" in caplog.text
+
+    def test_logs_coroutine_stack(self, caplog):
+        """Test that the stack of a slow coroutine is its chain of awaits."""
+        monitor = SlowCallMonitor(10)
+
+        async def inner():
+            await asyncio.sleep(0)
+
+        async def outer():
+            await inner()
+
+        coroutine = outer()
+        coroutine.send(None)
+        monitor.begin("handle_it", "e-1", coroutine)
+        monitor.threshold = 0
+        monitor.check()
+        coroutine.close()
+        assert "in outer" in caplog.text
+        assert "in inner" in caplog.text
+
+    def test_fast_calls_are_not_logged(self):
+        """Test that calls ending within the threshold are not reported."""
+        monitor = SlowCallMonitor(10)
+        for _ in range(100):
+            monitor.end(monitor.begin("handle_it", "e-1", threading.get_ident()))
+        monitor.check()
+        monitor.stop()
+        assert monitor.slow == 0
+
+
+class TestProcessExecutor:
+    """Tests for the ProcessExecutor class."""
+
+    def test_runs_tasks_in_worker_processes(self, tmp_path):
+        """Test that tasks run in other processes and all finish before shutdown returns."""
+        path = str(tmp_path / "out")
+        executor = ProcessExecutor(max_workers=2)
+        for i in range(10):
+            assert executor.submit(record_pid, path, i)
+        executor.shutdown()
+        with open(path) as f:
+            lines = [line.split() for line in f]
+        assert sorted(int(value) for value, _ in lines) == list(range(10))
+        assert all(int(pid) != os.getpid() for _, pid in lines)
+        assert executor.metrics()["submitted"] == 10
+
+    def test_reject_when_full(self):
+        """Test that a full queue rejects new tasks."""
+        executor = ProcessExecutor(max_workers=1, max_queue_size=1)
+        assert executor.submit(time.sleep, 0.5)
+        assert wait_for(lambda: executor.metrics()["queue_depth"] == 0)
+        assert executor.submit(time.sleep, 0)
+        assert not executor.submit(time.sleep, 0)
+        assert executor.metrics()["rejected"] == 1
+        executor.shutdown()
+
+    def test_dead_worker_is_restarted(self, tmp_path):
+        """Test that the health check replaces a worker process that died."""
+        path = str(tmp_path / "out")
+        executor = ProcessExecutor(max_workers=1, health_check_interval=0.02)
+        executor.submit(crash)
+        assert wait_for(lambda: executor.metrics()["restarts"] == 1)
+        executor.submit(record_pid, path, "after")
+        executor.shutdown()
+        with open(path) as f:
+            assert f.read().split()[0] == "after"
+
+    def test_unpicklable_task(self):
+        """Test that a task that cannot be sent to a worker fails in submit."""
+        executor = ProcessExecutor(max_workers=1)
+        with pytest.raises(Exception):
+            executor.submit(lambda: None)
+        executor.shutdown()
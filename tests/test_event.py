@@ -1,8 +1,12 @@
 """Tests for feishu_sdk.event module."""
 
+import json
+
 import pytest
 
 from feishu_sdk.event import Event, InvalidEventException
+from feishu_sdk.models import Header, MessageReceiveEvent
+from feishu_sdk.utils import Obj
 
 
 class TestEvent:
@@ -70,6 +74,69 @@ class TestEvent:
         assert event.event.sender.sender_id.open_id == "ou_123"
         assert event.event.message.message_type == "text"
 
+    def test_message_event_uses_typed_model(self):
+        """Test that im.message.receive_v1 events decode into the typed models."""
+        data = {
+            "header": {"event_type": "im.message.receive_v1"},
+            "event": {"message": {"message_type": "text"}},
+        }
+        event = Event(data)
+        assert isinstance(event.header, Header)
+        assert isinstance(event.event, MessageReceiveEvent)
+
+    def test_attributes_can_be_set(self):
+        """Test that callers can attach their own attributes to an event."""
+        event = Event({"header": {"event_type": "custom"}, "event": {}})
+        event.callback_handler = print
+        event.request_id = "r-1"
+        assert event.callback_handler is print
+        assert event.request_id == "r-1"
+
+    def test_message_event_reads_as_dict(self):
+        """Test that json.dumps(), len() and .get() see the payload of a receive_v1 event."""
+        data = {
+            "header": {"event_id": "e-1", "event_type": "im.message.receive_v1"},
+            "event": {
+                "sender": {"sender_id": {"open_id": "ou_1"}, "sender_type": "user"},
+                "message": {"message_type": "text", "mentions": [{"key": "@_user_1"}]},
+            },
+        }
+        event = Event(data)
+        assert json.loads(json.dumps(event.event)) == data["event"]
+        assert json.loads(json.dumps(event.header)) == data["header"]
+        assert len(event.event) == 2
+        assert len(event.header) == 2
+        assert event.event.get("sender") == {
+            "sender_id": {"open_id": "ou_1"},
+            "sender_type": "user",
+        }
+        assert event.event.message.get("message_type") == "text"
+        assert event.event.get("missing", "default") == "default"
+        assert event.header.get("event_id") == "e-1"
+
+    def test_unknown_event_falls_back_to_obj(self):
+        """Test that other event types decode into the generic Obj."""
+        data = {"header": {"event_type": "custom.event"}, "event": {"data": {"key": "value"}}}
+        event = Event(data)
+        assert isinstance(event.event, Obj)
+        assert event.event.data.key == "value"
+
+    def test_to_dict_round_trip(self):
+        """Test that an event rebuilt from to_dict() equals the original."""
+        data = {
+            "header": {"event_id": "e-1", "event_type": "im.message.receive_v1"},
+            "event": {
+                "sender": {"sender_id": {"open_id": "ou_1"}},
+                "message": {"message_type": "text", "mentions": [{"key": "@_user_1"}]},
+            },
+        }
+        event = Event(data)
+        rebuilt = Event(event.to_dict())
+        assert rebuilt.header == event.header
+        assert rebuilt.event == event.event
+        custom = Event({"header": {"event_type": "custom"}, "event": {"data": {"k": 1}}})
+        assert custom.to_dict() == {"header": {"event_type": "custom"}, "event": {"data": {"k": 1}}}
+
 
 class TestInvalidEventException:
     """Tests for InvalidEventException."""
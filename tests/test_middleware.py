@@ -0,0 +1,159 @@
+"""Tests for feishu_sdk.middleware module."""
+
+import asyncio
+
+import pytest
+
+from feishu_sdk.event import Event
+from feishu_sdk.middleware import capture_errors, compose, sample, timing
+
+
+def make_event(event_id="e-1"):
+    """Create a custom event with the given id."""
+    return Event({"header": {"event_id": event_id, "event_type": "custom.event"}, "event": {}})
+
+
+def tag(name, calls):
+    """Middleware appending its name before and after the handler runs."""
+
+    def middleware(handler):
+        if asyncio.iscoroutinefunction(handler):
+
+            async def wrapped_coroutine(event):
+                calls.append(name)
+                await handler(event)
+                calls.append("/" + name)
+
+            return wrapped_coroutine
+
+        def wrapped(event):
+            calls.append(name)
+            handler(event)
+            calls.append("/" + name)
+
+        return wrapped
+
+    return middleware
+
+
+class TestCompose:
+    """Tests for the compose function."""
+
+    def test_empty_chain_is_the_handler(self):
+        """Test that no middleware leaves the handler itself."""
+        handler = print
+        assert compose(handler, []) is handler
+
+    def test_first_middleware_is_outermost(self):
+        """Test the nesting order of a chain."""
+        calls = []
+        handler = compose(lambda event: calls.append("handler"), [tag("a", calls), tag("b", calls)])
+        handler(make_event())
+        assert calls == ["a", "b", "handler", "/b", "/a"]
+
+    async def test_async_chain(self):
+        """Test that a chain around a coroutine function stays a coroutine function."""
+        calls = []
+
+        async def handler(event):
+            calls.append("handler")
+
+        composed = compose(handler, [tag("a", calls)])
+        assert asyncio.iscoroutinefunction(composed)
+        await composed(make_event())
+        assert calls == ["a", "handler", "/a"]
+
+    def test_mismatched_wrapper(self):
+        """Test that a sync wrapper around an async handler is refused at composition."""
+
+        async def handler(event):
+            pass
+
+        with pytest.raises(TypeError):
+            compose(handler, [lambda h: lambda event: h(event)])
+
+
+class TestTiming:
+    """Tests for the timing middleware."""
+
+    def test_records_duration(self):
+        """Test that the duration of a call is recorded."""
+        durations = []
+        handler = compose(lambda event: None, [timing(lambda e, s: durations.append((e, s)))])
+        event = make_event()
+        handler(event)
+        assert durations[0][0] is event
+        assert durations[0][1] >= 0
+
+    async def test_records_failed_async_call(self):
+        """Test that a failing coroutine is timed too and its error propagates."""
+        durations = []
+
+        async def handler(event):
+            raise ValueError("boom")
+
+        composed = compose(handler, [timing(lambda e, s: durations.append(s))])
+        with pytest.raises(ValueError):
+            await composed(make_event())
+        assert len(durations) == 1
+
+    def test_logs_by_default(self, caplog):
+        """Test that the default recorder logs at DEBUG level."""
+        handler = compose(lambda event: None, [timing()])
+        with caplog.at_level("DEBUG", logger="feishu_sdk.middleware"):
+            handler(make_event("e-9"))
+        assert "e-9" in caplog.text
+
+
+class TestCaptureErrors:
+    """Tests for the capture_errors middleware."""
+
+    def test_reports_and_swallows(self):
+        """Test that errors are passed to on_error instead of raised."""
+        errors = []
+
+        def handler(event):
+            raise ValueError("boom")
+
+        composed = compose(handler, [capture_errors(lambda e, exc: errors.append(exc))])
+        composed(make_event())
+        assert isinstance(errors[0], ValueError)
+
+    async def test_async_handler(self, caplog):
+        """Test that coroutine errors are logged by default."""
+
+        async def handler(event):
+            raise ValueError("boom")
+
+        await compose(handler, [capture_errors()])(make_event("e-7"))
+        assert "e-7" in caplog.text
+
+
+class TestSample:
+    """Tests for the sample middleware."""
+
+    def test_rate_bounds(self):
+        """Test that rates outside 0..1 are refused."""
+        with pytest.raises(ValueError):
+            sample(1.5)
+
+    def test_extremes(self):
+        """Test that rate 0 skips everything and rate 1 keeps everything."""
+        calls = []
+        never = compose(calls.append, [sample(0)])
+        always = compose(calls.append, [sample(1)])
+        for i in range(20):
+            never(make_event("e-%d" % i))
+            always(make_event("e-%d" % i))
+        assert len(calls) == 20
+
+    def test_rate_and_stable_decision(self):
+        """Test that about rate of the events are kept, the same ones every time."""
+        calls = []
+        handler = compose(lambda event: calls.append(event.header.event_id), [sample(0.25)])
+        for _ in range(2):
+            for i in range(2000):
+                handler(make_event("e-%d" % i))
+        first, second = calls[: len(calls) // 2], calls[len(calls) // 2 :]
+        assert first == second
+        assert 350 < len(first) < 650
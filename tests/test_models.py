@@ -0,0 +1,108 @@
+"""Tests for feishu_sdk.models module."""
+
+import pytest
+
+from feishu_sdk.models import Header, Mention, Message, MessageReceiveEvent, Sender, UserId
+
+MESSAGE_EVENT = {
+    "sender": {
+        "sender_id": {"union_id": "on_1", "user_id": "u_1", "open_id": "ou_1"},
+        "sender_type": "user",
+        "tenant_key": "tenant_1",
+    },
+    "message": {
+        "message_id": "om_1",
+        "root_id": "om_0",
+        "parent_id": "om_0",
+        "create_time": "1609073151345",
+        "update_time": "1609073151345",
+        "chat_id": "oc_1",
+        "thread_id": "omt_1",
+        "chat_type": "group",
+        "message_type": "text",
+        "content": '{"text": "@_user_1 hello"}',
+        "mentions": [
+            {
+                "key": "@_user_1",
+                "id": {"union_id": "on_2", "user_id": "u_2", "open_id": "ou_2"},
+                "name": "Tom",
+                "tenant_key": "tenant_1",
+            }
+        ],
+        "user_agent": "Mozilla/5.0",
+    },
+}
+
+
+class TestHeader:
+    """Tests for the Header model."""
+
+    def test_from_dict(self):
+        """Test decoding a full v2 event header."""
+        header = Header.from_dict(
+            {
+                "event_id": "e_1",
+                "event_type": "im.message.receive_v1",
+                "create_time": "1608725989000",
+                "token": "tok",
+                "app_id": "cli_1",
+                "tenant_key": "tenant_1",
+            }
+        )
+        assert header.event_id == "e_1"
+        assert header.event_type == "im.message.receive_v1"
+        assert header.app_id == "cli_1"
+
+    def test_missing_fields_are_none(self):
+        """Test that absent fields decode to None."""
+        header = Header.from_dict({"event_type": "test"})
+        assert header.event_type == "test"
+        assert header.event_id is None
+
+
+class TestMessageReceiveEvent:
+    """Tests for the MessageReceiveEvent model."""
+
+    def test_from_dict(self):
+        """Test decoding a full im.message.receive_v1 event body."""
+        event = MessageReceiveEvent.from_dict(MESSAGE_EVENT)
+        assert event.sender.sender_id.open_id == "ou_1"
+        assert event.sender.sender_type == "user"
+        assert event.message.message_type == "text"
+        assert event.message.content == '{"text": "@_user_1 hello"}'
+        assert event.message.mentions[0].id.open_id == "ou_2"
+        assert event.message.mentions[0].name == "Tom"
+
+    def test_missing_parts_are_none(self):
+        """Test that absent sender, sender_id and mentions decode to None."""
+        event = MessageReceiveEvent.from_dict({"message": {"message_id": "om_1"}})
+        assert event.sender is None
+        assert event.message.mentions is None
+        assert Sender.from_dict({"sender_type": "app"}).sender_id is None
+
+    @pytest.mark.parametrize(
+        "model", [Header, UserId, Sender, Mention, Message, MessageReceiveEvent]
+    )
+    def test_models_have_no_instance_dict(self, model):
+        """Test that model instances hold their data in the dict and nowhere else."""
+        instance = model()
+        assert not hasattr(instance, "__dict__")
+        with pytest.raises(AttributeError):
+            instance.unknown_field = 1
+
+    def test_undeclared_fields_are_kept(self):
+        """Test that payload keys the models do not declare survive decoding."""
+        payload = dict(MESSAGE_EVENT, extra={"k": 1})
+        payload["message"] = dict(MESSAGE_EVENT["message"], new_field="v")
+        event = MessageReceiveEvent.from_dict(payload)
+        assert event["extra"] == {"k": 1}
+        assert event.message["new_field"] == "v"
+        assert event.to_dict() == payload
+
+    def test_equality_and_repr(self):
+        """Test that models compare by value and show their fields."""
+        assert MessageReceiveEvent.from_dict(MESSAGE_EVENT) == MessageReceiveEvent.from_dict(
+            MESSAGE_EVENT
+        )
+        assert UserId("ou_1") != UserId("ou_2")
+        assert repr(UserId("ou_1")) == "UserId(open_id='ou_1', user_id=None, union_id=None)"
@@ -0,0 +1,95 @@
+"""Tests for feishu_sdk.ratelimit module."""
+
+import time
+
+import pytest
+
+from feishu_sdk.ratelimit import (
+    ENDPOINT_MESSAGE_CREATE,
+    ENDPOINT_MESSAGE_PATCH,
+    ENDPOINT_TOKEN,
+    RateLimiter,
+    TokenBucket,
+)
+
+
+class TestTokenBucket:
+    """Tests for the TokenBucket class."""
+
+    def test_burst_is_free(self):
+        """Test that calls within the burst size do not wait."""
+        bucket = TokenBucket(rate=10, capacity=5)
+        assert [bucket.reserve() for _ in range(5)] == [0.0] * 5
+
+    def test_over_limit_calls_queue(self):
+        """Test that calls beyond the burst wait in arrival order."""
+        bucket = TokenBucket(rate=10, capacity=1)
+        assert bucket.reserve() == 0.0
+        first = bucket.reserve()
+        second = bucket.reserve()
+        assert first == pytest.approx(0.1, abs=0.01)
+        assert second == pytest.approx(0.2, abs=0.01)
+
+    def test_invalid_rate(self):
+        """Test that a non-positive rate is rejected."""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
+
+    def test_acquire_waits(self):
+        """Test that acquire sleeps once the bucket is empty."""
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.035
+
+    @pytest.mark.asyncio
+    async def test_acquire_async_waits(self):
+        """Test that acquire_async waits once the bucket is empty."""
+        bucket = TokenBucket(rate=100, capacity=1)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire_async()
+        assert time.monotonic() - start >= 0.035
+
+
+class TestRateLimiter:
+    """Tests for the RateLimiter class."""
+
+    def test_endpoint_limit(self):
+        """Test that each endpoint has its own bucket."""
+        limiter = RateLimiter(
+            endpoint_limits={ENDPOINT_MESSAGE_CREATE: (10, 1), ENDPOINT_MESSAGE_PATCH: (10, 1)},
+            receive_id_limit=None,
+        )
+        assert limiter.reserve(ENDPOINT_MESSAGE_CREATE) == 0.0
+        assert limiter.reserve(ENDPOINT_MESSAGE_CREATE) > 0
+        assert limiter.reserve(ENDPOINT_MESSAGE_PATCH) == 0.0
+
+    def test_unlimited_endpoint(self):
+        """Test that endpoints without a configured limit never wait."""
+        limiter = RateLimiter(endpoint_limits={}, receive_id_limit=None)
+        assert all(limiter.reserve(ENDPOINT_TOKEN) == 0.0 for _ in range(100))
+
+    def test_receive_id_limit(self):
+        """Test that each receive_id has its own bucket."""
+        limiter = RateLimiter(endpoint_limits={}, receive_id_limit=(5, 1))
+        assert limiter.reserve(ENDPOINT_MESSAGE_CREATE, "ou_1") == 0.0
+        assert limiter.reserve(ENDPOINT_MESSAGE_CREATE, "ou_1") > 0
+        assert limiter.reserve(ENDPOINT_MESSAGE_CREATE, "ou_2") == 0.0
+
+    def test_wait_is_longest_of_buckets(self):
+        """Test that a call waits for the slowest of its buckets."""
+        limiter = RateLimiter(
+            endpoint_limits={ENDPOINT_MESSAGE_CREATE: (100, 1)}, receive_id_limit=(5, 1)
+        )
+        limiter.reserve(ENDPOINT_MESSAGE_CREATE, "ou_1")
+        assert limiter.reserve(ENDPOINT_MESSAGE_CREATE, "ou_1") == pytest.approx(0.2, abs=0.01)
+
+    def test_key_buckets_are_bounded(self):
+        """Test that only the most recently used receive_id buckets are kept."""
+        limiter = RateLimiter(endpoint_limits={}, receive_id_limit=(5, 1), max_keys=2)
+        for receive_id in ("ou_1", "ou_2", "ou_3"):
+            limiter.reserve(ENDPOINT_MESSAGE_CREATE, receive_id)
+        assert len(limiter._key_buckets) == 2
+        assert (ENDPOINT_MESSAGE_CREATE, "ou_1") not in limiter._key_buckets
@@ -0,0 +1,84 @@
+"""Tests for feishu_sdk.retry module."""
+
+from email.utils import formatdate
+
+import pytest
+
+from feishu_sdk.retry import RetryPolicy, server_delay
+
+
+class TestRetryPolicy:
+    """Tests for the RetryPolicy and RetryState classes."""
+
+    def test_invalid_max_attempts(self):
+        """Test that at least one attempt is required."""
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+    def test_retryable_status(self):
+        """Test that retryable HTTP statuses get a backoff delay."""
+        retry = RetryPolicy(base_delay=0.1, max_delay=1).start()
+        delay = retry.next_delay(503, None, {})
+        assert delay is not None
+        assert 0.1 <= delay <= 1
+        assert retry.attempt == 2
+
+    def test_retryable_code(self):
+        """Test that retryable Feishu codes get a backoff delay."""
+        retry = RetryPolicy().start()
+        assert retry.next_delay(200, 99991400, {}) is not None
+
+    def test_non_retryable(self):
+        """Test that other failures are not retried."""
+        retry = RetryPolicy().start()
+        assert retry.next_delay(400, 230001, {}) is None
+        assert retry.next_delay(200, 99991663, {}) is None
+
+    def test_max_attempts(self):
+        """Test that retries stop after max_attempts attempts in total."""
+        retry = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0).start()
+        assert retry.next_delay(429, None, {}) is not None
+        assert retry.next_delay(429, None, {}) is not None
+        assert retry.next_delay(429, None, {}) is None
+
+    def test_backoff_is_capped(self):
+        """Test that the jittered backoff never exceeds max_delay."""
+        retry = RetryPolicy(max_attempts=50, base_delay=0.1, max_delay=0.5, deadline=100).start()
+        delays = [retry.next_delay(500, None, {}) for _ in range(40)]
+        assert all(0.1 <= delay <= 0.5 for delay in delays)
+
+    def test_server_delay_is_honored(self):
+        """Test that the delay requested by the server replaces the backoff."""
+        retry = RetryPolicy().start()
+        assert retry.next_delay(429, None, {"x-ogw-ratelimit-reset": "2"}) == 2.0
+
+    def test_deadline(self):
+        """Test that no retry is scheduled past the deadline."""
+        retry = RetryPolicy(deadline=1).start()
+        assert retry.next_delay(429, None, {"Retry-After": "5"}) is None
+
+
+class TestServerDelay:
+    """Tests for the server_delay function."""
+
+    def test_no_headers(self):
+        """Test that no delay is returned without rate limit headers."""
+        assert server_delay({}) is None
+
+    def test_retry_after_seconds(self):
+        """Test Retry-After given in seconds."""
+        assert server_delay({"Retry-After": "3"}) == 3.0
+
+    def test_retry_after_date(self):
+        """Test Retry-After given as an HTTP date."""
+        delay = server_delay({"Retry-After": formatdate(usegmt=True)})
+        assert delay is not None
+        assert 0 <= delay <= 1
+
+    def test_longest_header_wins(self):
+        """Test that the longer of both headers is used."""
+        assert server_delay({"Retry-After": "1", "x-ogw-ratelimit-reset": "4"}) == 4.0
+
+    def test_invalid_value(self):
+        """Test that unparsable values are ignored."""
+        assert server_delay({"Retry-After": "soon"}) is None
@@ -0,0 +1,71 @@
+"""Tests for feishu_sdk.router module."""
+
+from feishu_sdk.router import Router
+
+
+def first(event):
+    """First test handler."""
+
+
+def second(event):
+    """Second test handler."""
+
+
+def third(event):
+    """Third test handler."""
+
+
+class TestRouter:
+    """Tests for the Router class."""
+
+    def test_empty(self):
+        """Test that a type without handlers resolves to no handlers."""
+        router = Router()
+        assert router == {}
+        assert router.handlers_for("im.chat.disbanded_v1") == ()
+
+    def test_several_handlers_per_type(self):
+        """Test that registering a second handler keeps the first one."""
+        router = Router()
+        router.add("user.created", first)
+        router.add("user.created", second)
+        assert router.handlers_for("user.created") == (first, second)
+        assert router["user.created"] == (first, second)
+        assert len(router) == 1
+
+    def test_wildcard_patterns(self):
+        """Test prefix and catch-all patterns."""
+        router = Router()
+        router.add("im.chat.*", first)
+        router.add("*", second)
+        router.add("im.*_v1", third)
+        assert router.handlers_for("im.chat.disbanded_v1") == (first, second, third)
+        assert router.handlers_for("im.chat.updated_v2") == (first, second)
+        assert router.handlers_for("im.chat") == (second,)
+        assert router.handlers_for("contact.user.created_v3") == (second,)
+        assert list(router) == ["im.chat.*", "*", "im.*_v1"]
+
+    def test_pattern_characters_are_literal(self):
+        """Test that only * is special in a pattern."""
+        router = Router()
+        router.add("im.chat.*", first)
+        router.add("a?b", second)
+        assert router.handlers_for("imxchat.updated") == ()
+        assert router.handlers_for("axb") == ()
+        assert router.handlers_for("a?b") == (second,)
+
+    def test_registration_order_across_patterns(self):
+        """Test that exact and wildcard handlers run in registration order."""
+        router = Router()
+        router.add("im.chat.*", first)
+        router.add("im.chat.updated_v1", second)
+        assert router.handlers_for("im.chat.updated_v1") == (first, second)
+
+    def test_lookups_are_memoized(self):
+        """Test that a type is resolved once until handlers change."""
+        router = Router()
+        router.add("im.chat.*", first)
+        handlers = router.handlers_for("im.chat.updated_v1")
+        assert router.handlers_for("im.chat.updated_v1") is handlers
+        router.add("im.chat.updated_v1", second)
+        assert router.handlers_for("im.chat.updated_v1") == (first, second)
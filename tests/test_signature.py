@@ -0,0 +1,81 @@
+"""Tests for feishu_sdk.signature module."""
+
+import hashlib
+import time
+
+import pytest
+
+from feishu_sdk.signature import InvalidSignature, SignatureVerifier
+
+ENCRYPT_KEY = "test key"
+
+
+def sign(body, key=ENCRYPT_KEY, timestamp=None, nonce="nonce-1"):
+    """Return the signature headers Feishu sends with a body."""
+    timestamp = str(int(time.time())) if timestamp is None else str(timestamp)
+    signature = hashlib.sha256((timestamp + nonce + key).encode() + body).hexdigest()
+    return {
+        "x-lark-request-timestamp": timestamp,
+        "x-lark-request-nonce": nonce,
+        "x-lark-signature": signature,
+    }
+
+
+class TestSignatureVerifier:
+    """Tests for the SignatureVerifier class."""
+
+    def test_valid_signature(self):
+        """Test that a correctly signed request passes."""
+        body = b'{"encrypt": "abc"}'
+        headers = sign(body)
+        assert SignatureVerifier.is_signed(headers)
+        SignatureVerifier(ENCRYPT_KEY).verify(headers, body)
+
+    def test_tampered_body(self):
+        """Test that a body that does not match its signature is rejected."""
+        headers = sign(b"{}")
+        with pytest.raises(InvalidSignature, match="mismatch"):
+            SignatureVerifier(ENCRYPT_KEY).verify(headers, b'{"a": 1}')
+
+    def test_wrong_key(self):
+        """Test that a request signed with another key is rejected."""
+        headers = sign(b"{}", key="other key")
+        with pytest.raises(InvalidSignature, match="mismatch"):
+            SignatureVerifier(ENCRYPT_KEY).verify(headers, b"{}")
+
+    @pytest.mark.parametrize(
+        "header", ["x-lark-request-timestamp", "x-lark-request-nonce", "x-lark-signature"]
+    )
+    def test_missing_header(self, header):
+        """Test that a request missing one of the headers is rejected."""
+        headers = sign(b"{}")
+        del headers[header]
+        with pytest.raises(InvalidSignature, match="missing"):
+            SignatureVerifier(ENCRYPT_KEY).verify(headers, b"{}")
+
+    def test_invalid_timestamp(self):
+        """Test that a timestamp that is not a number is rejected."""
+        with pytest.raises(InvalidSignature, match="invalid timestamp"):
+            SignatureVerifier(ENCRYPT_KEY).verify(sign(b"{}", timestamp="soon"), b"{}")
+
+    @pytest.mark.parametrize("offset", [-301, 301])
+    def test_stale_timestamp(self, offset):
+        """Test that timestamps outside the window are rejected before hashing."""
+        headers = sign(b"{}", timestamp=int(time.time()) + offset)
+        with pytest.raises(InvalidSignature, match="stale"):
+            SignatureVerifier(ENCRYPT_KEY, window=300).verify(headers, b"{}")
+
+    def test_replayed_nonce(self):
+        """Test that a request is accepted only once."""
+        verifier = SignatureVerifier(ENCRYPT_KEY)
+        headers = sign(b"{}")
+        verifier.verify(headers, b"{}")
+        with pytest.raises(InvalidSignature, match="replayed"):
+            verifier.verify(headers, b"{}")
+
+    def test_forged_request_does_not_burn_nonce(self):
+        """Test that a request with a bad signature does not use up its nonce."""
+        verifier = SignatureVerifier(ENCRYPT_KEY)
+        with pytest.raises(InvalidSignature):
+            verifier.verify(sign(b"{}", key="other key"), b"{}")
+        verifier.verify(sign(b"{}"), b"{}")
@@ -0,0 +1,266 @@
+"""Tests for feishu_sdk.spool module."""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from feishu_sdk.spool import Spool, SpoolConsumer
+
+
+def wait_for(condition, timeout=5):
+    """Poll until condition() is true or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestSpool:
+    """Tests for the Spool class."""
+
+    def test_append_and_read(self, tmp_path):
+        """Test that appended records are read back in order with their positions."""
+        spool = Spool(str(tmp_path))
+        spool.append(b"first")
+        spool.append(b"second")
+        records = list(spool.read((0, 0)))
+        assert [body for body, _ in records] == [b"first", b"second"]
+        assert records[-1][1] == spool.durable_position
+        assert list(spool.read(records[0][1])) == records[1:]
+        spool.close()
+
+    def test_group_commit(self, tmp_path, monkeypatch):
+        """Test that appenders waiting on an fsync in progress share the next one."""
+        fsync = os.fsync
+        appenders = 16
+        spool = Spool(str(tmp_path))
+
+        def blocking_fsync(fd):
+            # hold the first fsync until every appender has written its record
+            if spool.syncs == 0:
+                assert wait_for(lambda: spool.appended == appenders)
+            fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", blocking_fsync)
+        with ThreadPoolExecutor(max_workers=appenders) as executor:
+            list(executor.map(lambda i: spool.append(b"event-%d" % i), range(appenders)))
+        metrics = spool.metrics()
+        assert metrics["appended"] == appenders
+        # the first fsync covers at least the first record, one more covers all the others
+        assert metrics["syncs"] == 2
+        assert len(list(spool.read((0, 0)))) == appenders
+        spool.close()
+
+    def test_segment_rotation(self, tmp_path):
+        """Test that records roll over into new segments and are read across them."""
+        spool = Spool(str(tmp_path), segment_size=64)
+        for i in range(10):
+            spool.append(b"event-%02d" % i + b"x" * 20)
+        assert len(spool.segments()) > 1
+        bodies = [body for body, _ in spool.read((0, 0))]
+        assert bodies == [b"event-%02d" % i + b"x" * 20 for i in range(10)]
+        spool.close()
+
+    def test_torn_record_is_truncated(self, tmp_path):
+        """Test that a record torn by a crash is dropped when the spool is reopened."""
+        spool = Spool(str(tmp_path))
+        spool.append(b"complete")
+        spool.close()
+        with open(os.path.join(str(tmp_path), "%020d.log" % 0), "ab") as f:
+            f.write(b"\x00\x00\x00\x10torn")
+
+        spool = Spool(str(tmp_path))
+        spool.append(b"after")
+        assert [body for body, _ in spool.read((0, 0))] == [b"complete", b"after"]
+        spool.close()
+
+    def test_corrupt_record_is_skipped(self, tmp_path):
+        """Test that a record failing its checksum mid-log is skipped and kept on reopen."""
+        spool = Spool(str(tmp_path))
+        for body in (b"first", b"second", b"third"):
+            spool.append(body)
+        spool.close()
+        path = os.path.join(str(tmp_path), "%020d.log" % 0)
+        with open(path, "r+b") as f:
+            data = f.read()
+            f.seek(data.index(b"second"))
+            f.write(b"SECOND")
+
+        spool = Spool(str(tmp_path))
+        assert os.path.getsize(path) == len(data)
+        records = list(spool.read((0, 0)))
+        assert [body for body, _ in records] == [b"first", None, b"third"]
+        assert records[-1][1] == spool.durable_position
+        spool.close()
+
+    def test_corrupt_length_resyncs_to_next_segment(self, tmp_path):
+        """Test that a record with an unusable length skips the rest of its segment only."""
+        spool = Spool(str(tmp_path), segment_size=32)
+        for i in range(4):
+            spool.append(b"event-%d" % i + b"x" * 20)
+        spool.close()
+        with open(os.path.join(str(tmp_path), "%020d.log" % 0), "r+b") as f:
+            f.write(b"\xff\xff\xff\xff")
+
+        spool = Spool(str(tmp_path), segment_size=32)
+        records = list(spool.read((0, 0)))
+        assert records[0] == (None, (1, 0))
+        assert [body for body, _ in records[1:]] == [
+            b"event-%d" % i + b"x" * 20 for i in range(1, 4)
+        ]
+        spool.close()
+
+    def test_commit_deletes_handled_segments(self, tmp_path):
+        """Test that committing a checkpoint removes segments before it and persists."""
+        spool = Spool(str(tmp_path), segment_size=32)
+        for i in range(6):
+            spool.append(b"x" * 40)
+        records = list(spool.read((0, 0)))
+        position = records[3][1]
+        spool.commit(position)
+        assert spool.segments()[0] == position[0]
+        spool.close()
+
+        spool = Spool(str(tmp_path), segment_size=32)
+        assert spool.load_checkpoint() == position
+        assert len(list(spool.read(position))) == 2
+        spool.close()
+
+    def test_append_after_close(self, tmp_path):
+        """Test that a closed spool refuses new records."""
+        spool = Spool(str(tmp_path))
+        spool.close()
+        with pytest.raises(RuntimeError):
+            spool.append(b"late")
+
+
+class TestSpoolConsumer:
+    """Tests for the SpoolConsumer class."""
+
+    def test_drains_spool(self, tmp_path):
+        """Test that records are dispatched and the checkpoint follows completion."""
+        spool = Spool(str(tmp_path))
+        received = []
+
+        def dispatch(body, done):
+            received.append(body)
+            done()
+            return True
+
+        consumer = SpoolConsumer(spool, dispatch, checkpoint_interval=0)
+        consumer.start()
+        spool.append(b"a")
+        spool.append(b"b")
+        assert wait_for(lambda: consumer.checkpoint == spool.durable_position)
+        consumer.stop()
+        assert received == [b"a", b"b"]
+        assert spool.load_checkpoint() == spool.durable_position
+        spool.close()
+
+    def test_moves_past_corrupt_record(self, tmp_path):
+        """Test that a corrupt record mid-log is passed over instead of stalling the consumer."""
+        spool = Spool(str(tmp_path))
+        for body in (b"first", b"second", b"third"):
+            spool.append(body)
+        spool.close()
+        path = os.path.join(str(tmp_path), "%020d.log" % 0)
+        with open(path, "r+b") as f:
+            f.seek(f.read().index(b"second"))
+            f.write(b"SECOND")
+        spool = Spool(str(tmp_path))
+        received = []
+
+        def dispatch(body, done):
+            received.append(body)
+            done()
+            return True
+
+        consumer = SpoolConsumer(spool, dispatch, checkpoint_interval=0)
+        consumer.start()
+        assert wait_for(lambda: consumer.checkpoint == spool.durable_position)
+        consumer.stop()
+        assert received == [b"first", b"third"]
+        spool.close()
+
+    def test_checkpoint_waits_for_earlier_records(self, tmp_path):
+        """Test that the checkpoint does not pass a record that is still being handled."""
+        spool = Spool(str(tmp_path))
+        spool.append(b"slow")
+        spool.append(b"fast")
+        pending = {}
+
+        def dispatch(body, done):
+            pending[body] = done
+            return True
+
+        consumer = SpoolConsumer(spool, dispatch, checkpoint_interval=0)
+        consumer.start()
+        assert wait_for(lambda: len(pending) == 2)
+        pending[b"fast"]()
+        consumer.commit()
+        assert consumer.checkpoint == (0, 0)
+        pending[b"slow"]()
+        consumer.commit()
+        assert consumer.checkpoint == spool.durable_position
+        consumer.stop()
+        spool.close()
+
+    def test_unfinished_records_are_redelivered(self, tmp_path):
+        """Test at-least-once delivery: records not done before a restart are dispatched again."""
+        spool = Spool(str(tmp_path))
+        for body in (b"a", b"b", b"c"):
+            spool.append(body)
+        first = []
+
+        def dispatch_first(body, done):
+            first.append(body)
+            if body == b"a":
+                done()
+            return True
+
+        consumer = SpoolConsumer(spool, dispatch_first, checkpoint_interval=0)
+        consumer.start()
+        assert wait_for(lambda: len(first) == 3)
+        consumer.stop()
+        consumer.commit()
+        spool.close()
+
+        spool = Spool(str(tmp_path))
+        second = []
+
+        def dispatch_second(body, done):
+            second.append(body)
+            done()
+            return True
+
+        consumer = SpoolConsumer(spool, dispatch_second)
+        consumer.start()
+        assert wait_for(lambda: len(second) == 2)
+        consumer.stop()
+        assert second == [b"b", b"c"]
+        spool.close()
+
+    def test_rejected_records_are_offered_again(self, tmp_path):
+        """Test that a record refused by dispatch is retried in order."""
+        spool = Spool(str(tmp_path))
+        spool.append(b"a")
+        attempts = []
+        accept = threading.Event()
+
+        def dispatch(body, done):
+            attempts.append(body)
+            if not accept.is_set():
+                return False
+            done()
+            return True
+
+        consumer = SpoolConsumer(spool, dispatch, checkpoint_interval=0, poll_interval=0.01)
+        consumer.start()
+        assert wait_for(lambda: len(attempts) >= 2)
+        accept.set()
+        assert wait_for(lambda: consumer.checkpoint == spool.durable_position)
+        consumer.stop()
+        spool.close()
@@ -0,0 +1,137 @@
+"""Tests for feishu_sdk.token module."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from feishu_sdk.token import TokenCache
+
+
+class TestTokenCache:
+    """Tests for the TokenCache class."""
+
+    def test_empty_cache_is_invalid(self):
+        """Test that a fresh cache holds no usable token."""
+        cache = TokenCache()
+        assert cache.token == ""
+        assert not cache.is_valid()
+
+    def test_set_token(self):
+        """Test storing a token with a long expiry."""
+        cache = TokenCache()
+        cache.set("t-123", 7200)
+        assert cache.token == "t-123"
+        assert cache.is_valid()
+        assert not cache.needs_refresh()
+
+    def test_expiry_margin(self):
+        """Test that a token inside the expiry margin is treated as expired."""
+        cache = TokenCache(expiry_margin=60)
+        cache.set("t-123", 30)
+        assert not cache.is_valid()
+
+    def test_refresh_ahead(self):
+        """Test that a token close to expiry is valid but due for refresh."""
+        cache = TokenCache(expiry_margin=60, refresh_ahead=300)
+        cache.set("t-123", 200)
+        assert cache.is_valid()
+        assert cache.needs_refresh()
+
+    def test_missing_expire_is_not_cached(self):
+        """Test that a token without expiry information is never reused."""
+        cache = TokenCache()
+        cache.set("t-123", 0)
+        assert not cache.is_valid()
+
+    def test_invalidate(self):
+        """Test invalidating a cached token."""
+        cache = TokenCache()
+        cache.set("t-123", 7200)
+        cache.invalidate()
+        assert not cache.is_valid()
+
+    def test_refresh_stores_token(self):
+        """Test that refresh stores the fetched token."""
+        cache = TokenCache()
+        assert cache.refresh(lambda: ("t-123", 7200)) == "t-123"
+        assert cache.is_valid()
+        assert not cache.refreshing
+
+    def test_refresh_skips_fetch_for_valid_token(self):
+        """Test that an unforced refresh reuses a valid token."""
+        cache = TokenCache()
+        cache.set("t-123", 7200)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return "t-456", 7200
+
+        assert cache.refresh(fetch) == "t-123"
+        assert cache.refresh(fetch, force=True) == "t-456"
+        assert len(calls) == 1
+
+    def test_refresh_is_single_flight(self):
+        """Test that concurrent threads share one in-flight fetch."""
+        cache = TokenCache()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return "t-123", 7200
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(lambda _: cache.refresh(fetch), range(20)))
+
+        assert len(calls) == 1
+        assert results == ["t-123"] * 20
+
+    def test_refresh_error_reaches_waiters(self):
+        """Test that a failed fetch is raised to every waiting caller."""
+        cache = TokenCache()
+        started = threading.Event()
+
+        def fetch():
+            started.set()
+            time.sleep(0.05)
+            raise RuntimeError("auth failed")
+
+        errors = []
+
+        def call():
+            try:
+                cache.refresh(fetch)
+            except RuntimeError as e:
+                errors.append(e)
+
+        first = threading.Thread(target=call)
+        first.start()
+        started.wait()
+        second = threading.Thread(target=call)
+        second.start()
+        first.join()
+        second.join()
+
+        assert len(errors) == 2
+        assert not cache.refreshing
+
+    @pytest.mark.asyncio
+    async def test_refresh_async_is_single_flight(self):
+        """Test that concurrent coroutines share one in-flight fetch."""
+        cache = TokenCache()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "t-123", 7200
+
+        results = await asyncio.gather(*[cache.refresh_async(fetch) for _ in range(50)])
+
+        assert len(calls) == 1
+        assert results == ["t-123"] * 50
+        assert cache.is_valid()
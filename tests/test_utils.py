@@ -1,5 +1,7 @@
 """Tests for feishu_sdk.utils module."""
 
+import json
+
 import pytest
 
 from feishu_sdk.utils import Obj, dict_2_obj
@@ -59,6 +61,69 @@ class TestObj:
         # Should not raise an error
         assert isinstance(obj, Obj)
 
+    def test_wraps_original_dict(self):
+        """Test that nested values are read from the wrapped dict, not a copy."""
+        data = {"user": {"name": "John"}}
+        obj = Obj(data)
+        data["user"]["name"] = "Jane"
+        assert obj.user.name == "Jane"
+
+    def test_nested_values_are_cached(self):
+        """Test that a nested node is wrapped once and then reused."""
+        obj = Obj({"user": {"name": "John"}, "items": [{"id": 1}]})
+        assert obj.user is obj.user
+        assert obj.items is obj.items
+        assert obj.items[0] is obj.items[0]
+
+    def test_missing_attribute(self):
+        """Test that reading an absent key raises AttributeError."""
+        obj = Obj({"key": "value"})
+        assert not hasattr(obj, "missing")
+        with pytest.raises(AttributeError):
+            obj.missing
+
+    def test_setattr(self):
+        """Test that attributes can still be assigned."""
+        obj = Obj({"key": "value"})
+        obj.key = "other"
+        obj.extra = 1
+        assert obj.key == "other"
+        assert obj.extra == 1
+
+    def test_dict_view(self):
+        """Test that dict access sees the same data as attribute access."""
+        data = {"name": "test", "user": {"name": "John"}, "tags": [{"id": 1}]}
+        obj = Obj(data)
+        assert len(obj) == 3
+        assert obj["name"] == obj.name == "test"
+        assert obj.get("user") == {"name": "John"}
+        assert json.loads(json.dumps(obj)) == data
+        assert obj.user.name == "John"
+        assert obj["user"] is obj.user
+        assert obj.tags[0].id == 1
+        assert json.loads(json.dumps(obj)) == data
+
+    def test_setattr_writes_dict(self):
+        """Test that assigned attributes are stored in the dict itself."""
+        obj = Obj({})
+        obj.key = "value"
+        assert obj == {"key": "value"}
+        del obj.key
+        assert obj == {}
+        assert not hasattr(obj, "__dict__")
+
+    def test_to_dict_is_zero_copy(self):
+        """Test that to_dict returns the payload without copying it."""
+        obj = Obj({"user": {"name": "John"}})
+        assert obj.to_dict() is obj
+        assert obj.user.to_dict() is obj.to_dict()["user"]
+
+    def test_key_shadows_dict_method(self):
+        """Test that a key named like a dict method wins on attribute access."""
+        obj = Obj({"items": [1, 2]})
+        assert obj.items == [1, 2]
+        assert list(dict.items(obj)) == [("items", [1, 2])]
+
 
 class TestDict2Obj:
     """Tests for the dict_2_obj function."""
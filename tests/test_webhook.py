@@ -1,11 +1,26 @@
 """Tests for feishu_sdk.webhook module."""
 
+import asyncio
 import json
+import os
+import threading
+import time
 
 import pytest
 from flask import Flask
 
+from feishu_sdk.event import Event
+from feishu_sdk.spool import Spool
 from feishu_sdk.webhook import WebhookHandler, create_webhook_handler
+from tests.test_signature import sign
+
+
+def record_event_in_file(event):
+    """Module-level handler for worker processes, appends the event id and pid to a file."""
+    # the path comes with the event: workers do not see environment changes made after the
+    # process pool's forkserver started
+    with open(event.event.output, "a") as f:
+        f.write("{} {}\n".format(event.header.event_id, os.getpid()))
 
 
 class TestWebhookHandler:
@@ -63,7 +78,7 @@ class TestWebhookHandler:
             pass
 
         assert "text" in handler.message_handlers
-        assert handler.message_handlers["text"] == handle_text
+        assert handler.message_handlers["text"] == (handle_text,)
 
     def test_message_handler_default_type(self, handler):
         """Test message handler with default type."""
@@ -82,7 +97,93 @@ class TestWebhookHandler:
             pass
 
         assert "user.created" in handler.event_handlers
-        assert handler.event_handlers["user.created"] == handle_user_created
+        assert handler.event_handlers["user.created"] == (handle_user_created,)
+
+    def test_handlers_for(self, handler):
+        """Test resolving the handlers of event and message types."""
+
+        @handler.message_handler("text")
+        def handle_text(event):
+            pass
+
+        @handler.event_handler("im.*")
+        def handle_im(event):
+            pass
+
+        @handler.event_handler("im.chat.*")
+        def handle_chat(event):
+            pass
+
+        assert handler.handlers_for("im.message.receive_v1", "text") == (handle_text, handle_im)
+        assert handler.handlers_for("im.message.receive_v1", "image") == (handle_im,)
+        assert handler.handlers_for("im.chat.disbanded_v1") == (handle_im, handle_chat)
+        assert handler.handlers_for("contact.user.created_v3") == ()
+
+    def test_all_handlers_run(self, client, handler):
+        """Test that every matching handler of an event is called, in order."""
+        calls = []
+
+        @handler.message_handler("text")
+        def handle_text(event):
+            calls.append("text")
+
+        @handler.message_handler("text")
+        def handle_text_again(event):
+            raise RuntimeError("does not stop the next handler")
+
+        @handler.event_handler("im.message.*")
+        async def handle_any_message(event):
+            calls.append("any")
+
+        payload = {
+            "header": {"event_id": "e-1", "event_type": "im.message.receive_v1"},
+            "event": {"message": {"message_type": "text"}},
+        }
+        assert client.post("/webhook", json=payload).status_code == 200
+        handler.shutdown()
+        assert calls == ["text", "any"]
+
+    def test_middleware(self, app):
+        """Test that global middleware wraps every handler, outside per-handler middleware."""
+        calls = []
+
+        def tag(name):
+            def middleware(handler):
+                def wrapped(event):
+                    calls.append(name)
+                    handler(event)
+
+                return wrapped
+
+            return middleware
+
+        handler = WebhookHandler(app, max_workers=1, middleware=[tag("global")])
+
+        @handler.event_handler("custom.event.type", middleware=[tag("own")])
+        def handle_custom(event):
+            calls.append("handler")
+
+        handler.use(tag("late"))
+
+        @handler.event_handler("other.event.type")
+        def handle_other(event):
+            calls.append("other")
+
+        client = app.test_client()
+        for i, event_type in enumerate(["custom.event.type", "other.event.type"]):
+            payload = {"header": {"event_id": "e-%d" % i, "event_type": event_type}, "event": {}}
+            assert client.post("/webhook", json=payload).status_code == 200
+        handler.shutdown()
+        assert calls == ["global", "own", "handler", "global", "late", "other"]
+
+    def test_middleware_rejects_processes(self):
+        """Test that middleware cannot be combined with worker processes."""
+        with pytest.raises(ValueError):
+            WebhookHandler(middleware=[lambda h: h], processes=2)
+        handler = WebhookHandler(processes=2)
+        with pytest.raises(ValueError):
+            handler.use(lambda h: h)
+        handler.shutdown()
 
     def test_url_verification(self, client):
         """Test URL verification handling."""
@@ -104,6 +205,17 @@ class TestWebhookHandler:
         data = json.loads(response.data)
         assert "error" in data
 
+    def test_invalid_json_returns_400(self, client):
+        """Test that a body that is not JSON returns 400."""
+        response = client.post("/webhook", data=b"{not json", content_type="application/json")
+        assert response.status_code == 400
+        assert json.loads(response.data) == {"error": "Invalid JSON"}
+
+    def test_non_object_body_returns_400(self, client):
+        """Test that a JSON body that is not an object returns 400."""
+        response = client.post("/webhook", json=[1, 2], content_type="application/json")
+        assert response.status_code == 400
+
     def test_valid_message_event(self, client, handler):
         """Test handling valid message event."""
         received_events = []
@@ -145,6 +257,402 @@ class TestWebhookHandler:
         )
         assert response.status_code == 200
 
+    def test_handlers_run_on_worker_pool(self, app):
+        """Test that events are handled on the bounded worker pool."""
+        handler = WebhookHandler(app, max_workers=2)
+        client = app.test_client()
+        handled = threading.Event()
+        thread_names = []
+
+        @handler.message_handler("text")
+        def handle_text(event):
+            thread_names.append(threading.current_thread().name)
+            handled.set()
+
+        response = client.post(
+            "/webhook",
+            json={
+                "header": {"event_type": "im.message.receive_v1"},
+                "event": {"message": {"message_type": "text", "content": '{"text": "Hello"}'}},
+            },
+        )
+        assert response.status_code == 200
+        assert handled.wait(timeout=5)
+        assert thread_names[0].startswith("feishu-webhook")
+        handler.shutdown()
+
+    def test_full_queue_returns_503(self, app):
+        """Test that events are rejected with 503 once the queue is full."""
+        handler = WebhookHandler(app, max_workers=1, max_queue_size=1)
+        client = app.test_client()
+        release = threading.Event()
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            release.wait(timeout=5)
+
+        payload = {"header": {"event_type": "custom.event.type"}, "event": {"data": "test"}}
+        assert client.post("/webhook", json=payload).status_code == 200
+        deadline = time.monotonic() + 5
+        while handler.executor.metrics()["active"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert client.post("/webhook", json=payload).status_code == 200
+        response = client.post("/webhook", json=payload)
+        assert response.status_code == 503
+        assert handler.executor.metrics()["rejected"] == 1
+
+        release.set()
+        handler.shutdown()
+
+    def test_redelivery_is_not_handled_twice(self, app, client, handler):
+        """Test that a redelivered event is acknowledged without running its handler."""
+        calls = []
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            calls.append(event.header.event_id)
+
+        payload = {
+            "header": {"event_id": "e-1", "event_type": "custom.event.type"},
+            "event": {"data": "test"},
+        }
+        assert client.post("/webhook", json=payload).status_code == 200
+        assert client.post("/webhook", json=payload).status_code == 200
+        handler.shutdown()
+        assert calls == ["e-1"]
+        assert handler.deduplicator.metrics() == {"hits": 1, "misses": 1}
+
+    def test_rejected_event_is_handled_on_redelivery(self, app):
+        """Test that an event answered with 503 is not remembered as seen."""
+        handler = WebhookHandler(app, max_workers=1, max_queue_size=1)
+        client = app.test_client()
+        release = threading.Event()
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            release.wait(timeout=5)
+
+        def post(event_id):
+            payload = {
+                "header": {"event_id": event_id, "event_type": "custom.event.type"},
+                "event": {},
+            }
+            return client.post("/webhook", json=payload).status_code
+
+        assert post("e-1") == 200
+        deadline = time.monotonic() + 5
+        while handler.executor.metrics()["active"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert post("e-2") == 200
+        assert post("e-3") == 503
+        release.set()
+        deadline = time.monotonic() + 5
+        while handler.executor.metrics()["completed"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert post("e-3") == 200
+        handler.shutdown()
+        assert handler.executor.metrics()["completed"] == 3
+
+    def test_failed_submit_is_handled_on_redelivery(self, handler):
+        """Test that an event whose submit raised is not remembered as seen."""
+        submitted = []
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            pass
+
+        def failing_submit(handlers, event):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+        body = json.dumps(
+            {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+        ).encode()
+        with pytest.raises(RuntimeError):
+            handler.handle_body(body, failing_submit)
+        data, status = handler.handle_body(body, lambda h, e: submitted.append(e) or True)
+        assert status == 200
+        assert [e.header.event_id for e in submitted] == ["e-1"]
+
+    def test_dedup_disabled(self, app):
+        """Test that dedup=False dispatches every delivery."""
+        handler = WebhookHandler(app, dedup=False)
+        client = app.test_client()
+        calls = []
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            calls.append(1)
+
+        payload = {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+        client.post("/webhook", json=payload)
+        client.post("/webhook", json=payload)
+        handler.shutdown()
+        assert handler.deduplicator is None
+        assert calls == [1, 1]
+
+    def test_spool_mode(self, app, tmp_path):
+        """Test that spooled events are written to the log and then handled."""
+        handler = WebhookHandler(app, spool=str(tmp_path))
+        client = app.test_client()
+        handled = threading.Semaphore(0)
+        calls = []
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            calls.append(event.header.event_id)
+            handled.release()
+
+        for i in range(3):
+            payload = {
+                "header": {"event_id": "e-%d" % i, "event_type": "custom.event.type"},
+                "event": {},
+            }
+            assert client.post("/webhook", json=payload).status_code == 200
+        for _ in range(3):
+            assert handled.acquire(timeout=5)
+        assert handler.spool.metrics()["appended"] == 3
+        handler.shutdown()
+        assert sorted(calls) == ["e-0", "e-1", "e-2"]
+        assert handler.spool.load_checkpoint() == handler.spool.durable_position
+
+    def test_spool_replays_after_restart(self, app, tmp_path):
+        """Test that events spooled by a previous process are handled on startup."""
+        spool = Spool(str(tmp_path))
+        spool.append(
+            json.dumps(
+                {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+            ).encode()
+        )
+        spool.close()
+
+        handler = WebhookHandler(app, spool=str(tmp_path))
+        handled = threading.Event()
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            handled.set()
+
+        handler.spool_consumer.start()
+        assert handled.wait(timeout=5)
+        handler.shutdown()
+
+    def test_spool_rejects_drop_oldest(self, tmp_path):
+        """Test that spool mode refuses a backpressure policy that loses events."""
+        with pytest.raises(ValueError):
+            WebhookHandler(spool=str(tmp_path), backpressure="drop_oldest")
+
+    def test_process_workers(self, app, tmp_path):
+        """Test that sync handlers run in worker processes with the decoded event."""
+        output = str(tmp_path / "out")
+        handler = WebhookHandler(app, processes=2)
+        client = app.test_client()
+        handler.event_handler("custom.event.type")(record_event_in_file)
+
+        for i in range(4):
+            payload = {
+                "header": {"event_id": "e-%d" % i, "event_type": "custom.event.type"},
+                "event": {"data": i, "output": output},
+            }
+            assert client.post("/webhook", json=payload).status_code == 200
+        handler.shutdown()
+
+        with open(output) as f:
+            lines = [line.split() for line in f]
+        assert sorted(event_id for event_id, _ in lines) == ["e-0", "e-1", "e-2", "e-3"]
+        assert all(int(pid) != os.getpid() for _, pid in lines)
+
+    def test_processes_accept_events_all_or_nothing(self, app, monkeypatch):
+        """Test that an event the worker pool rejects is not handed to worker processes."""
+        handler = WebhookHandler(app, processes=1, max_workers=1, max_queue_size=1)
+        client = app.test_client()
+        release = threading.Event()
+        to_processes = []
+
+        def submit(fn, handlers, data):
+            to_processes.append(json.loads(data)["header"]["event_id"])
+            return True
+
+        monkeypatch.setattr(handler.process_executor, "submit", submit)
+        handler.event_handler("custom.event.type")(record_event_in_file)
+
+        @handler.event_handler("custom.event.type")
+        async def handle_custom(event):
+            while not release.is_set():
+                await asyncio.sleep(0.005)
+
+        def post(event_id):
+            payload = {
+                "header": {"event_id": event_id, "event_type": "custom.event.type"},
+                "event": {},
+            }
+            return client.post("/webhook", json=payload).status_code
+
+        assert post("e-1") == 200
+        deadline = time.monotonic() + 5
+        while handler.executor.metrics()["active"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert post("e-2") == 200
+        assert post("e-3") == 503
+        release.set()
+        handler.shutdown()
+        assert to_processes == ["e-1", "e-2"]
+
+    def test_spool_rejects_processes(self, tmp_path):
+        """Test that spool mode cannot be combined with worker processes."""
+        with pytest.raises(ValueError):
+            WebhookHandler(spool=str(tmp_path), processes=2)
+
+    def test_ordering_key_keeps_chat_order(self, app):
+        """Test that messages of one chat are handled in the order they arrived."""
+        handler = WebhookHandler(app, max_workers=4, ordering_key="event.message.chat_id")
+        client = app.test_client()
+        calls = []
+
+        @handler.message_handler("text")
+        def handle_text(event):
+            time.sleep(0.001)
+            calls.append((event.event.message.chat_id, event.header.event_id))
+
+        for i in range(20):
+            payload = {
+                "header": {"event_id": "e-%d" % i, "event_type": "im.message.receive_v1"},
+                "event": {"message": {"chat_id": "oc_%d" % (i % 2), "message_type": "text"}},
+            }
+            assert client.post("/webhook", json=payload).status_code == 200
+        handler.shutdown()
+
+        for chat_id in ("oc_0", "oc_1"):
+            event_ids = [event_id for chat, event_id in calls if chat == chat_id]
+            assert event_ids == ["e-%d" % i for i in range(20) if "oc_%d" % (i % 2) == chat_id]
+        assert handler.executor.metrics()["keys"] == 0
+
+    def test_key_for(self):
+        """Test resolving the ordering key from an attribute path or a callable."""
+        event = Event(
+            {
+                "header": {"event_id": "e-1", "event_type": "im.message.receive_v1"},
+                "event": {
+                    "sender": {"sender_id": {"open_id": "ou_1"}},
+                    "message": {"chat_id": "oc_1", "message_type": "text"},
+                },
+            }
+        )
+        assert WebhookHandler().key_for(event) is None
+        assert WebhookHandler(ordering_key="event.message.chat_id").key_for(event) == "oc_1"
+        handler = WebhookHandler(ordering_key="event.sender.sender_id.open_id")
+        assert handler.key_for(event) == "ou_1"
+        assert WebhookHandler(ordering_key="event.message.thread_id").key_for(event) is None
+        handler = WebhookHandler(ordering_key=lambda e: e.header.event_type)
+        assert handler.key_for(event) == "im.message.receive_v1"
+
+    def test_ordering_key_rejects_processes(self):
+        """Test that ordered dispatch cannot be combined with worker processes."""
+        with pytest.raises(ValueError):
+            WebhookHandler(ordering_key="event.message.chat_id", processes=2)
+
+    @pytest.fixture
+    def encrypt(self):
+        """Return a helper encrypting bodies like Feishu, skipping without cryptography."""
+        pytest.importorskip("cryptography")
+        from tests.test_crypto import encrypt
+
+        return encrypt
+
+    def test_encrypted_event(self, app, encrypt):
+        """Test that an encrypted event is decrypted and handled."""
+        handler = WebhookHandler(app, encrypt_key="test key")
+        client = app.test_client()
+        handled = threading.Event()
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            assert event.event.data == "secret"
+            handled.set()
+
+        payload = {
+            "header": {"event_id": "e-1", "event_type": "custom.event.type"},
+            "event": {"data": "secret"},
+        }
+        body = json.dumps({"encrypt": encrypt(json.dumps(payload).encode())}).encode()
+        response = client.post(
+            "/webhook", data=body, content_type="application/json", headers=sign(body)
+        )
+        assert response.status_code == 200
+        assert handled.wait(timeout=5)
+        handler.shutdown()
+
+    def test_encrypted_url_verification(self, app, encrypt):
+        """Test that an encrypted url_verification challenge is answered."""
+        WebhookHandler(app, encrypt_key="test key")
+        plain = {"type": "url_verification", "challenge": "abc"}
+        body = {"encrypt": encrypt(json.dumps(plain).encode())}
+        response = app.test_client().post("/webhook", json=body)
+        assert response.status_code == 200
+        assert json.loads(response.data) == {"challenge": "abc"}
+
+    def test_encrypted_event_without_key(self, client, encrypt):
+        """Test that an encrypted body is refused when no encrypt_key is set."""
+        response = client.post("/webhook", json={"encrypt": encrypt(b"{}")})
+        assert response.status_code == 400
+        assert json.loads(response.data) == {"error": "Cannot decrypt event"}
+
+    def test_encrypted_event_with_wrong_ciphertext(self, app, encrypt):
+        """Test that an encrypt field that does not decrypt answers 400."""
+        WebhookHandler(app, encrypt_key="test key", verify_signature=False)
+        response = app.test_client().post("/webhook", json={"encrypt": "not base64!"})
+        assert response.status_code == 400
+        assert json.loads(response.data) == {"error": "Cannot decrypt event"}
+
+    def test_invalid_signature_returns_401(self, app):
+        """Test that a request with a bad signature is refused before it is decoded."""
+        handler = WebhookHandler(app, encrypt_key="test key")
+        calls = []
+        handler.event_handler("custom.event.type")(calls.append)
+        body = json.dumps(
+            {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+        ).encode()
+        client = app.test_client()
+
+        for headers in (sign(body, key="other key"), sign(body, timestamp=1)):
+            response = client.post(
+                "/webhook", data=body, content_type="application/json", headers=headers
+            )
+            assert response.status_code == 401
+            assert json.loads(response.data) == {"error": "Invalid signature"}
+        handler.shutdown()
+        assert calls == []
+
+    def test_replayed_request_returns_401(self, app):
+        """Test that a signed request cannot be replayed."""
+        handler = WebhookHandler(app, encrypt_key="test key", dedup=False)
+        body = json.dumps(
+            {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+        ).encode()
+        headers = sign(body)
+        client = app.test_client()
+        kwargs = {"data": body, "content_type": "application/json", "headers": headers}
+        assert client.post("/webhook", **kwargs).status_code == 200
+        assert client.post("/webhook", **kwargs).status_code == 401
+        handler.shutdown()
+
+    def test_unsigned_requests(self, app):
+        """Test that only the url_verification challenge may come unsigned."""
+        handler = WebhookHandler(app, encrypt_key="test key")
+        client = app.test_client()
+        response = client.post("/webhook", json={"type": "url_verification", "challenge": "abc"})
+        assert json.loads(response.data) == {"challenge": "abc"}
+        payload = {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+        assert client.post("/webhook", json=payload).status_code == 401
+        assert client.post("/webhook", data=b"x" * 10000).status_code == 401
+        handler.shutdown()
+
+    def test_verify_signature_disabled(self, app):
+        """Test that unsigned events are accepted with verify_signature=False."""
+        handler = WebhookHandler(app, encrypt_key="test key", verify_signature=False)
+        payload = {"header": {"event_id": "e-1", "event_type": "custom.event.type"}, "event": {}}
+        assert app.test_client().post("/webhook", json=payload).status_code == 200
+        handler.shutdown()
+
 
 class TestCreateWebhookHandler:
     """Tests for the create_webhook_handler factory function."""
@@ -196,3 +704,256 @@ class TestAsyncHandlers:
             return "handled"
 
         assert "test.event" in handler.event_handlers
+
+    def test_async_handlers_share_event_loop(self, app, handler):
+        """Test that async handlers run on one persistent loop instead of a loop per event."""
+        client = app.test_client()
+        loops = []
+        done = threading.Semaphore(0)
+
+        @handler.event_handler("test.event")
+        async def async_handler(event):
+            loops.append(asyncio.get_running_loop())
+            done.release()
+
+        payload = {"header": {"event_type": "test.event"}, "event": {}}
+        for _ in range(3):
+            assert client.post("/webhook", json=payload).status_code == 200
+        for _ in range(3):
+            assert done.acquire(timeout=5)
+        assert len(set(map(id, loops))) == 1
+        handler.shutdown()
+        assert loops[0].is_closed()
+
+    def test_startup_and_shutdown_hooks(self, app, handler):
+        """Test that lifecycle hooks run around the handlers on the event loop."""
+        client = app.test_client()
+        calls = []
+        handled = threading.Event()
+
+        @handler.on_startup
+        async def startup():
+            calls.append("startup")
+
+        @handler.on_shutdown
+        async def shutdown():
+            calls.append("shutdown")
+
+        @handler.message_handler("text")
+        async def handle_text(event):
+            calls.append("handled")
+            handled.set()
+
+        client.post(
+            "/webhook",
+            json={
+                "header": {"event_type": "im.message.receive_v1"},
+                "event": {"message": {"message_type": "text", "content": "{}"}},
+            },
+        )
+        assert handled.wait(timeout=5)
+        handler.shutdown()
+        assert calls == ["startup", "handled", "shutdown"]
+
+
+class TestHandlerTimeouts:
+    """Tests for handler timeouts and slow handler logging."""
+
+    @pytest.fixture
+    def app(self):
+        """Create a test Flask app."""
+        app = Flask(__name__)
+        app.config["TESTING"] = True
+        return app
+
+    @staticmethod
+    def post(app, event_id, event_type="custom.event.type"):
+        """Deliver a custom event to the app."""
+        payload = {"header": {"event_id": event_id, "event_type": event_type}, "event": {}}
+        assert app.test_client().post("/webhook", json=payload).status_code == 200
+
+    def test_async_handler_is_cancelled(self, app):
+        """Test that an async handler running out of time is cancelled."""
+        handler = WebhookHandler(app, handler_timeout=0.05)
+        cancelled = threading.Event()
+
+        @handler.event_handler("custom.event.type")
+        async def handle_custom(event):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        self.post(app, "e-1")
+        assert cancelled.wait(timeout=5)
+        handler.shutdown()
+        assert handler.timed_out == 1
+        assert handler.abandoned == 0
+
+    def test_sync_handler_is_abandoned(self, app):
+        """Test that the worker moves on from a sync handler that runs out of time."""
+        handler = WebhookHandler(app, max_workers=1)
+        release = threading.Event()
+        handled = threading.Event()
+
+        @handler.event_handler("custom.event.type", timeout=0.05)
+        def handle_hung(event):
+            release.wait()
+
+        @handler.event_handler("other.event.type")
+        def handle_other(event):
+            handled.set()
+
+        self.post(app, "e-1")
+        self.post(app, "e-2", "other.event.type")
+        # the only worker is free again although the first call is still running
+        assert handled.wait(timeout=5)
+        assert handler.timed_out == 1
+        assert handler.abandoned == 1
+        release.set()
+        handler.shutdown()
+
+    def test_sync_handler_runs_after_hung_call(self, app):
+        """Test that timed sync calls still run after an earlier one hung past its timeout."""
+        handler = WebhookHandler(app, max_workers=1, handler_timeout=0.2)
+        release = threading.Event()
+        ran = []
+
+        @handler.event_handler("custom.event.type")
+        def handle_hung(event):
+            release.wait()
+
+        @handler.event_handler("other.event.type")
+        def handle_fast(event):
+            ran.append(event.header.event_id)
+
+        self.post(app, "e-1")
+        for event_id in ("e-2", "e-3", "e-4"):
+            self.post(app, event_id, "other.event.type")
+        deadline = time.monotonic() + 5
+        while len(ran) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert ran == ["e-2", "e-3", "e-4"]
+        assert handler.timed_out == 1
+        assert handler.abandoned == 1
+        release.set()
+        handler.shutdown()
+
+    def test_per_handler_timeout_overrides_global(self, app):
+        """Test that a handler's own timeout takes precedence over handler_timeout."""
+        handler = WebhookHandler(app, handler_timeout=0.01)
+        handled = threading.Event()
+
+        @handler.event_handler("custom.event.type", timeout=5)
+        async def handle_custom(event):
+            await asyncio.sleep(0.05)
+            handled.set()
+
+        self.post(app, "e-1")
+        handler.shutdown()
+        assert handled.is_set()
+        assert handler.timed_out == 0
+
+    def test_timeout_is_per_registration(self, app):
+        """Test that a function registered twice only has a timeout where it was given one."""
+        handler = WebhookHandler(app)
+        finished = []
+
+        async def handle(event):
+            await asyncio.sleep(0.2)
+            finished.append(event.header.event_type)
+
+        handler.event_handler("custom.event.type", timeout=0.05)(handle)
+        handler.event_handler("other.event.type")(handle)
+
+        self.post(app, "e-1")
+        self.post(app, "e-2", "other.event.type")
+        handler.shutdown()
+        assert finished == ["other.event.type"]
+        assert handler.timed_out == 1
+
+    def test_handler_errors_are_not_timeouts(self, app, caplog):
+        """Test that an error raised in time is logged as a handler error."""
+        handler = WebhookHandler(app, handler_timeout=5)
+
+        @handler.event_handler("custom.event.type")
+        def handle_custom(event):
+            raise TimeoutError("upstream timed out")
+
+        self.post(app, "e-1")
+        handler.shutdown()
+        assert handler.timed_out == 0
+        assert "Error processing event" in caplog.text
+
+    def test_slow_handler_is_logged(self, app, caplog):
+        """Test that a slow handler is logged with its event id and stack."""
+        handler = WebhookHandler(app, slow_handler_threshold=0.05)
+
+        @handler.event_handler("custom.event.type")
+        def handle_slow(event):
+            time.sleep(0.3)
+
+        with caplog.at_level("WARNING", logger="feishu_sdk.dispatch"):
+            self.post(app, "e-slow")
+            handler.shutdown()
+        assert "e-slow" in caplog.text
+        assert "handle_slow" in caplog.text
+        assert handler.slow_monitor.slow == 1
+
+    def test_timeout_rejects_processes(self):
+        """Test that sync handler timeouts cannot be combined with worker processes."""
+        with pytest.raises(ValueError):
+            WebhookHandler(handler_timeout=1, processes=2)
+        handler = WebhookHandler(processes=2)
+        with pytest.raises(ValueError):
+            handler.event_handler("custom.event.type", timeout=1)(record_event_in_file)
+        handler.shutdown()
+
+
+class TestEventParsing:
+    """Benchmark for how often a webhook payload is parsed into an Event."""
+
+    PAYLOAD = {
+        "header": {"event_id": "e-1", "event_type": "im.message.receive_v1"},
+        "event": {
+            "sender": {"sender_id": {"open_id": "ou_1", "user_id": "u_1", "union_id": "on_1"}},
+            "message": {
+                "message_id": "om_1",
+                "chat_id": "oc_1",
+                "message_type": "text",
+                "content": '{"text": "Hello"}',
+                "mentions": [{"key": "@_user_%d" % i, "name": "user"} for i in range(10)],
+            },
+        },
+    }
+
+    def test_each_event_parsed_once(self, monkeypatch):
+        """Test that dispatch reuses the Event built by the request handler."""
+        parses = []
+
+        class CountingEvent(Event):
+            def __init__(self, dict_data):
+                parses.append(1)
+                super().__init__(dict_data)
+
+        monkeypatch.setattr("feishu_sdk.webhook.Event", CountingEvent)
+        app = Flask(__name__)
+        handler = WebhookHandler(app)
+        client = app.test_client()
+        done = threading.Semaphore(0)
+
+        @handler.message_handler("text")
+        def handle_text(event):
+            done.release()
+
+        events = 50
+        for i in range(events):
+            header = dict(self.PAYLOAD["header"], event_id="e-%d" % i)
+            payload = dict(self.PAYLOAD, header=header)
+            assert client.post("/webhook", json=payload).status_code == 200
+        for _ in range(events):
+            assert done.acquire(timeout=5)
+        handler.shutdown()
+
+        assert len(parses) == events